@@ -0,0 +1,87 @@
+"""Description
+
+This module provides the Aho-Corasick automaton for searching many literal
+targets at once.
+
+Keywords are put into a trie. Every trie node gets a failure link to the
+node of its longest proper suffix found in the trie, and the keywords ending
+at that suffix are added to the node output. A text is then scanned once,
+residue by residue, following trie edges or failure links, and every
+occurrence of every keyword is reported. The scan time is linear in the text
+length plus the number of occurrences, whatever the number of keywords.
+
+Aho AV, Corasick MJ. Efficient string matching: an aid to bibliographic
+search. Communications of the ACM, 1975, 18(6):333-340
+"""
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Automaton of keywords given as a list of strings
+    """
+
+    def __init__(self, keywords):
+        self.keywords = keywords
+
+        # edges[node] - residue -> child node
+        self.edges = [dict()]
+        self.failures = [0]
+        # outputs[node] - numbers of keywords ending at the node
+        self.outputs = [list()]
+
+        for number, keyword in enumerate(keywords):
+            self.add_keyword(number, keyword)
+
+        self.set_failures()
+
+    def add_keyword(self, number, keyword):
+        """Puts a keyword into the trie"""
+        node = 0
+
+        for residue in keyword:
+            child = self.edges[node].get(residue)
+
+            if child is None:
+                child = len(self.edges)
+                self.edges.append(dict())
+                self.failures.append(0)
+                self.outputs.append(list())
+                self.edges[node][residue] = child
+
+            node = child
+
+        self.outputs[node].append(number)
+
+    def set_failures(self):
+        """Sets failure links in breadth first order"""
+        queue = deque(self.edges[0].values())
+
+        while queue:
+            node = queue.popleft()
+
+            for residue, child in self.edges[node].items():
+                queue.append(child)
+
+                failure = self.failures[node]
+                while failure and residue not in self.edges[failure]:
+                    failure = self.failures[failure]
+
+                failure = self.edges[failure].get(residue, 0)
+                self.failures[child] = failure
+                self.outputs[child].extend(self.outputs[failure])
+
+    def find_all(self, text):
+        """Yields (offset, keyword number) of all keyword occurrences"""
+        edges, failures, outputs = self.edges, self.failures, self.outputs
+        keywords = self.keywords
+        node = 0
+
+        for end, residue in enumerate(text, 1):
+            while node and residue not in edges[node]:
+                node = failures[node]
+
+            node = edges[node].get(residue, 0)
+
+            for number in outputs[node]:
+                yield end - len(keywords[number]), number
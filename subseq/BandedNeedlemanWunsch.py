@@ -0,0 +1,161 @@
+"""Description
+
+This module provides a banded version of the Needleman-Wunsch algorithm.
+
+Only the cells whose diagonal j - i lies within `band` of the diagonals
+joining the score matrix corners are filled, so time and memory are
+proportional to len(target) * band. The band is doubled until the banded
+optimum is proven to be the optimum of the whole matrix: the best score any
+path leaving the band could reach is lower than the banded score. Then every
+optimal path lies inside the band and the traceback is the same one
+NeedlemanWunch.NeedlemanWunsch produces.
+"""
+import NeedlemanWunch
+
+NO_SCORE = float('-inf')
+
+
+class BandRow:
+    """A score matrix row which holds only the cells inside the band"""
+
+    def __init__(self, start, values):
+        self.start = start
+        self.values = values
+
+    def __getitem__(self, j):
+        k = j - self.start
+        if 0 <= k < len(self.values):
+            return self.values[k]
+
+        return NO_SCORE
+
+
+class BandedNeedlemanWunsch(NeedlemanWunch.NeedlemanWunsch):
+    """
+    This class performs nucleotide or protein sequence alignment using
+    the Needleman-Wunsch algorithm restricted to a band of diagonals
+    """
+
+    def __init__(self, target, sequence, gap_cost, sub_matrix, band,
+                 sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+        self.band = max(1, int(band))
+        self.score_matrix = None
+        self.end_column = len(sequence)
+
+        n, m = len(target), len(sequence)
+
+        while True:
+            self.fill_score_matrix()
+
+            low, high = self.get_diagonals()
+            if low <= -n and high >= m:
+                break
+
+            if self.get_outside_bound() < self.get_alignment_score():
+                break
+
+            self.band *= 2
+
+    def get_diagonals(self):
+        """Returns the lowest and the highest diagonal j - i of the band"""
+        difference = len(self.sequence) - len(self.target)
+
+        return min(0, difference) - self.band, max(0, difference) + self.band
+
+    def fill_score_matrix(self):
+        """Fills band of the score matrix row by row"""
+        n, m = len(self.target), len(self.sequence)
+        low, high = self.get_diagonals()
+
+        up_row = BandRow(
+            0, [-self.gap_cost * j for j in range(min(m, high) + 1)])
+        score_matrix = [up_row]
+
+        for i in range(1, n + 1):
+            scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+            start, stop = max(0, i + low), min(m, i + high)
+            values = list()
+
+            for j in range(start, stop + 1):
+                if j == 0:
+                    values.append(-self.gap_cost * i)
+                    continue
+
+                similarity = scores[self.sequence_codes[j - 1]]
+
+                diagonal_score = up_row[j - 1] + similarity
+                up_score = up_row[j] - self.gap_cost
+                left_score = values[-1] - self.gap_cost \
+                    if j > start else NO_SCORE
+
+                values.append(max(diagonal_score, up_score, left_score))
+
+            up_row = BandRow(start, values)
+            score_matrix.append(up_row)
+
+        self.score_matrix = score_matrix
+
+    def get_outside_bound(self):
+        """Returns the upper bound of scores of paths which leave the band"""
+        n, m = len(self.target), len(self.sequence)
+        low, high = self.get_diagonals()
+
+        # The best possible score of each target residue against the subject
+        # residues, the highest first
+        codes = set(self.sequence_codes)
+        scores = self.sub_matrix.scores
+        best_scores = sorted(
+            (max(0, max(scores[code1][code2] for code2 in codes))
+             for code1 in self.target_codes), reverse=True)
+
+        def bound(lefts, ups):
+            # a path with given number of left and up moves
+            diagonals = n - ups
+            return sum(best_scores[:diagonals]) - \
+                self.gap_cost * (lefts + ups)
+
+        bounds = [NO_SCORE]
+
+        # path crossing diagonal high + 1
+        if high + 1 <= m:
+            bounds.append(bound(high + 1, high + 1 - (m - n)))
+
+        # path crossing diagonal low - 1
+        if low - 1 >= -n:
+            bounds.append(bound(1 - low + (m - n), 1 - low))
+
+        return max(bounds)
+
+    def next_move(self, i, j):
+        """Looks for the next move during traceback.
+        Moves are determined by the scores of the band, in the same order
+        NeedlemanWunch.NeedlemanWunsch records them
+        """
+        if i == 0 or j == 0:
+            # return END
+            return 0
+
+        similarity = self.sub_matrix.scores[self.target_codes[i - 1]][
+            self.sequence_codes[j - 1]]
+        achieved_score = self.score_matrix[i][j]
+
+        if achieved_score == self.score_matrix[i - 1][j - 1] + similarity:
+            # return diagonal move
+            return 1
+
+        if achieved_score == self.score_matrix[i - 1][j] - self.gap_cost:
+            # return up move
+            return 2
+
+        # return left move
+        return 3
+
+    def get_alignment_score(self):
+        """Returns aligment score"""
+        return self.score_matrix[-1][len(self.sequence)]
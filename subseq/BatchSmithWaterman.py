@@ -0,0 +1,164 @@
+"""Description
+
+This module provides a batched Smith-Waterman kernel which fills the score
+matrices of many (target, sequence) pairs at once.
+
+Targets and sequences of a batch are padded to the longest one, so a batch
+is a stack of equally shaped score matrices. They are filled anti-diagonal by
+anti-diagonal just like in Wavefront, every step covers the same anti-diagonal
+of all matrices of the batch. Padding cells score -inf and are never used by
+real cells, so every pair gets exactly the scores SmithWaterman.SmithWaterman
+would give it. Pairs are sorted by length before batching to keep padding low.
+"""
+import numpy as np
+
+
+class BatchSmithWaterman:
+    """
+    Best scores and best score coordinates of a batch of (target, sequence)
+    pairs. No traceback is kept, chains passing the minimum score are traced
+    back with SmithWaterman.SmithWaterman. sequence_codes are residue codes of
+    the sequences if they are already encoded
+    """
+
+    def __init__(self, pairs, gap_cost, sub_matrix, sequence_codes=None):
+        self.pairs = pairs
+        self.sequence_codes = sequence_codes
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+
+        self.best_scores = [0.] * len(pairs)
+        self.best_score_coordinates = [list() for _ in pairs]
+
+        self.fill_score_matrices()
+
+    def get_best_score(self, k):
+        """Returns the best score of the k-th pair"""
+        return self.best_scores[k]
+
+    def get_coordinates(self, k):
+        """Returns a list of tuples (i, j) where i and j are coordinates of
+        the best score of the k-th pair, in the same order as
+        SmithWaterman.get_coordinates() lists them
+        """
+        return self.best_score_coordinates[k]
+
+    def encode(self, sequences, pad, sequence_codes=None):
+        """Returns len(sequences) x longest array of residue codes,
+        shorter sequences are padded with `pad`
+        """
+        width = max(len(sequence) for sequence in sequences)
+        codes = np.full((len(sequences), max(width, 1)), pad, dtype=int)
+
+        for k, sequence in enumerate(sequences):
+            codes[k, :len(sequence)] = self.sub_matrix.encode(
+                sequence, sequence_codes[k] if sequence_codes else None)
+
+        return codes
+
+    def fill_score_matrices(self):
+        """Fills score matrices of the batch one anti-diagonal at a time
+        keeping only the last three anti-diagonals, indexed by row
+        """
+        if len(self.pairs) == 0:
+            return
+
+        targets = [target for target, _ in self.pairs]
+        sequences = [sequence for _, sequence in self.pairs]
+
+        # substitution scores with an extra padding residue
+        pad = len(self.sub_matrix.scores)
+        scores = np.full((pad + 1, pad + 1), -np.inf)
+        scores[:pad, :pad] = self.sub_matrix.scores
+
+        target_codes = self.encode(targets, pad)
+        sequence_codes = self.encode(sequences, pad, self.sequence_codes)
+        target_lengths = np.array([len(target) for target in targets])
+        sequence_lengths = np.array([len(sequence) for sequence in sequences])
+
+        batch = len(self.pairs)
+        n, m = int(target_lengths.max()), int(sequence_lengths.max())
+
+        if n == 0 or m == 0:
+            return
+
+        up_left, left, current = np.zeros((3, batch, n + 1))
+        best_scores = np.zeros(batch)
+        hits = list()
+
+        for d in range(2, n + m + 1):
+            lo, hi = max(1, d - m), min(n, d - 1)
+            i = np.arange(lo, hi + 1)
+            j = d - i
+
+            similarity = scores[
+                target_codes[:, i - 1], sequence_codes[:, j - 1]]
+
+            score = np.maximum(
+                np.maximum(up_left[:, lo - 1:hi] + similarity, 0),
+                np.maximum(left[:, lo - 1:hi], left[:, lo:hi + 1])
+                - self.gap_cost)
+
+            valid = (i <= target_lengths[:, None]) & \
+                (j <= sequence_lengths[:, None])
+            score[~valid] = -np.inf
+
+            # border cells (0, d) and (d, 0)
+            if d <= m:
+                current[:, 0] = 0
+            if d <= n:
+                current[:, d] = 0
+            current[:, lo:hi + 1] = score
+
+            np.maximum(best_scores, score.max(axis=1), out=best_scores)
+
+            # cells equal to the best score so far, the ones which are not
+            # the final best score are thrown off at the end
+            found = (score == best_scores[:, None]) & (score > 0)
+            if found.any():
+                k, position = np.nonzero(found)
+                hits.append((k, i[position], d - i[position],
+                             best_scores[k]))
+
+            up_left, left, current = left, current, up_left
+
+        self.best_scores = [float(score) for score in best_scores]
+
+        for k, i, j, best_score in hits:
+            for pair, row, column in \
+                    zip(*(array[best_score == best_scores[k]]
+                          for array in (k, i, j))):
+                self.best_score_coordinates[pair].append(
+                    (int(row), int(column)))
+
+        for k, (target, sequence) in enumerate(self.pairs):
+            if self.best_scores[k] == 0:
+                # every cell scores 0, which is the best score
+                self.best_score_coordinates[k] = [
+                    (i, j) for i in range(1, len(target) + 1)
+                    for j in range(1, len(sequence) + 1)]
+            else:
+                self.best_score_coordinates[k].sort()
+
+
+def best_scores(pairs, gap_cost, sub_matrix, batch_size=256,
+                sequence_codes=None):
+    """Returns the best local alignment scores of all (target, sequence)
+    pairs, equal to SmithWaterman.get_best_score() of every pair.
+    sequence_codes are residue codes of the sequences if they are already
+    encoded
+    """
+    order = sorted(range(len(pairs)),
+                   key=lambda k: (len(pairs[k][1]), len(pairs[k][0])))
+    scores = [0.] * len(pairs)
+
+    for start in range(0, len(order), batch_size):
+        block = order[start:start + batch_size]
+        batch = BatchSmithWaterman(
+            [pairs[k] for k in block], gap_cost, sub_matrix,
+            [sequence_codes[k] for k in block] if sequence_codes else None)
+
+        for position, k in enumerate(block):
+            scores[k] = batch.get_best_score(position)
+
+    return scores
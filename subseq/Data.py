@@ -1,20 +1,67 @@
 """Description
 This module is desgined to extract and access data from pymol.
 """
+import hashlib
+from collections import OrderedDict
+
 from pymol import cmd
 
+import SubMatrix
+
+import ResidueIds
+
+# Chain sequences extracted in this session:
+# (model, chain, state, search_for, replace_with) ->
+#     (model fingerprint, sequence, ids), state is None for the current state
+cache = dict()
+
+
+def clear_cache():
+    """
+DESCRIPTION
+    subseq.clear - forgets chain sequences kept from earlier searches
+
+USAGE
+    subseq.clear
+
+    Sequences of a model are extracted again when its chains, number of
+    atoms, number of states or residue names and numbers change. Use
+    subseq.clear to free the memory taken by kept sequences
+    """
+    cache.clear()
+
 
 class Data:
     """
     This class is designed to extract data from pymol using cmd.iterate command
-    and makes it accessible through class object.
+    and makes it accessible through class object. Sequences of models which
+    did not change since they were extracted are taken from the cache.
+
+    If states are given, every state is extracted with cmd.iterate_state.
+    States in which a chain has the same residues share one entry, so
+    an ensemble of identical states is searched once. A chain which differs
+    between states gets an entry per distinct residue list, the first one is
+    keyed by the chain name and the others by 'chain/state'.
+
+    Chain sequences are interned by digest: chains with the same sequence,
+    like copies of a homo-oligomer, share one sequence string and
+    self.copies[digest] lists them, so searches scan every distinct sequence
+    once and give the hits to all copies with their own residue ids.
+
+    Distinct sequences are also kept in one contiguous ASCII buffer
+    self.corpus, self.offsets[model, chain] gives (start, end) of the chain
+    sequence in it. The corpus is translated to residue codes of
+    a substitution matrix once and alignment engines take zero-copy slices
+    of it, see get_codes().
 
     self.data schema:
     self.data = {
                     model: {
                         chain:{
                             sequence: str
-                            ids: list
+                            ids: ResidueIds
+                            chain: str, the chain name
+                            states: tuple of states or None
                         },
                         ...
                     },
@@ -35,15 +82,33 @@ class Data:
         'G': 'G', 'A': 'A', 'T': 'T', 'C': 'C', 'U': 'U'
     }
 
-    def __init__(self, models, chains, search_for, replace_with):
+    def __init__(self, models, chains, search_for, replace_with, states=None):
         self.data = None
+        # model -> fingerprint
+        self.fingerprints = dict()
+        # model -> main atoms of the current state, see get_current_atoms()
+        self.current_atoms = None
         self.models = models
         self.chains = chains
         self.search_for = search_for.lower()
         self.replace_with = replace_with
+        # requested states, 0 - all states, None - the current state
+        self.states = states
+        # (model, chain) -> sequence digest
+        self.digests = dict()
+        # sequence digest -> list of (model, chain) having the sequence
+        self.copies = OrderedDict()
+        # distinct sequences joined, (model, chain) -> (start, end) in it
+        self.corpus = b''
+        self.offsets = dict()
+        # SubMatrix -> corpus translated to residue codes of the matrix
+        self.encoded = dict()
 
         self.construct_data_dict()
         self.fill_data_dict()
+        # main atoms are not needed once sequences are filled
+        self.current_atoms = None
+        self.fill_corpus()
 
     def __getitem__(self, key):
         if isinstance(key, tuple):
@@ -65,38 +130,233 @@ class Data:
         """
         Initializes data structure self.data_dict
         structure schema:
-            model: {chain: {sequence: string, ids: list}}
+            model: {chain: {sequence: string, ids: ResidueIds, chain: string,
+                            states: None}}
         """
         data_dict = dict()
+        model_chains = dict()
 
         for model in self.models:
             data_dict[model] = dict()
 
-            for chain in cmd.get_chains(model):
+            model_chains[model] = cmd.get_chains(model)
+
+            for chain in model_chains[model]:
                 # skip if chain is not requested
                 if chain not in self.chains:
                     continue
 
                 data_dict[model][chain] = dict()
                 data_dict[model][chain]['sequence'] = ''
-                data_dict[model][chain]['ids'] = list()
+                data_dict[model][chain]['ids'] = ResidueIds.ResidueIds()
+                data_dict[model][chain]['chain'] = chain
+                data_dict[model][chain]['states'] = None
 
         self.data = data_dict
 
-    def fill_data_dict(self):
-        atoms_dict = self.get_data_from_pymol()
+        self.current_atoms = self.get_current_atoms(self.models)
 
+        for model in self.models:
+            self.fingerprints[model] = self.get_fingerprint(
+                model, model_chains[model])
+
+    def get_main_atoms(self):
+        """Returns the selection of one main atom of every residue"""
         if self.search_for == 'aminoacids':
-            self.replace_to_aa_one_letter(atoms_dict)
-        elif self.search_for == 'nucleicacids':
-            self.replace_to_na_one_letter(atoms_dict)
+            return "name ca"
+
+        return "resn G+C+A+T+U+DG+DC+DA+DT+DU and name C1'"
+
+    def get_current_atoms(self, models):
+        """
+        Returns a dictionary model -> list of [resn, resi, chain, model] of
+        all main atoms of the model in the current state, read with one
+        `cmd.iterate` command for fingerprints and extraction
+        """
+        current_atoms = dict((model, list()) for model in models)
+
+        if models:
+            space = {'main_atoms': list()}
+            cmd.iterate("({0}) and model {1}".format(
+                self.get_main_atoms(), '+'.join(models)),
+                "main_atoms.append([resn, resi, chain, model])", space=space)
+
+            for atom in space['main_atoms']:
+                if atom[3] in current_atoms:
+                    current_atoms[atom[3]].append(atom)
+
+        return current_atoms
+
+    def get_fingerprint(self, model, model_chains):
+        """
+        Returns model properties which change when its residues change:
+        chains, the number of atoms, the number of states and a digest of
+        (chain, resi, resn) of all main atoms in the current state, so
+        residues renamed, renumbered, added or removed anywhere in a chain
+        change it
+        """
+        residues = hashlib.sha1()
+        for resn, resi, chain, _ in self.current_atoms[model]:
+            residues.update('{0}\t{1}\t{2}\n'.format(
+                chain, resi, resn).encode('utf-8'))
+
+        return (tuple(model_chains), cmd.count_atoms("model " + model),
+                cmd.count_states(model), residues.digest())
+
+    def get_model_states(self, model):
+        """Returns requested states of the model"""
+        count = cmd.count_states(model)
+
+        if 0 in self.states:
+            return list(range(1, count + 1))
+
+        return [state for state in self.states if state <= count]
+
+    def fill_data_dict(self):
+        if self.states is None:
+            for (model, chain), (sequence, ids) in self.extract(
+                    self.data.keys()).items():
+                self.data[model][chain]['sequence'] = sequence
+                self.data[model][chain]['ids'] = ids
+        else:
+            self.fill_states()
 
-        self.fill_data(atoms_dict)
         self.filter_data()
 
-    def get_data_from_pymol(self):
+    def fill_states(self):
+        """
+        Extracts requested states of models and fills an entry for every
+        distinct residue list of a chain with states having it
+        """
+        model_states = dict((model, self.get_model_states(model))
+                            for model in self.data.keys())
+
+        # (model, chain) -> residue list digest -> entry
+        variants = dict(((model, chain), OrderedDict())
+                        for model in self.data.keys()
+                        for chain in self.data[model].keys())
+
+        for state in sorted(set(state for states in model_states.values()
+                                for state in states)):
+            models = [model for model in self.data.keys()
+                      if state in model_states[model]]
+
+            for key, (sequence, ids) in self.extract(models, state).items():
+                digest = self.get_digest(sequence, ids)
+
+                if digest in variants[key]:
+                    variants[key][digest]['states'] += (state,)
+                else:
+                    variants[key][digest] = {'sequence': sequence, 'ids': ids,
+                                             'chain': key[1],
+                                             'states': (state,)}
+
+        for (model, chain), entries in variants.items():
+            entries = [entry for entry in entries.values()
+                       if entry['sequence']]
+            self.data[model].pop(chain)
+
+            for number, entry in enumerate(entries):
+                if number:
+                    chain_key = '{0}/{1}'.format(chain, entry['states'][0])
+                else:
+                    chain_key = chain
+
+                self.data[model][chain_key] = entry
+
+    @staticmethod
+    def get_digest(sequence, ids=None):
+        """Returns a digest of the sequence and residue ids if given"""
+        digest = hashlib.sha1(sequence.encode('ascii'))
+
+        if ids is not None:
+            digest.update(ids.numbers.tobytes())
+            digest.update(repr(sorted(ids.names.items())).encode('ascii'))
+
+        return digest.digest()
+
+    def extract(self, models, state=None):
+        """
+        Returns a dictionary (model, chain) -> (sequence, ids) of requested
+        chains of models in the state, the current state if it is None.
+        Models which did not change are taken from the cache
+        """
+        residues = dict()
+
+        # models not found in the cache
+        extracted_models = list()
+
+        for model in models:
+            cached = self.fill_from_cache(model, state)
+
+            if cached is None:
+                extracted_models.append(model)
+            else:
+                residues.update(cached)
+
+        atoms_dict = self.get_data_from_pymol(extracted_models, state)
+
+        if self.search_for == 'aminoacids':
+            one_letter = self.aa_one_letter
+        else:
+            one_letter = self.na_one_letter
+
+        extracted = self.fill_data(atoms_dict, one_letter)
+
+        for model in extracted_models:
+            for chain in self.data[model].keys():
+                sequence, ids = extracted.get(
+                    (model, chain), ('', ResidueIds.ResidueIds()))
+                residues[model, chain] = (sequence, ids)
+
+                cache[model, chain, state, self.search_for,
+                      self.replace_with] = (self.fingerprints[model],
+                                            sequence, ids)
+
+        return residues
+
+    def fill_from_cache(self, model, state=None):
+        """
+        Returns a dictionary (model, chain) -> (sequence, ids) of requested
+        chains of the model in the state from the cache. Returns None if any
+        of them is not cached or the model changed
         """
-         Extracts data from pymol using `cmd.iterate` command.
+        entries = [cache.get((model, chain, state, self.search_for,
+                              self.replace_with))
+                   for chain in self.data[model].keys()]
+
+        if any(entry is None or entry[0] != self.fingerprints[model]
+               for entry in entries):
+            return None
+
+        return dict(((model, chain), (sequence, ids))
+                    for chain, (_, sequence, ids)
+                    in zip(self.data[model].keys(), entries))
+
+    def get_selection(self, models):
+        """
+        Returns the selection of main atoms of requested chains of models,
+        None if none of models has requested chains
+        """
+        models = [model for model in models if self.data[model]]
+
+        if not models:
+            return None
+
+        selection = "({0}) and model {1}".format(
+            self.get_main_atoms(), '+'.join(models))
+
+        # a blank chain name can not be written in a selection
+        chains = set(chain for model in models for chain in self.data[model])
+        if '' not in chains:
+            selection += " and chain {0}".format('+'.join(sorted(chains)))
+
+        return selection
+
+    def get_data_from_pymol(self, models, state=None):
+        """
+         Extracts data of requested chains of models from pymol using
+         one `cmd.iterate` command, `cmd.iterate_state` if state is given.
             Returns a dictionary:
                 atoms_dict = { 'main_atoms': [[resn, resi, chain, model], ...}
                 where
@@ -107,57 +367,148 @@ class Data:
         """
         atoms_dict = dict()
         atoms_dict['main_atoms'] = list()
-        # iterate through all c-alpha atoms and append
-        # position number, three letter code, corresponding chain and model
-        # to atoms_dict['main_atoms']
-        if self.search_for == 'aminoacids':
-            cmd.iterate("(name ca)",
-                        "main_atoms.append([resn, resi, chain, model])",
-                        space=atoms_dict)
 
-        if self.search_for == 'nucleicacids':
-            cmd.iterate("(resn G+C+A+T+U+DG+DC+DA+DT+DU and name C1')",
-                        "main_atoms.append([resn, resi, chain, model])",
-                        space=atoms_dict)
+        selection = self.get_selection(models)
 
-        return atoms_dict
+        # iterate through c-alpha or C1' atoms of requested models and
+        # chains and append position number, residue name, corresponding
+        # chain and model to atoms_dict['main_atoms']
+        # main atoms of the current state were read with fingerprints
+        if selection is not None and state is None:
+            for model in models:
+                atoms_dict['main_atoms'].extend(self.current_atoms[model])
 
-    def replace_to_aa_one_letter(self, atoms_dict):
-        """Replaces all 3 letter amino acid code to 1 letter aa code"""
-        for main_atoms in atoms_dict['main_atoms']:
-            try:
-                main_atoms[0] = self.aa_one_letter[main_atoms[0]]
-            except KeyError:
-                main_atoms[0] = self.replace_with
+        elif selection is not None:
+            cmd.iterate_state(state, selection,
+                              "main_atoms.append([resn, resi, chain, model])",
+                              space=atoms_dict)
 
-    def replace_to_na_one_letter(self, atoms_dict):
-        """Replaces all DNA or RNA nucleic acid code to 1 letter aa code"""
-        for main_atoms in atoms_dict['main_atoms']:
-            try:
-                main_atoms[0] = self.na_one_letter[main_atoms[0]]
-            except KeyError:
-                main_atoms[0] = self.replace_with
+        return atoms_dict
 
-    def fill_data(self, atoms_dict):
+    def fill_data(self, atoms_dict, one_letter):
         """
-        Initializes self.data[model][chain] keys:
-            - sequence: aa chain sequence
-            - ids: list of ids
+        Returns a dictionary (model, chain) -> (sequence, ids) of chains
+        found in atoms_dict:
+            - sequence: aa chain sequence, residue names are replaced with
+              one letter codes of one_letter or self.replace_with
+            - ids: ResidueIds of ids
         """
+        # (model, chain) -> list of one letter codes and list of ids
+        residues = dict()
+
         for resn, resi, chain, model in atoms_dict['main_atoms']:
             # Skip if model or chain is not requested
-            if model not in self.models or chain not in self.chains:
+            if model not in self.data or chain not in self.data[model]:
                 continue
 
-            self.data[model][chain]['sequence'] += resn
-            self.data[model][chain]['ids'].append(resi)
+            if (model, chain) not in residues:
+                residues[model, chain] = (list(), list())
+
+            codes, ids = residues[model, chain]
+            codes.append(one_letter.get(resn, self.replace_with))
+            ids.append(resi)
+
+        return dict(((model, chain),
+                     (''.join(codes), ResidueIds.ResidueIds(ids)))
+                    for (model, chain), (codes, ids) in residues.items())
+
+    def get_match(self, model, chain, start, end):
+        """
+        Returns a hit (model, chain name, resi list, states) of residues
+        start...end - 1 of the chain entry for subseq_select.select
+        """
+        entry = self.data[model][chain]
+
+        return (model, entry['chain'],
+                entry['ids'].get_selection(start, end), entry['states'])
+
+    def get_copies(self):
+        """
+        Returns a list of lists of (model, chain) entries having the same
+        sequence, in the order of the first entry of each list
+        """
+        return list(self.copies.values())
+
+    def get_order(self):
+        """
+        Returns a dict (model, chain) -> position of the chain entry in
+        model/chain order, entries of other states follow their chain
+        """
+        return dict((key, position) for position, key in enumerate(
+            (model, chain) for model in self.data.keys()
+            for chain in self.data[model].keys()))
+
+    def get_sequences(self):
+        """Returns a list of (digest, sequence) of distinct sequences"""
+        sequences = list()
+
+        for digest, keys in self.copies.items():
+            model, chain = keys[0]
+            sequences.append((digest, self.data[model][chain]['sequence']))
+
+        return sequences
 
     def filter_data(self):
-        for model in self.data.keys():
-            for chain in self.data[model].keys():
+        for model in list(self.data.keys()):
+            for chain in list(self.data[model].keys()):
                 if self.data[model][chain]['sequence'] == '':
                     self.data[model].pop(chain)
 
-        for model in self.data.keys():
+        for model in list(self.data.keys()):
             if len(self.data[model].keys()) == 0:
-                self.data.pop(model)
\ No newline at end of file
+                self.data.pop(model)
+
+    def fill_corpus(self):
+        """
+        Interns sequences of all chains by digest and joins distinct ones
+        into self.corpus
+        """
+        sequences = list()
+        # digest -> (start, end) in the corpus
+        spans = dict()
+        start = 0
+
+        for model in self.data.keys():
+            for chain in self.data[model].keys():
+                entry = self.data[model][chain]
+                digest = self.get_digest(entry['sequence'])
+
+                if digest not in self.copies:
+                    self.copies[digest] = list()
+                    sequences.append(entry['sequence'])
+                    spans[digest] = (start, start + len(entry['sequence']))
+                    start += len(entry['sequence'])
+                else:
+                    first_model, first_chain = self.copies[digest][0]
+                    entry['sequence'] = \
+                        self.data[first_model][first_chain]['sequence']
+
+                self.copies[digest].append((model, chain))
+                self.digests[model, chain] = digest
+                self.offsets[model, chain] = spans[digest]
+
+        self.corpus = ''.join(sequences).encode('ascii')
+
+    def get_codes(self, model, chain, sub_matrix, copy=False):
+        """
+        Returns residue codes of the chain sequence in sub_matrix, a
+        memoryview of the encoded corpus. With copy a bytearray is returned,
+        which unlike the memoryview can be sent to worker processes
+        """
+        if sub_matrix not in self.encoded:
+            self.encoded[sub_matrix] = self.corpus.translate(
+                sub_matrix.get_translation())
+
+        encoded = self.encoded[sub_matrix]
+        start, end = self.offsets[model, chain]
+
+        missing = encoded.find(SubMatrix.MISSING, start, end)
+        if missing != -1:
+            raise KeyError('Residue {0!r} is not in substitution matrix: {1}'
+                           .format(chr(self.corpus[missing]),
+                                   sub_matrix.get_name()))
+
+        if copy:
+            return bytearray(encoded[start:end])
+
+        return memoryview(encoded)[start:end]
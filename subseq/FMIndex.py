@@ -0,0 +1,279 @@
+"""Description
+
+This module provides an FM-index of chain sequences for fixed length pattern
+search.
+
+All sequences are joined with separators into one text and its suffix array
+is sorted by prefix doubling. Only the Burrows-Wheeler transform of the text
+is kept, together with:
+    - occurrence counts of every residue at every CHECKPOINT-th row
+    - text positions of rows whose suffix starts at a multiple of SAMPLE
+A pattern is matched from its last residue to the first (backward search),
+each step narrows the interval of suffix array rows starting with the
+matched part of the pattern. Counting takes time proportional to the pattern
+length, locating adds at most SAMPLE steps per hit. Residue classes and
+mismatches are searched by backtracking over the residues of the text.
+
+Ferragina P, Manzini G. Opportunistic data structures with applications.
+Proceedings of the 41st Annual Symposium on Foundations of Computer Science,
+2000, 390-398
+"""
+import numpy as np
+
+# Rows between occurrence count checkpoints
+CHECKPOINT = 64
+
+# Text positions between suffix array samples
+SAMPLE = 32
+
+# Rows located together, bounds the temporary arrays of locate()
+LOCATE_ROWS = 65536
+
+# Codes of the text end and sequence separator, residues follow them
+END, SEPARATOR = 0, 1
+
+
+def parse_pattern(target):
+    """Returns a list of allowed residue sets, one per position, of a
+    fixed length regular expression made of residues, '.' and [...] classes.
+    '.' and negated classes [^...] are returned as (True, residues) pairs of
+    excluded residues. Returns None for any other regular expression
+    """
+    pattern = list()
+    k = 0
+
+    while k < len(target):
+        symbol = target[k]
+
+        if symbol.isalpha():
+            pattern.append((False, frozenset(symbol)))
+
+        elif symbol == '.':
+            pattern.append((True, frozenset()))
+
+        elif symbol == '[':
+            end = target.find(']', k + 1)
+            residues = target[k + 1:end]
+            negated = residues.startswith('^')
+            residues = residues[1:] if negated else residues
+
+            if end == -1 or not residues or not residues.isalpha():
+                return None
+
+            pattern.append((negated, frozenset(residues)))
+            k = end
+
+        else:
+            return None
+
+        k += 1
+
+    return pattern if pattern else None
+
+
+def suffix_array(text):
+    """Returns the suffix array of an integer array whose last element is
+    the only smallest one, sorted by prefix doubling
+    """
+    n = len(text)
+    rank = text.astype(np.int64)
+    step = 1
+
+    while True:
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - step] = rank[step:]
+
+        order = np.lexsort((second, rank))
+
+        rank_sorted, second_sorted = rank[order], second[order]
+        new_group = (rank_sorted[1:] != rank_sorted[:-1]) | \
+            (second_sorted[1:] != second_sorted[:-1])
+
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.concatenate(([0], np.cumsum(new_group)))
+
+        if rank[order[-1]] == n - 1:
+            return order
+
+        step *= 2
+
+
+class FMIndex:
+    """
+    FM-index of sequences given as a list of (key, sequence)
+    """
+
+    def __init__(self, sequences):
+        self.keys = [key for key, _ in sequences]
+
+        residues = sorted(set(''.join(sequence for _, sequence in sequences)))
+        self.residues = residues
+        self.codes = dict((residue, code + 2)
+                          for code, residue in enumerate(residues))
+
+        # text offsets where sequences start
+        self.starts = list()
+        start = 0
+        for _, sequence in sequences:
+            self.starts.append(start)
+            start += len(sequence) + 1
+
+        # ASCII -> code table, the separator and the end are chr(1) and chr(0)
+        table = np.zeros(256, dtype=np.int64)
+        table[SEPARATOR] = SEPARATOR
+        for residue, code in self.codes.items():
+            table[ord(residue)] = code
+
+        text = chr(SEPARATOR).join(sequence for _, sequence in sequences) + \
+            chr(SEPARATOR) + chr(END)
+
+        self.build(table[np.frombuffer(text.encode('ascii'), dtype=np.uint8)])
+
+    def build(self, text):
+        """Builds BWT, occurrence checkpoints and suffix array samples"""
+        n = len(text)
+        alphabet_size = len(self.residues) + 2
+        array = suffix_array(text)
+
+        self.size = n
+        self.bwt = text[array - 1].astype(np.uint8)
+
+        # first[c] - the first row of suffixes starting with residue c
+        counts = np.bincount(text, minlength=alphabet_size)
+        self.first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        # checkpoints[k, c] - occurrences of c in bwt[:k * CHECKPOINT]
+        self.checkpoints = np.zeros(
+            (n // CHECKPOINT + 1, alphabet_size), dtype=np.int32)
+        for code in range(alphabet_size):
+            self.checkpoints[1:, code] = np.cumsum(self.bwt == code)[
+                CHECKPOINT - 1::CHECKPOINT][:n // CHECKPOINT]
+
+        # bwt padded to whole checkpoint blocks for counting in blocks
+        self.blocks = np.zeros(
+            (n // CHECKPOINT + 1) * CHECKPOINT, dtype=np.uint8)
+        self.blocks[:n] = self.bwt
+        self.blocks = self.blocks.reshape(-1, CHECKPOINT)
+
+        # sorted rows whose suffix starts at a multiple of SAMPLE and
+        # text positions of their suffixes
+        self.sample_rows = np.nonzero(array % SAMPLE == 0)[0]
+        self.sample_positions = array[self.sample_rows]
+
+    def occurrences(self, code, row):
+        """Returns the number of occurrences of code in bwt[:row]"""
+        block = row // CHECKPOINT
+
+        return int(self.checkpoints[block, code]) + int(
+            np.count_nonzero(self.bwt[block * CHECKPOINT:row] == code))
+
+    def extend(self, code, lo, hi):
+        """Returns rows of suffixes starting with code followed by any of
+        the suffixes of rows lo...hi - 1
+        """
+        first = int(self.first[code])
+
+        return first + self.occurrences(code, lo), \
+            first + self.occurrences(code, hi)
+
+    def count(self, pattern):
+        """Returns the number of exact occurrences of a residue string"""
+        lo, hi = 0, self.size
+
+        for residue in reversed(pattern):
+            if residue not in self.codes or lo >= hi:
+                return 0
+
+            lo, hi = self.extend(self.codes[residue], lo, hi)
+
+        return max(hi - lo, 0)
+
+    def search(self, pattern, mismatches=0):
+        """Returns suffix array row intervals of all occurrences of a parsed
+        pattern with at most given number of mismatches
+        """
+        intervals = list()
+        stack = [(len(pattern), 0, self.size, 0)]
+
+        while stack:
+            position, lo, hi, used = stack.pop()
+
+            if position == 0:
+                intervals.append((lo, hi))
+                continue
+
+            negated, residues = pattern[position - 1]
+
+            for residue in self.residues:
+                allowed = (residue in residues) != negated
+                if not allowed and used == mismatches:
+                    continue
+
+                new_lo, new_hi = self.extend(self.codes[residue], lo, hi)
+                if new_lo < new_hi:
+                    stack.append((position - 1, new_lo, new_hi,
+                                  used + (not allowed)))
+
+        return intervals
+
+    def block_occurrences(self, codes, rows):
+        """Returns the numbers of occurrences of codes[k] in bwt[:rows[k]]
+        for arrays of codes and rows
+        """
+        block, offset = np.divmod(rows, CHECKPOINT)
+        before = np.arange(CHECKPOINT) < offset[:, None]
+
+        return self.checkpoints[block, codes] + np.count_nonzero(
+            (self.blocks[block] == codes[:, None]) & before, axis=1)
+
+    def locate(self, rows):
+        """Returns an array of text positions of suffixes of given rows.
+        All rows step back through the text together until they reach
+        a sampled suffix, at most SAMPLE - 1 steps
+        """
+        rows = np.array(rows, dtype=np.int64)
+        positions = np.empty(len(rows), dtype=np.int64)
+        steps = 0
+        # indices of rows which did not reach a sample yet
+        pending = np.arange(len(rows))
+
+        while len(pending):
+            current = rows[pending]
+            sample = np.searchsorted(self.sample_rows, current)
+            sample[sample == len(self.sample_rows)] = 0
+            sampled = self.sample_rows[sample] == current
+
+            positions[pending[sampled]] = \
+                self.sample_positions[sample[sampled]] + steps
+
+            pending, current = pending[~sampled], current[~sampled]
+            codes = self.bwt[current]
+            rows[pending] = self.first[codes] + \
+                self.block_occurrences(codes, current)
+            steps += 1
+
+        return positions
+
+    def find(self, pattern, mismatches=0):
+        """Returns a dict: key -> sorted sequence offsets of all occurrences
+        of a parsed pattern with at most given number of mismatches
+        """
+        found = dict()
+
+        intervals = self.search(pattern, mismatches)
+        if not intervals:
+            return found
+
+        rows = np.concatenate([np.arange(lo, hi) for lo, hi in intervals])
+        positions = np.sort(np.concatenate([
+            self.locate(rows[start:start + LOCATE_ROWS])
+            for start in range(0, len(rows), LOCATE_ROWS)]))
+
+        starts = np.array(self.starts, dtype=np.int64)
+        numbers = np.searchsorted(starts, positions, side='right') - 1
+        offsets = positions - starts[numbers]
+
+        for number, offset in zip(numbers.tolist(), offsets.tolist()):
+            found.setdefault(self.keys[number], list()).append(offset)
+
+        return found
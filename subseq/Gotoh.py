@@ -0,0 +1,249 @@
+"""Description
+
+This module provides classes for local and global alignment with affine gap
+costs using the Gotoh algorithm.
+
+A gap of length k costs gap_open + (k - 1) * gap_extend, so gap_open equal to
+gap_extend gives the linear gap cost of SmithWaterman and NeedlemanWunch.
+
+Only two rows of scores are kept while the matrix is filled. Each cell
+leaves one byte in a traceback matrix which records where the best score of
+each of the three states came from:
+    bits 0-1 - H state source: end, diagonal, up (F state), left (E state)
+    bit 2    - F state (gap in subject) extends the gap from the cell above
+    bit 3    - E state (gap in target) extends the gap from the cell on the left
+"""
+
+END, DIAGONAL, UP, LEFT = range(4)
+F_EXTEND = 4
+E_EXTEND = 8
+
+NO_SCORE = float('-inf')
+
+
+class Gotoh:
+    """
+    Base class of affine gap cost alignments. Fills score rows and
+    the traceback matrix
+    """
+    local = False
+
+    def __init__(self, target, sequence, gap_open, gap_extend, sub_matrix,
+                 sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_open = float(gap_open)
+        self.gap_extend = float(gap_extend)
+        self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+
+        self.best_score = 0
+        self.best_score_coordinates = list()
+        self.alignment_score = 0
+
+        self.traceback_matrix = bytearray(
+            (len(target) + 1) * (len(sequence) + 1))
+
+        self.fill_score_matrix()
+
+    def gap_score(self, length):
+        """Returns score of a gap with given length. With gap_open equal to
+        gap_extend it is the very same float NeedlemanWunch puts on the
+        border of the score matrix, inner cells subtract gap costs one by
+        one in both
+        """
+        if length == 0:
+            return 0.
+
+        return -self.gap_extend * length - (self.gap_open - self.gap_extend)
+
+    def fill_score_matrix(self):
+        """Fills score rows one by one and records traceback of each cell"""
+        gap_open, gap_extend = self.gap_open, self.gap_extend
+        traceback_matrix = self.traceback_matrix
+        width = len(self.sequence) + 1
+        local = self.local
+        sequence_codes = self.sequence_codes
+
+        if local:
+            h_row = [0.] * width
+        else:
+            h_row = self.first_row(width - 1)
+
+        f_row = [NO_SCORE] * width
+
+        for i in range(1, len(self.target) + 1):
+            scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+
+            h_left = 0. if local else self.gap_score(i)
+            e = NO_SCORE
+            new_h_row = [h_left]
+            position = i * width
+
+            for j in range(1, width):
+                position += 1
+
+                # E state - gap in target
+                open_score = h_left - gap_open
+                extend_score = e - gap_extend
+                if open_score >= extend_score:
+                    e = open_score
+                    pointer = 0
+                else:
+                    e = extend_score
+                    pointer = E_EXTEND
+
+                # F state - gap in subject
+                open_score = h_row[j] - gap_open
+                extend_score = f_row[j] - gap_extend
+                if open_score >= extend_score:
+                    f = open_score
+                else:
+                    f = extend_score
+                    pointer |= F_EXTEND
+                f_row[j] = f
+
+                diagonal_score = h_row[j - 1] + scores[sequence_codes[j - 1]]
+
+                score = max(diagonal_score, f, e)
+
+                if local and score <= 0:
+                    score = 0.
+                elif score == diagonal_score:
+                    pointer |= DIAGONAL
+                elif score == f:
+                    pointer |= UP
+                else:
+                    pointer |= LEFT
+
+                traceback_matrix[position] = pointer
+                new_h_row.append(score)
+                h_left = score
+
+                if local:
+                    if score > self.best_score:
+                        self.best_score = score
+                        self.best_score_coordinates = [(i, j)]
+                    elif score == self.best_score:
+                        self.best_score_coordinates.append((i, j))
+
+            h_row = new_h_row
+
+        self.set_end(h_row)
+
+    def first_row(self, width):
+        """Returns the first row of the score matrix"""
+        return [self.gap_score(j) for j in range(width + 1)]
+
+    def set_end(self, last_row):
+        """Sets the alignment score and the column where the alignment
+        ends from the last row of the score matrix
+        """
+        self.end_column = len(last_row) - 1
+        self.alignment_score = last_row[-1]
+
+    def trace(self, i, j):
+        """Follows the traceback matrix from H state of cell (i, j).
+        Returns reversed alignment strings and the cell where it stopped
+        """
+        aligned_target = list()
+        aligned_subject = list()
+
+        traceback_matrix = self.traceback_matrix
+        width = len(self.sequence) + 1
+
+        # H state is marked as DIAGONAL, F state as UP and E state as LEFT
+        state = DIAGONAL
+
+        while i > 0 and j > 0:
+            pointer = traceback_matrix[i * width + j]
+
+            if state == DIAGONAL:
+                state = pointer & 3
+
+                if state == END:
+                    break
+
+                if state == DIAGONAL:
+                    aligned_target.append(self.target[i - 1])
+                    aligned_subject.append(self.sequence[j - 1])
+
+                    i -= 1
+                    j -= 1
+
+            elif state == UP:
+                aligned_target.append(self.target[i - 1])
+                aligned_subject.append('-')
+
+                if not pointer & F_EXTEND:
+                    state = DIAGONAL
+
+                i -= 1
+
+            elif state == LEFT:
+                aligned_target.append('-')
+                aligned_subject.append(self.sequence[j - 1])
+
+                if not pointer & E_EXTEND:
+                    state = DIAGONAL
+
+                j -= 1
+
+        return aligned_target, aligned_subject, i, j
+
+
+class GotohSmithWaterman(Gotoh):
+    """
+    Local alignment with affine gap costs. Provides the same methods as
+    SmithWaterman.SmithWaterman
+    """
+    local = True
+
+    def get_coordinates(self):
+        """Retruns a list of tuples (i, j)
+        where i and j are coordinates of the best score
+        """
+        return self.best_score_coordinates
+
+    def get_best_score(self):
+        """Returns the best score"""
+        return self.best_score
+
+    def get_traceback(self, i, j):
+        """Returns constructed alignment strings for target and subject and
+        values of i, j where alignment begins
+        """
+        aligned_target, aligned_subject, i, j = self.trace(i, j)
+
+        # a cell scoring zero aligns its own residues, like in SmithWaterman
+        if not aligned_target:
+            return self.target[i - 1], self.sequence[j - 1], i, j
+
+        aligned_target = ''.join(reversed(aligned_target))
+        aligned_subject = ''.join(reversed(aligned_subject))
+
+        return aligned_target, aligned_subject, i + 1, j + 1
+
+
+class GotohNeedlemanWunsch(Gotoh):
+    """
+    Global alignment with affine gap costs. Provides the same methods as
+    NeedlemanWunch.NeedlemanWunsch
+    """
+
+    def get_traceback(self):
+        """Returns constructed alignment strings for target and subject and
+        values of i, j where alignment begins
+        """
+        aligned_target, aligned_subject, i, j = self.trace(
+            len(self.target), self.end_column)
+
+        aligned_target = ''.join(reversed(aligned_target))
+        aligned_subject = ''.join(reversed(aligned_subject))
+
+        return aligned_target, aligned_subject, i, j
+
+    def get_alignment_score(self):
+        """Returns aligment score"""
+        return self.alignment_score
@@ -0,0 +1,255 @@
+"""Description
+
+This module provides a divide-and-conquer (Hirschberg) version of the
+Needleman-Wunsch algorithm which never keeps the whole score matrix in memory.
+Wikipedia link: https://en.wikipedia.org/wiki/Hirschberg%27s_algorithm
+
+The traceback is the same one NeedlemanWunch.NeedlemanWunsch produces.
+A block of the score matrix from (i0, j0) to (i1, j1) is split like this:
+    1) rows i0..i1 are filled from row i0, every cell below the middle row
+       carries the column where its traceback reaches the middle row
+    2) the traceback from (i1, j1) crosses the middle row at (middle, j),
+       so the block splits into (i0, j0)..(middle, j) and (middle, j)..(i1, j1)
+    3) both halves are traced back on their own, starting from their first
+       row and the column on their left
+Together the halves cover at most half of the block, so the whole traceback
+takes about twice the time of filling the score matrix once. Only the first
+rows of pending blocks are held, they cover disjoint columns.
+"""
+
+
+class Hirschberg:
+    """
+    This class performs nucleotide or protein sequence alignment using
+    the Needleman-Wunsch algorithm in linear memory
+    """
+
+    # Below this many score matrix cells a block is traced back directly
+    block_size = 4096
+
+    def __init__(self, target, sequence, gap_cost, sub_matrix,
+                 sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+
+        self.set_end(self.forward_row(
+            self.first_row(len(sequence)), 0, len(target)))
+
+    def first_row(self, width):
+        """Returns the first row of the score matrix"""
+        return [-self.gap_cost * j for j in range(width + 1)]
+
+    def forward_row(self, row, i0, i1, j0=0):
+        """Returns row i1 of the score matrix computed from row i0,
+        rows hold columns j0 onwards
+        """
+        for i in range(i0 + 1, i1 + 1):
+            row = self.next_row(row, i, j0)
+
+        return row
+
+    def next_row(self, up_row, i, j0=0):
+        """Returns row i of the score matrix computed from row i - 1,
+        rows hold columns j0 onwards. Column j0 is the left edge of
+        a block, below its first row it is reached only by gaps
+        """
+        scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+        sequence_codes = self.sequence_codes
+
+        if j0 == 0:
+            row = [-self.gap_cost * i]
+        else:
+            row = [up_row[0] - self.gap_cost]
+
+        for j in range(1, len(up_row)):
+            similarity = scores[sequence_codes[j0 + j - 1]]
+
+            diagonal_score = up_row[j - 1] + similarity
+            up_score = up_row[j] - self.gap_cost
+            left_score = row[j - 1] - self.gap_cost
+
+            row.append(max(diagonal_score, up_score, left_score))
+
+        return row
+
+    def next_crossings(self, up_row, up_crossings, i, j0):
+        """Returns row i of the score matrix computed from row i - 1 and
+        the columns where tracebacks from cells of row i reach the row
+        up_crossings belong to. Tracebacks ending in column 0 cross at -1
+        """
+        scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+        sequence_codes = self.sequence_codes
+
+        if j0 == 0:
+            row = [-self.gap_cost * i]
+            crossings = [-1]
+        else:
+            row = [up_row[0] - self.gap_cost]
+            crossings = [up_crossings[0]]
+
+        for j in range(1, len(up_row)):
+            similarity = scores[sequence_codes[j0 + j - 1]]
+
+            diagonal_score = up_row[j - 1] + similarity
+            up_score = up_row[j] - self.gap_cost
+            left_score = row[j - 1] - self.gap_cost
+
+            score = max(diagonal_score, up_score, left_score)
+
+            if score == diagonal_score:
+                crossings.append(up_crossings[j - 1])
+            elif score == up_score:
+                crossings.append(up_crossings[j])
+            else:
+                crossings.append(crossings[j - 1])
+
+            row.append(score)
+
+        return row, crossings
+
+    def set_end(self, last_row):
+        """Sets the alignment score and the column where the alignment
+        ends from the last row of the score matrix
+        """
+        self.end_column = len(last_row) - 1
+        self.alignment_score = last_row[-1]
+
+    def get_alignment_score(self):
+        """Returns aligment score"""
+        return self.alignment_score
+
+    def get_traceback(self):
+        """Finds the optimal path through the score matrix.
+        Returns constructed alignment strings for target and subject and
+        values of i, j where alignment begins
+        """
+        aligned_target = list()
+        aligned_subject = list()
+
+        i, j = len(self.target), self.end_column
+
+        if i != 0 and j != 0:
+            i, j = self.traceback(0, 0, i, j, self.first_row(j),
+                                  aligned_target, aligned_subject)
+
+        aligned_target = ''.join(reversed(aligned_target))
+        aligned_subject = ''.join(reversed(aligned_subject))
+
+        return aligned_target, aligned_subject, i, j
+
+    def traceback(self, i0, j0, i1, j1, row, aligned_target, aligned_subject):
+        """Traces back from (i1, j1) until row i0 is reached, `row` is
+        row i0 of the score matrix from column j0 to j1. Appends aligned
+        residues in reversed order and returns the coordinates where
+        the traceback stopped
+        """
+        if (i1 - i0) * (j1 - j0 + 1) <= self.block_size or i1 - i0 == 1:
+            block = [row]
+            for i in range(i0 + 1, i1 + 1):
+                block.append(self.next_row(block[-1], i, j0))
+
+            return self.block_traceback(
+                i0, j0, i1, j1, block, aligned_target, aligned_subject)
+
+        middle = (i0 + i1) // 2
+        middle_row = self.forward_row(row, i0, middle, j0)
+
+        crossings = list(range(j0, j1 + 1))
+        lower_row = middle_row
+        for i in range(middle + 1, i1 + 1):
+            lower_row, crossings = self.next_crossings(
+                lower_row, crossings, i, j0)
+
+        j = crossings[-1]
+        del lower_row, crossings
+
+        if j == -1:
+            # the traceback ends in column 0 below the middle row
+            return self.traceback(middle, 0, i1, j1, middle_row,
+                                  aligned_target, aligned_subject)
+
+        # only the columns of the upper half are kept while the lower half
+        # is traced back
+        row = row[:j - j0 + 1]
+        middle_row = middle_row[j - j0:]
+
+        self.traceback(middle, j, i1, j1, middle_row,
+                       aligned_target, aligned_subject)
+
+        del middle_row
+
+        if j == 0:
+            return middle, j
+
+        return self.traceback(i0, j0, middle, j, row,
+                              aligned_target, aligned_subject)
+
+    def block_traceback(
+            self, i0, j0, i1, j, block, aligned_target, aligned_subject):
+        """Traces back from (i1, j) through block of score matrix rows
+        i0..i1 holding columns j0 onwards until row i0 or the end of
+        the alignment is reached
+        """
+        end, diagonal, up, left = range(4)
+
+        i = i1
+
+        while i > i0:
+            move = self.next_move(block, i - i0, i, j - j0, j)
+
+            if move == end:
+                break
+
+            if move == diagonal:
+                aligned_target.append(self.target[i - 1])
+                aligned_subject.append(self.sequence[j - 1])
+
+                i -= 1
+                j -= 1
+
+            elif move == up:
+                aligned_target.append(self.target[i - 1])
+                aligned_subject.append('-')
+
+                i -= 1
+
+            elif move == left:
+                aligned_target.append('-')
+                aligned_subject.append(self.sequence[j - 1])
+
+                j -= 1
+
+        return i, j
+
+    def next_move(self, block, k, i, l, j):
+        """Looks for the next move during traceback, k and l are the block
+        row and column of score matrix cell (i, j). Moves are chosen in the
+        same order as NeedlemanWunch.NeedlemanWunsch.next_move chooses them
+        """
+        if i == 0 or j == 0:
+            # return END
+            return 0
+
+        if l == 0:
+            # the left edge of a block is reached only by up moves
+            return 2
+
+        similarity = self.sub_matrix.scores[self.target_codes[i - 1]][
+            self.sequence_codes[j - 1]]
+        achieved_score = block[k][l]
+
+        if achieved_score == block[k - 1][l - 1] + similarity:
+            # return diagonal move
+            return 1
+
+        if achieved_score == block[k - 1][l] - self.gap_cost:
+            # return up move
+            return 2
+
+        if achieved_score == block[k][l - 1] - self.gap_cost:
+            # return left move
+            return 3
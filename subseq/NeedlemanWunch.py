@@ -1,3 +1,4 @@
+import TracebackMatrix
 
 
 class NeedlemanWunsch:
@@ -5,47 +6,66 @@ class NeedlemanWunsch:
     This class performs nucleotide or protein sequence alignment using
     the Needleman-Wunsch algorithm
     """
-    def __init__(self, target, sequence, gap_cost, sub_matrix):
+    def __init__(self, target, sequence, gap_cost, sub_matrix,
+                 sequence_codes=None):
         self.target = target
         self.sequence = sequence
         self.gap_cost = float(gap_cost)
         self.sub_matrix = sub_matrix
-        self.score_matrix = [[0 for _ in range(len(sequence) + 1)]
-                             for _ in range(len(target) + 1)]
-        self.init_score_matrix()
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+        self.traceback_matrix = TracebackMatrix.TracebackMatrix(
+            len(target) + 1, len(sequence) + 1)
         self.fill_score_matrix()
 
-    def init_score_matrix(self):
-        """Initialization of scoring matrix"""
-        for i in range(len(self.target) + 1):
-            self.score_matrix[i][0] = -self.gap_cost * i
-        for j in range(len(self.sequence) + 1):
-            self.score_matrix[0][j] = -self.gap_cost * j
-
     def fill_score_matrix(self):
-        """Fills core matrix with scores representing trial alignments
-        of the two sequences
+        """Fills core matrix row by row with scores representing trial
+        alignments of the two sequences and records the move leading to
+        every cell. Only two rows of the score matrix are kept
         """
-        for i in range(1, len(self.score_matrix)):
-            for j in range(1, len(self.score_matrix[i])):
-                score = self.calculate_score(i, j)
+        end, diagonal, up, left = range(4)
 
-                self.score_matrix[i][j] = score
+        up_row = self.first_row(len(self.sequence))
 
-    def calculate_score(self, i, j):
-        """Calculates score for given i and j position in the score matrix
-        The score is based on the upper-left, left and up elements
-        """
-        aa1 = self.target[i - 1]
-        aa2 = self.sequence[j - 1]
+        for i in range(1, len(self.target) + 1):
+            scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+            row = [-self.gap_cost * i]
+            moves = [end]
+
+            for j in range(1, len(self.sequence) + 1):
+                similarity = scores[self.sequence_codes[j - 1]]
+
+                diagonal_score = up_row[j - 1] + similarity
+                up_score = up_row[j] - self.gap_cost
+                left_score = row[j - 1] - self.gap_cost
+
+                score = max(diagonal_score, up_score, left_score)
+
+                if score == diagonal_score:
+                    move = diagonal
+                elif score == up_score:
+                    move = up
+                else:
+                    move = left
 
-        similarity = float(self.sub_matrix[aa1, aa2])
+                row.append(score)
+                moves.append(move)
 
-        diagonal_score = self.score_matrix[i - 1][j - 1] + similarity
-        up_score = self.score_matrix[i - 1][j] - self.gap_cost
-        left_score = self.score_matrix[i][j - 1] - self.gap_cost
+            self.traceback_matrix.set_row(i, moves)
+            up_row = row
 
-        return max(diagonal_score, up_score, left_score)
+        self.set_end(up_row)
+
+    def first_row(self, width):
+        """Returns the first row of the score matrix"""
+        return [-self.gap_cost * j for j in range(width + 1)]
+
+    def set_end(self, last_row):
+        """Sets the alignment score and the column where the alignment
+        ends from the last row of the score matrix
+        """
+        self.end_column = len(last_row) - 1
+        self.alignment_score = last_row[-1]
 
     def get_traceback(self):
         """Finds the optimal path through the score matrix.
@@ -57,7 +77,7 @@ class NeedlemanWunsch:
 
         end, diagonal, up, left = range(4)
 
-        i, j = len(self.target), len(self.sequence)
+        i, j = len(self.target), self.end_column
 
         move = self.next_move(i, j)
 
@@ -90,32 +110,11 @@ class NeedlemanWunsch:
 
     def next_move(self, i, j):
         """Looks for the next move during traceback.
-        Moves are determined by the score of three upper-left, left and up
-        in the score matrix
+        Moves are recorded in the traceback matrix while it is filled,
+        the first row and column hold END moves
         """
-        aa1 = self.target[i - 1]
-        aa2 = self.sequence[j - 1]
-        achieved_score = self.score_matrix[i][j]
-        diagonal = self.score_matrix[i - 1][j - 1]
-        up = self.score_matrix[i - 1][j]
-        left = self.score_matrix[i][j - 1]
-
-        if i == 0 or j == 0:
-            # return END
-            return 0
-
-        if achieved_score == diagonal + int(self.sub_matrix[aa1, aa2]):
-            # return diagonal move
-            return 1
-
-        if achieved_score == up - self.gap_cost:
-            # return up move
-            return 2
-
-        if achieved_score == left - self.gap_cost:
-            # return left move
-            return 3
+        return self.traceback_matrix[i, j]
 
     def get_alignment_score(self):
         """Returns aligment score"""
-        return self.score_matrix[-1][-1]
+        return self.alignment_score
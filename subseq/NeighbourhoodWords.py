@@ -0,0 +1,120 @@
+"""Description
+
+This module provides the BLAST two-hit prefilter for protein searches.
+
+The neighbourhood of a target word (word_size residues) is every word which
+scores at least `threshold` against it under the substitution matrix. All
+neighbourhood words of the target are put into a lookup table indexed by
+word code, so a chain is scanned in one pass. Alignment is triggered only
+when two non-overlapping hits lie on the same diagonal within `window`
+residues, which keeps the sensitivity of short similar words but throws off
+most random hits. A target shorter than two words cannot hold two
+non-overlapping hits, every single hit triggers alignment then.
+
+Altschul SF et al. Gapped BLAST and PSI-BLAST: a new generation of protein
+database search programs. Nucleic Acids Res, 1997, 25(17):3389-3402
+"""
+
+# BLAST protein search defaults
+WORD_SIZE = 3
+WINDOW = 40
+
+
+class NeighbourhoodWords:
+    """
+    Lookup table of target neighbourhood words
+    """
+
+    def __init__(self, target, sub_matrix, threshold=11.,
+                 word_size=WORD_SIZE, window=WINDOW):
+        self.target = target
+        self.sub_matrix = sub_matrix
+        self.threshold = float(threshold)
+        self.word_size = word_size
+        self.window = window
+
+        self.alphabet_size = len(sub_matrix.scores)
+
+        # two non-overlapping hits need two words of the target
+        self.two_hit = len(target) >= 2 * word_size
+
+        # table[word code] - target positions of words having it in their
+        # neighbourhood
+        self.table = [()] * self.alphabet_size ** word_size
+
+        self.fill_table()
+
+    def get_neighbours(self, codes):
+        """Returns codes of all words scoring at least threshold against
+        the word of given residue codes
+        """
+        rows = [self.sub_matrix.scores[code] for code in codes]
+
+        # bound[k] - the best score residues k... can add
+        bound = [0] * (len(rows) + 1)
+        for k in range(len(rows) - 1, -1, -1):
+            bound[k] = bound[k + 1] + max(rows[k])
+
+        words = [(0, 0)]
+        for k, row in enumerate(rows):
+            words = [(word * self.alphabet_size + code, score + code_score)
+                     for word, score in words
+                     for code, code_score in enumerate(row)
+                     if score + code_score + bound[k + 1] >= self.threshold]
+
+        return [word for word, _ in words]
+
+    def fill_table(self):
+        """Puts neighbourhood words of every target word into the table"""
+        target_codes = self.sub_matrix.encode(self.target)
+        positions = dict()
+
+        for q in range(len(target_codes) - self.word_size + 1):
+            for word in self.get_neighbours(
+                    target_codes[q:q + self.word_size]):
+                positions.setdefault(word, list()).append(q)
+
+        for word, word_positions in positions.items():
+            self.table[word] = tuple(word_positions)
+
+    def get_anchors(self, sequence, sequence_codes=None):
+        """Returns (i, j) anchors of two-hit triggers of the sequence:
+        the middle residues of the second hit. Anchors of a short target
+        are the middle residues of every hit
+        """
+        word_size, window, table = self.word_size, self.window, self.table
+        two_hit = self.two_hit
+        modulo = self.alphabet_size ** word_size
+        middle = word_size // 2
+
+        # diagonal -> sequence offset of the last hit
+        last_hits = dict()
+        anchors = list()
+        word = 0
+
+        for j, code in enumerate(
+                self.sub_matrix.encode(sequence, sequence_codes)):
+            word = (word * self.alphabet_size + code) % modulo
+            o = j - word_size + 1
+
+            if o < 0:
+                continue
+
+            for q in table[word]:
+                if not two_hit:
+                    anchors.append((q + middle, o + middle))
+                    continue
+
+                diagonal = o - q
+                last_hit = last_hits.get(diagonal)
+
+                # a hit overlapping the last one on the diagonal is ignored
+                if last_hit is not None and o - last_hit < word_size:
+                    continue
+
+                if last_hit is not None and o - last_hit <= window:
+                    anchors.append((q + middle, o + middle))
+
+                last_hits[diagonal] = o
+
+        return anchors
@@ -0,0 +1,78 @@
+"""Description
+
+This module provides compact storage of residue ids (resi) of a chain.
+
+Residue numbers are kept in an integer array. The few ids which are not
+plain numbers, residues with insertion codes like 52A, are kept whole in
+a side table. A run of residues is turned into a PyMOL resi list of ranges
+('10-20+22+52A') with array slicing, so a long hit costs a few NumPy
+operations instead of one selection item per residue.
+"""
+import re
+from array import array
+
+import numpy as np
+
+
+class ResidueIds:
+    """
+    Residue ids of a chain given as a list of resi strings
+    """
+
+    def __init__(self, ids=()):
+        self.numbers = array('l')
+        # offset -> resi of ids which are not plain numbers
+        self.names = dict()
+
+        for resi in ids:
+            self.append(resi)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, offset):
+        if offset < 0:
+            offset += len(self.numbers)
+
+        if offset in self.names:
+            return self.names[offset]
+
+        return str(self.numbers[offset])
+
+    def append(self, resi):
+        """Appends a resi string"""
+        match = re.match(r'-?\d+', resi)
+        number = int(match.group()) if match else 0
+
+        if str(number) != resi:
+            self.names[len(self.numbers)] = resi
+
+        self.numbers.append(number)
+
+    def get_selection(self, start, end):
+        """Returns a PyMOL resi list of residues start...end - 1 made of
+        ranges of consecutive numbers and single ids
+        """
+        numbers = np.frombuffer(self.numbers, dtype=np.dtype('l'))[start:end]
+
+        # offsets where a range can not go on: numbers are not consecutive,
+        # the id is not a plain number or the number is negative, which
+        # would be read as a range
+        single = [offset - start for offset in self.names
+                  if start <= offset < end]
+        single.extend(np.nonzero(numbers < 0)[0].tolist())
+
+        bounds = set((np.nonzero(np.diff(numbers) != 1)[0] + 1).tolist())
+        bounds.update(single)
+        bounds.update(offset + 1 for offset in single)
+        bounds.update((0, len(numbers)))
+        bounds = sorted(bounds)
+
+        items = list()
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if hi - lo == 1:
+                items.append(self[start + lo])
+            else:
+                items.append('{0}-{1}'.format(numbers[lo], numbers[hi - 1]))
+
+        return '+'.join(items)
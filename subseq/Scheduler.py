@@ -0,0 +1,78 @@
+"""Description
+
+This module provides a scheduler which runs alignment tasks on a pool of
+worker processes.
+
+Work is split into tasks of consecutive chains holding roughly the same
+number of score matrix cells. Results are yielded in task order, so they are
+merged back in the same model/chain order the serial search uses. This module
+must not import pymol: worker processes import the task functions by name.
+"""
+import multiprocessing
+
+# Tasks per worker process, more tasks balance the load better
+TASKS_PER_PROCESS = 4
+
+
+def split_tasks(items, sizes, parts):
+    """Splits items into at most about `parts` lists of consecutive items
+    with similar total sizes. Items larger than one part are left alone
+    """
+    part_size = float(sum(sizes)) / max(parts, 1)
+    tasks = list()
+    task, task_size = list(), 0
+
+    for item, size in zip(items, sizes):
+        if task and task_size + size > part_size:
+            tasks.append(task)
+            task, task_size = list(), 0
+
+        task.append(item)
+        task_size += size
+
+    if task:
+        tasks.append(task)
+
+    return tasks
+
+
+class Scheduler:
+    """
+    Runs tasks on a process pool started on the first use.
+    With a single process tasks are run one by one in this process
+    """
+
+    def __init__(self, processes=1):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.pool = None
+
+    def get_parts(self):
+        """Returns the number of tasks work should be split into"""
+        if self.processes == 1:
+            return 1
+
+        return self.processes * TASKS_PER_PROCESS
+
+    def map(self, worker, tasks):
+        """Returns an iterator of worker(task) results in task order"""
+        if self.processes == 1 or len(tasks) <= 1:
+            return (worker(task) for task in tasks)
+
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes)
+
+        return self.pool.imap(worker, tasks)
+
+    def cancel(self):
+        """Cancels outstanding tasks by terminating the pool"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def close(self):
+        """Waits for the workers to finish and stops the pool"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,157 @@
+"""Description
+
+This module provides score only versions of the Smith-Waterman and
+Needleman-Wunsch algorithms used to throw off chains before the score matrix
+is filled.
+
+Only two rows of the score matrix are kept. After every row an upper bound of
+the final score is calculated: each of the remaining target residues can add
+at most its best substitution score. As soon as the bound can not pass the
+minimum score, the chain is abandoned.
+"""
+
+
+def passes(score, max_score, min_score):
+    """Checks if score passes the minimum score given in percentages"""
+    return max(float(score) / max_score * 100, 0) >= min_score
+
+
+def remaining_scores(target_codes, sequence_codes, sub_matrix):
+    """Returns a list where k-th element is the highest score which can be
+    added by aligning target[k:] to the sequence
+    """
+    codes = set(sequence_codes)
+    remaining = [0] * (len(target_codes) + 1)
+
+    for k in range(len(target_codes) - 1, -1, -1):
+        scores = sub_matrix.scores[target_codes[k]]
+        best = max([scores[code] for code in codes] or [0])
+        remaining[k] = remaining[k + 1] + max(0, best)
+
+    return remaining
+
+
+def local_alignment_score(
+        target, sequence, gap_cost, sub_matrix, max_score, min_score,
+        sequence_codes=None):
+    """Returns the same best score as SmithWaterman.get_best_score() or None
+    if the best score can not pass the minimum score
+    """
+    gap_cost = float(gap_cost)
+    target_codes = sub_matrix.encode(target)
+    sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+    remaining = remaining_scores(target_codes, sequence_codes, sub_matrix)
+
+    if not passes(remaining[0], max_score, min_score):
+        return None
+
+    best_score = 0
+    up_row = [0] * (len(sequence) + 1)
+
+    for i in range(1, len(target) + 1):
+        scores = sub_matrix.scores[target_codes[i - 1]]
+        row = [0]
+
+        for j in range(1, len(sequence) + 1):
+            similarity = scores[sequence_codes[j - 1]]
+
+            diagonal_score = up_row[j - 1] + similarity
+            up_score = up_row[j] - gap_cost
+            left_score = row[j - 1] - gap_cost
+
+            row.append(max(0, diagonal_score, up_score, left_score))
+
+        row_best_score = max(row)
+        best_score = max(best_score, row_best_score)
+
+        # alignments ending below can start from any cell of this row
+        bound = max(best_score, row_best_score + remaining[i])
+        if not passes(bound, max_score, min_score):
+            return None
+
+        up_row = row
+
+    return best_score
+
+
+def global_alignment_score(
+        target, sequence, gap_cost, sub_matrix, max_score, min_score,
+        sequence_codes=None):
+    """Returns the same score as NeedlemanWunsch.get_alignment_score() or
+    None if the score can not pass the minimum score
+    """
+    gap_cost = float(gap_cost)
+    n, m = len(target), len(sequence)
+    target_codes = sub_matrix.encode(target)
+    sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+    remaining = remaining_scores(target_codes, sequence_codes, sub_matrix)
+
+    up_row = [-gap_cost * j for j in range(m + 1)]
+
+    for i in range(1, n + 1):
+        scores = sub_matrix.scores[target_codes[i - 1]]
+        row = [-gap_cost * i]
+
+        # the path leaves this row at some column j and still has to gap
+        # the difference of remaining target and sequence lengths
+        diagonal = m - n + i
+        best_remaining = row[0] - gap_cost * abs(diagonal)
+
+        for j in range(1, m + 1):
+            similarity = scores[sequence_codes[j - 1]]
+
+            diagonal_score = up_row[j - 1] + similarity
+            up_score = up_row[j] - gap_cost
+            left_score = row[j - 1] - gap_cost
+
+            score = max(diagonal_score, up_score, left_score)
+            row.append(score)
+
+            best_remaining = max(
+                best_remaining, score - gap_cost * abs(j - diagonal))
+
+        if not passes(best_remaining + remaining[i], max_score, min_score):
+            return None
+
+        up_row = row
+
+    return up_row[-1]
+
+
+def semiglobal_alignment_score(
+        target, sequence, gap_cost, sub_matrix, max_score, min_score,
+        sequence_codes=None):
+    """Returns the same score as SemiGlobal.SemiGlobalNeedlemanWunsch
+    get_alignment_score() or None if the score can not pass the minimum score
+    """
+    gap_cost = float(gap_cost)
+    target_codes = sub_matrix.encode(target)
+    sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+    remaining = remaining_scores(target_codes, sequence_codes, sub_matrix)
+
+    if not passes(remaining[0], max_score, min_score):
+        return None
+
+    up_row = [0.] * (len(sequence) + 1)
+
+    for i in range(1, len(target) + 1):
+        scores = sub_matrix.scores[target_codes[i - 1]]
+        row = [-gap_cost * i]
+
+        for j in range(1, len(sequence) + 1):
+            similarity = scores[sequence_codes[j - 1]]
+
+            diagonal_score = up_row[j - 1] + similarity
+            up_score = up_row[j] - gap_cost
+            left_score = row[j - 1] - gap_cost
+
+            row.append(max(diagonal_score, up_score, left_score))
+
+        # the path leaves this row at some column and the chain end gap
+        # is free
+        if not passes(max(row) + remaining[i], max_score, min_score):
+            return None
+
+        up_row = row
+
+    return max(up_row)
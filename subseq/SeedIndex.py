@@ -0,0 +1,121 @@
+"""Description
+
+This module provides an in-memory k-mer (seed) index of chain sequences.
+
+A seed is read through a mask: '1' positions are compared and '0' positions
+are skipped, so '111' is a plain 3-mer and '11011' is a spaced seed which
+tolerates a mismatch in the middle. Every seed of every sequence is posted
+as a (sequence number, offset) pair. Postings of one seed are stored next to
+each other in two integer arrays.
+
+Hits of a target seed at position q and a sequence seed at offset o lie on
+the diagonal o - q. Chains without enough hits on a common diagonal can not
+hold a good ungapped core and are thrown off before any alignment is done.
+"""
+from array import array
+
+
+def parse_mask(seed):
+    """Returns the mask of a seed given as k ('3') or a spaced seed mask
+    ('11011'), None if the seed is not valid. k = 0 gives an empty mask.
+    Strings of 0s and 1s longer than 2 holding a 0 are masks, they must
+    begin and end with 1
+    """
+    seed = str(seed)
+
+    if set(seed) <= set('01') and '0' in seed and len(seed) > 2:
+        return seed if seed[0] == seed[-1] == '1' else None
+
+    if seed.isdigit():
+        return '1' * int(seed)
+
+    return None
+
+
+class SeedIndex:
+    """
+    Seed index of sequences given as a list of (key, sequence)
+    """
+
+    def __init__(self, sequences, mask='111'):
+        self.keys = [key for key, _ in sequences]
+        self.mask = mask
+        self.span = len(mask)
+        self.positions = [k for k, bit in enumerate(mask) if bit == '1']
+
+        # seed -> (first posting, number of postings)
+        self.seeds = dict()
+        self.sequence_numbers = array('l')
+        self.offsets = array('l')
+
+        self.build(sequences)
+
+    def get_seeds(self, sequence):
+        """Yields (offset, seed) of all seeds of a sequence"""
+        if len(self.positions) == self.span:
+            for offset in range(len(sequence) - self.span + 1):
+                yield offset, sequence[offset:offset + self.span]
+        else:
+            for offset in range(len(sequence) - self.span + 1):
+                yield offset, ''.join(
+                    sequence[offset + k] for k in self.positions)
+
+    def build(self, sequences):
+        """Fills posting arrays with seeds of all sequences"""
+        postings = dict()
+
+        for number, (_, sequence) in enumerate(sequences):
+            for offset, seed in self.get_seeds(sequence):
+                postings.setdefault(seed, list()).append((number, offset))
+
+        for seed, seed_postings in postings.items():
+            self.seeds[seed] = (len(self.offsets), len(seed_postings))
+
+            for number, offset in seed_postings:
+                self.sequence_numbers.append(number)
+                self.offsets.append(offset)
+
+    def get_hits(self, target):
+        """Returns a dict: sequence number -> list of (q, o) hits, where
+        q and o are seed offsets in target and the sequence
+        """
+        hits = dict()
+
+        for q, seed in self.get_seeds(target):
+            if seed not in self.seeds:
+                continue
+
+            first, count = self.seeds[seed]
+            for posting in range(first, first + count):
+                hits.setdefault(self.sequence_numbers[posting], list())\
+                    .append((q, self.offsets[posting]))
+
+        return hits
+
+    def get_candidates(self, target, min_hits=2):
+        """Returns a dict: key -> anchors of sequences having at least
+        min_hits seed hits on a common diagonal. Anchors are (i, j) pairs
+        of aligned residues, one per hit on such diagonals, ordered by j
+        """
+        # targets shorter than the seed are never thrown off
+        if len(target) < self.span:
+            return None
+
+        middle = [k for k in self.positions if k >= self.span // 2][0]
+        candidates = dict()
+
+        for number, hits in self.get_hits(target).items():
+            diagonals = dict()
+            for q, o in hits:
+                diagonals.setdefault(o - q, list()).append((q, o))
+
+            anchors = [(q + middle, o + middle)
+                       for diagonal_hits in diagonals.values()
+                       if len(diagonal_hits) >= min_hits
+                       for q, o in diagonal_hits]
+
+            if anchors:
+                candidates[self.keys[number]] = sorted(
+                    anchors, key=lambda anchor: (anchor[1], anchor[0]))
+
+        return candidates
@@ -0,0 +1,56 @@
+"""Description
+
+This module provides semi-global (glocal) versions of the global alignment
+engines: the whole target is aligned to any part of the subject.
+
+Gaps before and after the aligned part of the subject are free, so the first
+score matrix row is all zeros and the alignment ends at the best cell of the
+last row instead of the bottom right corner. The alignment score is not
+lowered by the unaligned subject residues, which makes it comparable between
+chains of any length.
+"""
+import NeedlemanWunch
+import Wavefront
+import Hirschberg
+import Gotoh
+
+
+class SemiGlobal:
+    """
+    Free end gaps in the subject for classes filling the score matrix
+    from self.first_row() and finishing it with self.set_end()
+    """
+
+    def first_row(self, width):
+        """Returns the first row of the score matrix"""
+        return [0.] * (width + 1)
+
+    def set_end(self, last_row):
+        """Sets the alignment score and the column where the alignment
+        ends: the first column holding the best score of the last row.
+        Column 0 leaves the whole target unaligned, it is taken only if
+        no other column ties with it
+        """
+        last_row = list(last_row)
+        self.alignment_score = max(last_row)
+
+        if self.alignment_score in last_row[1:]:
+            self.end_column = last_row.index(self.alignment_score, 1)
+        else:
+            self.end_column = 0
+
+
+class SemiGlobalNeedlemanWunsch(SemiGlobal, NeedlemanWunch.NeedlemanWunsch):
+    """Semi-global alignment filled cell by cell"""
+
+
+class WavefrontSemiGlobal(SemiGlobal, Wavefront.WavefrontNeedlemanWunsch):
+    """Semi-global alignment filled anti-diagonal by anti-diagonal"""
+
+
+class HirschbergSemiGlobal(SemiGlobal, Hirschberg.Hirschberg):
+    """Semi-global alignment in linear memory"""
+
+
+class GotohSemiGlobal(SemiGlobal, Gotoh.GotohNeedlemanWunsch):
+    """Semi-global alignment with affine gap costs"""
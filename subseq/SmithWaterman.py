@@ -4,23 +4,30 @@ This module provides a class for optimal local alignment using Smith-Waterman al
 Wikipedia link: https://en.wikipedia.org/wiki/Smith-Waterman_algortihm
 
 """
+import TracebackMatrix
+
+
 class SmithWaterman:
     """
     This class performs nucleotide or protein sequence (depending on given
     substitution matrix) alignment using the Smith-waterman algorithm
     """
 
-    def __init__(self, target, sequence, gap_cost, sub_matrix):
+    def __init__(self, target, sequence, gap_cost, sub_matrix,
+                 sequence_codes=None):
         self.target = target
         self.sequence = sequence
         self.gap_cost = float(gap_cost)
         self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
 
         self.best_score = 0
         self.best_score_coordinates = list()
 
         '''
-        Initialize score matrix
+        Only two rows of the score matrix are kept while it is filled.
+        The move leading to every cell is stored in the traceback matrix
                  S  E  Q  U  E  N  C  E
             [[0, 0, 0, 0, 0, 0, 0, 0, 0],
           T  [0, 0, 0, 0, 0, 0, 0, 0, 0],
@@ -30,23 +37,11 @@ class SmithWaterman:
           E  [0, 0, 0, 0, 0, 0, 0, 0, 0],
           T  [0, 0, 0, 0, 0, 0, 0, 0, 0]]
         '''
-        self.score_matrix = [[0 for _ in range(len(sequence) + 1)]
-                             for _ in range(len(target) + 1)]
+        self.traceback_matrix = TracebackMatrix.TracebackMatrix(
+            len(target) + 1, len(sequence) + 1)
 
         self.fill_score_matrix()
 
-    def __getitem__(self, key):
-        if isinstance(key, tuple):
-            try:
-                x = self
-                for k in key:
-                    x = x[k]
-                return x
-            except:
-                raise KeyError("Bad key pair: {}".format(key))
-        else:
-            return self.score_matrix[key]
-
     def get_coordinates(self):
         """Retruns a list of tuples (i, j)
         where i and j are coordinates of the best score
@@ -101,38 +96,44 @@ class SmithWaterman:
 
     def next_move(self, i, j):
         """Looks for the next move during traceback.
-        Moves are determined by the score of three upper-left, left and up
-        in the score matrix
+        Moves are recorded in the traceback matrix while it is filled
         """
-        aa1 = self.target[i - 1]
-        aa2 = self.sequence[j - 1]
-        achieved_score = self.score_matrix[i][j]
-        diagonal = self.score_matrix[i - 1][j - 1]
-        up = self.score_matrix[i - 1][j]
-        left = self.score_matrix[i][j - 1]
+        return self.traceback_matrix[i, j]
 
-        if achieved_score == diagonal + int(self.sub_matrix[aa1, aa2]):
-            # return diagonal move or END
-            return 1 if diagonal > 0 else 0
+    def fill_score_matrix(self):
+        """Fills the score matrix row by row with scores representing trial
+        alignments of the two sequences and records the move leading to
+        every cell. A move from a cell with zero score ends the alignment
+        """
+        end, diagonal, up, left = range(4)
 
-        if achieved_score == up - self.gap_cost:
-            # return up move or END
-            return 2 if up > 0 else 0
+        up_row = [0] * (len(self.sequence) + 1)
 
-        if achieved_score == left - self.gap_cost:
-            # return left move or END
-            return 3 if left > 0 else 0
+        for i in range(1, len(self.target) + 1):
+            scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+            row = [0]
+            moves = [end]
 
-    def fill_score_matrix(self):
-        """Fills self.score_matrix with scores representing trial alignments
-        of the two sequences
-        """
+            for j in range(1, len(self.sequence) + 1):
+                similarity = scores[self.sequence_codes[j - 1]]
+
+                diagonal_score = up_row[j - 1] + similarity
+                up_score = up_row[j] - self.gap_cost
+                left_score = row[j - 1] - self.gap_cost
 
-        for i in range(1, len(self.score_matrix)):
-            for j in range(1, len(self.score_matrix[i])):
-                score = self.calculate_score(i, j)
+                score = max(0, diagonal_score, up_score, left_score)
 
-                self.score_matrix[i][j] = score
+                if score == diagonal_score:
+                    move = diagonal if up_row[j - 1] > 0 else end
+                elif score == up_score:
+                    move = up if up_row[j] > 0 else end
+                elif score == left_score:
+                    move = left if row[j - 1] > 0 else end
+                else:
+                    move = end
+
+                row.append(score)
+                moves.append(move)
 
                 if score > self.best_score:
                     self.best_score = score
@@ -140,17 +141,5 @@ class SmithWaterman:
                 elif score == self.best_score:
                     self.best_score_coordinates.append((i, j))
 
-    def calculate_score(self, i, j):
-        """Calculates score for given i and j position in the score matrix
-        The score is based on the upper-left, left and up elements
-        """
-        aa1 = self.target[i - 1]
-        aa2 = self.sequence[j - 1]
-
-        similarity = self.sub_matrix[aa1, aa2]
-
-        diagonal_score = self.score_matrix[i - 1][j - 1] + int(similarity)
-        up_score = self.score_matrix[i - 1][j] - self.gap_cost
-        left_score = self.score_matrix[i][j - 1] - self.gap_cost
-
-        return max(0, diagonal_score, up_score, left_score)
+            self.traceback_matrix.set_row(i, moves)
+            up_row = row
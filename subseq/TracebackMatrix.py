@@ -0,0 +1,36 @@
+"""Description
+This module provides a compact matrix of traceback moves.
+
+Each score matrix cell gets a 2-bit move code, four cells are packed into one
+byte. Rows are padded to whole bytes, so a row can be packed at once.
+"""
+
+END, DIAGONAL, UP, LEFT = range(4)
+
+
+class TracebackMatrix:
+    """
+    Matrix of traceback moves packed four cells per byte.
+    All moves are END initially
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.row_size = (columns + 3) // 4
+        self.moves = bytearray(rows * self.row_size)
+
+    def __getitem__(self, key):
+        i, j = key
+        byte = self.moves[i * self.row_size + (j >> 2)]
+
+        return (byte >> ((j & 3) << 1)) & 3
+
+    def set_row(self, i, moves):
+        """Packs moves of row i, moves[j] is the move of cell (i, j)"""
+        moves = moves + [END] * (self.row_size * 4 - len(moves))
+        start = i * self.row_size
+
+        self.moves[start:start + self.row_size] = bytearray(
+            moves[k] | moves[k + 1] << 2 | moves[k + 2] << 4 | moves[k + 3] << 6
+            for k in range(0, len(moves), 4))
@@ -0,0 +1,186 @@
+"""Description
+
+This module provides Waterman-Eggert enumeration of non-overlapping local
+alignments, best first.
+
+The Smith-Waterman score matrix is filled row by row keeping only two rows,
+the move leading to every cell is recorded in a traceback matrix. After the
+best alignment is traced back, its aligned residue pairs are forbidden: the
+cell of a forbidden pair can not be reached by a diagonal move. The rows
+depending on them are filled again, and the next best alignment is taken.
+No pair of residues is aligned in two alignments, so repeated domains are
+found as separate hits instead of ties of one alignment.
+
+Every CHECKPOINT-th score row is kept. Filling again starts from the last
+kept row above the forbidden pairs and stops at the first kept row below
+them which does not change.
+
+Waterman MS, Eggert M. A new algorithm for best subsequence alignments with
+application to tRNA-rRNA comparisons. J Mol Biol, 1987, 197(4):723-728
+"""
+import TracebackMatrix
+
+# Every CHECKPOINT-th row of the score matrix is kept
+CHECKPOINT = 32
+
+
+class WatermanEggert:
+    """
+    This class finds up to max_hits local alignments scoring at least
+    min_score, no two of them align the same pair of residues
+    """
+
+    def __init__(self, target, sequence, gap_cost, sub_matrix, min_score=0.,
+                 max_hits=1, sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+
+        self.traceback_matrix = TracebackMatrix.TracebackMatrix(
+            len(target) + 1, len(sequence) + 1)
+        # checkpoints[i] - the row i of the score matrix, i is a multiple
+        # of CHECKPOINT
+        self.checkpoints = {0: [0.] * (len(sequence) + 1)}
+        # row_best[i] - the best score of the row i and its first column
+        self.row_best = [0.] * (len(target) + 1)
+        self.row_best_column = [0] * (len(target) + 1)
+        # row -> columns of residue pairs aligned by found alignments
+        self.forbidden = dict()
+
+        self.fill_rows(1, 0)
+
+        # list of (score, (aligned_target, aligned_sequence, i, j))
+        self.hits = list()
+
+        self.find_hits(min_score, max_hits)
+
+    def get_hits(self):
+        """Returns a list of (score, alignment) of found alignments, best
+        first. alignment is a tuple of aligned target and subject strings and
+        values of i, j where alignment begins
+        """
+        return self.hits
+
+    def fill_rows(self, first_row, last_row):
+        """Fills rows of the score matrix from first_row on. Rows after
+        last_row are not filled again once a kept row does not change
+        """
+        end, diagonal, up, left = range(4)
+        gap_cost = self.gap_cost
+        sequence_codes = self.sequence_codes
+        width = len(self.sequence) + 1
+
+        checkpoint = (first_row - 1) // CHECKPOINT * CHECKPOINT
+        up_row = self.checkpoints[checkpoint]
+
+        for i in range(checkpoint + 1, len(self.target) + 1):
+            scores = self.sub_matrix.scores[self.target_codes[i - 1]]
+            forbidden = self.forbidden.get(i, ())
+            row = [0.]
+            moves = [end]
+            best_score, best_column = 0., 0
+
+            for j in range(1, width):
+                up_score = up_row[j] - gap_cost
+                left_score = row[j - 1] - gap_cost
+
+                if j in forbidden:
+                    diagonal_score = None
+                    score = max(0., up_score, left_score)
+                else:
+                    diagonal_score = up_row[j - 1] + \
+                        scores[sequence_codes[j - 1]]
+                    score = max(0., diagonal_score, up_score, left_score)
+
+                if score == diagonal_score:
+                    move = diagonal if up_row[j - 1] > 0 else end
+                elif score == up_score:
+                    move = up
+                else:
+                    move = left
+
+                row.append(score)
+                moves.append(move)
+
+                if score > best_score:
+                    best_score, best_column = score, j
+
+            self.traceback_matrix.set_row(i, moves)
+            self.row_best[i] = best_score
+            self.row_best_column[i] = best_column
+            up_row = row
+
+            if i % CHECKPOINT == 0:
+                if i > last_row and self.checkpoints.get(i) == row:
+                    break
+                self.checkpoints[i] = row
+
+    def find_hits(self, min_score, max_hits):
+        """Takes the best alignments one by one until max_hits of them
+        are found or the best score is less than min_score
+        """
+        while len(self.hits) < max_hits:
+            best_score = max(self.row_best)
+
+            if best_score <= 0 or best_score < min_score:
+                break
+
+            i = self.row_best.index(best_score)
+            j = self.row_best_column[i]
+
+            alignment, pairs = self.get_traceback(i, j)
+            self.hits.append((best_score, alignment))
+
+            for i, j in pairs:
+                self.forbidden.setdefault(i, set()).add(j)
+
+            self.fill_rows(min(pairs)[0], max(pairs)[0])
+
+    def get_traceback(self, i, j):
+        """Finds the optimal path through the score matrix from the cell
+        (i, j). Returns the alignment, a tuple of aligned target and subject
+        strings and values of i, j where alignment begins, and (i, j) cells
+        of aligned residue pairs
+        """
+        aligned_target = list()
+        aligned_subject = list()
+        pairs = list()
+
+        end, diagonal, up, left = range(4)
+
+        move = self.traceback_matrix[i, j]
+
+        while move != end:
+            if move == diagonal:
+                aligned_target.append(self.target[i - 1])
+                aligned_subject.append(self.sequence[j - 1])
+                pairs.append((i, j))
+
+                i -= 1
+                j -= 1
+
+            elif move == up:
+                aligned_target.append(self.target[i - 1])
+                aligned_subject.append('-')
+
+                i -= 1
+
+            elif move == left:
+                aligned_target.append('-')
+                aligned_subject.append(self.sequence[j - 1])
+
+                j -= 1
+
+            move = self.traceback_matrix[i, j]
+
+        aligned_target.append(self.target[i - 1])
+        aligned_subject.append(self.sequence[j - 1])
+        pairs.append((i, j))
+
+        aligned_target = ''.join(reversed(aligned_target))
+        aligned_subject = ''.join(reversed(aligned_subject))
+
+        return (aligned_target, aligned_subject, i, j), pairs
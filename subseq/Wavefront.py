@@ -0,0 +1,198 @@
+"""Description
+
+This module provides anti-diagonal (wavefront) versions of the Smith-Waterman
+and Needleman-Wunsch algorithms.
+
+Cells lying on the same anti-diagonal of the score matrix (i + j = const) do
+not depend on each other, so every anti-diagonal is filled at once with NumPy
+array operations instead of one cell at a time.
+"""
+import numpy as np
+
+import SmithWaterman
+import NeedlemanWunch
+import TracebackMatrix
+
+
+def similarity_matrix(target_codes, sequence_codes, sub_matrix):
+    """Returns len(target) x len(sequence) array of substitution scores"""
+    scores = np.array(sub_matrix.scores, dtype=float)
+
+    return scores[np.ix_(target_codes, sequence_codes)]
+
+
+def anti_diagonals(n, m):
+    """Yields (d, lo, hi) for every anti-diagonal d = i + j of the inner
+    n x m part of the score matrix in the order they have to be filled,
+    the diagonal holds rows lo..hi
+    """
+    for d in range(2, n + m + 1):
+        yield d, max(1, d - m), min(n, d - 1)
+
+
+def record_moves(traceback_matrix, i, j, moves):
+    """Packs moves of cells (i, j) of one anti-diagonal into
+    traceback_matrix. Cells of an anti-diagonal lie in different rows,
+    so no two of them share a byte
+    """
+    packed = np.frombuffer(traceback_matrix.moves, dtype=np.uint8)
+    index = i * traceback_matrix.row_size + (j >> 2)
+
+    packed[index] |= (moves << ((j & 3) << 1)).astype(np.uint8)
+
+
+class WavefrontSmithWaterman(SmithWaterman.SmithWaterman):
+    """
+    Smith-Waterman local alignment with the score matrix filled
+    anti-diagonal by anti-diagonal. Produces the same scores, best score
+    coordinates and tracebacks as SmithWaterman.SmithWaterman
+    """
+
+    def __init__(self, target, sequence, gap_cost, sub_matrix,
+                 sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+
+        self.best_score = 0
+        self.best_score_coordinates = list()
+
+        self.traceback_matrix = TracebackMatrix.TracebackMatrix(
+            len(target) + 1, len(sequence) + 1)
+
+        self.fill_score_matrix()
+
+    def fill_score_matrix(self):
+        """Fills the score matrix one anti-diagonal at a time keeping only
+        the last three anti-diagonals, indexed by row
+        """
+        n, m = len(self.target), len(self.sequence)
+
+        if n == 0 or m == 0:
+            return
+
+        similarity = similarity_matrix(
+            self.target_codes, self.sequence_codes, self.sub_matrix)
+
+        # the first two anti-diagonals lie on the border of zeros
+        up_left, left, current = np.zeros((3, n + 1))
+        best_score = 0
+        best_rows = list()
+
+        for d, lo, hi in anti_diagonals(n, m):
+            i = np.arange(lo, hi + 1)
+            j = d - i
+
+            diagonal_prev = up_left[lo - 1:hi]
+            up_prev = left[lo - 1:hi]
+            left_prev = left[lo:hi + 1]
+
+            diagonal_score = diagonal_prev + similarity[i - 1, j - 1]
+            up_score = up_prev - self.gap_cost
+            left_score = left_prev - self.gap_cost
+
+            score = np.maximum(
+                np.maximum(diagonal_score, 0),
+                np.maximum(up_score, left_score))
+
+            moves = np.select(
+                [score == diagonal_score, score == up_score,
+                 score == left_score],
+                [np.where(diagonal_prev > 0, 1, 0),
+                 np.where(up_prev > 0, 2, 0),
+                 np.where(left_prev > 0, 3, 0)], 0)
+            record_moves(self.traceback_matrix, i, j, moves)
+
+            # border cells (0, d) and (d, 0)
+            if d <= m:
+                current[0] = 0
+            if d <= n:
+                current[d] = 0
+            current[lo:hi + 1] = score
+
+            diagonal_best = score.max()
+            if diagonal_best > best_score:
+                best_score = diagonal_best
+                best_rows = list()
+            if diagonal_best == best_score:
+                best_rows.append((d, i[score == best_score]))
+
+            up_left, left, current = left, current, up_left
+
+        # The best score coordinates are listed row by row, just like
+        # they are found by cell by cell filling
+        self.best_score = float(best_score)
+        self.best_score_coordinates = sorted(
+            (int(i), d - int(i)) for d, rows in best_rows for i in rows)
+
+
+class WavefrontNeedlemanWunsch(NeedlemanWunch.NeedlemanWunsch):
+    """
+    Needleman-Wunsch global alignment with the score matrix filled
+    anti-diagonal by anti-diagonal. Produces the same scores and tracebacks
+    as NeedlemanWunch.NeedlemanWunsch
+    """
+
+    def __init__(self, target, sequence, gap_cost, sub_matrix,
+                 sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+        self.traceback_matrix = TracebackMatrix.TracebackMatrix(
+            len(target) + 1, len(sequence) + 1)
+        self.fill_score_matrix()
+
+    def fill_score_matrix(self):
+        """Fills the score matrix one anti-diagonal at a time keeping only
+        the last three anti-diagonals, indexed by row
+        """
+        n, m = len(self.target), len(self.sequence)
+
+        first_row = self.first_row(m)
+
+        if n == 0 or m == 0:
+            self.set_end([-self.gap_cost * n] if m == 0 else first_row)
+            return
+
+        similarity = similarity_matrix(
+            self.target_codes, self.sequence_codes, self.sub_matrix)
+
+        up_left, left, current = np.zeros((3, n + 1))
+        up_left[0] = first_row[0]
+        left[:2] = first_row[1], -self.gap_cost
+        last_row = [-self.gap_cost * n]
+
+        for d, lo, hi in anti_diagonals(n, m):
+            i = np.arange(lo, hi + 1)
+            j = d - i
+
+            diagonal_score = up_left[lo - 1:hi] + similarity[i - 1, j - 1]
+            up_score = left[lo - 1:hi] - self.gap_cost
+            left_score = left[lo:hi + 1] - self.gap_cost
+
+            score = np.maximum(
+                diagonal_score, np.maximum(up_score, left_score))
+
+            moves = np.select(
+                [score == diagonal_score, score == up_score], [1, 2], 3)
+            record_moves(self.traceback_matrix, i, j, moves)
+
+            # border cells (0, d) and (d, 0)
+            if d <= m:
+                current[0] = first_row[d]
+            if d <= n:
+                current[d] = -self.gap_cost * d
+            current[lo:hi + 1] = score
+
+            if hi == n:
+                last_row.append(float(score[-1]))
+
+            up_left, left, current = left, current, up_left
+
+        self.set_end(last_row)
@@ -0,0 +1,254 @@
+"""Description
+
+This module provides X-drop gapped extension of seeded local alignments.
+
+An alignment is grown from an anchor, a pair of aligned target and subject
+residues, in both directions. Each direction is a Needleman-Wunsch like
+score matrix starting at the anchor, but only cells scoring at least
+(the best score so far - x_drop) are kept alive and only cells next to alive
+cells are explored. The explored area follows the alignment instead of
+covering the whole target x subject rectangle. Each direction ends at its
+best scoring cell.
+
+Zhang Z, Schwartz S, Wagner L, Miller W. A greedy algorithm for aligning DNA
+sequences. J Comput Biol, 2000, 7(1-2):203-214
+"""
+END, DIAGONAL, UP, LEFT = range(4)
+
+NO_SCORE = float('-inf')
+
+
+def word_anchors(target, sequence, word_size=3):
+    """Returns (i, j) anchors of all words of length word_size found both
+    in target and sequence, anchored at the middle residue of the word
+    """
+    word_size = max(1, min(word_size, len(target)))
+    positions = dict()
+    for i in range(len(target) - word_size + 1):
+        positions.setdefault(target[i:i + word_size], list()).append(i)
+
+    anchors = list()
+    middle = word_size // 2
+    for j in range(len(sequence) - word_size + 1):
+        for i in positions.get(sequence[j:j + word_size], ()):
+            anchors.append((i + middle, j + middle))
+
+    return anchors
+
+
+class XDrop:
+    """
+    This class performs local alignment by X-drop extension of anchors.
+    Provides the same methods as SmithWaterman.SmithWaterman
+    """
+
+    def __init__(self, target, sequence, gap_cost, sub_matrix, x_drop=25.,
+                 anchors=None, sequence_codes=None):
+        self.target = target
+        self.sequence = sequence
+        self.gap_cost = float(gap_cost)
+        self.sub_matrix = sub_matrix
+        self.x_drop = float(x_drop)
+        self.target_codes = sub_matrix.encode(target)
+        self.sequence_codes = sub_matrix.encode(sequence, sequence_codes)
+
+        if anchors is None:
+            anchors = word_anchors(target, sequence)
+
+        self.best_score = 0
+        self.best_score_coordinates = list()
+        self.alignments = dict()
+
+        # residue pairs aligned by extensions done so far, anchors falling
+        # on them would give the same alignment again
+        aligned_pairs = set()
+
+        for anchor in anchors:
+            if anchor in aligned_pairs:
+                continue
+
+            score, end, alignment, pairs = self.extend(*anchor)
+            aligned_pairs.update(pairs)
+
+            if score > self.best_score:
+                self.best_score = score
+                self.best_score_coordinates = list()
+
+            if score == self.best_score and end not in self.alignments:
+                self.best_score_coordinates.append(end)
+                self.alignments[end] = alignment
+
+        self.best_score_coordinates.sort()
+
+    def get_coordinates(self):
+        """Retruns a list of tuples (i, j)
+        where i and j are coordinates of the best score
+        """
+        return self.best_score_coordinates
+
+    def get_best_score(self):
+        """Returns the best score"""
+        return self.best_score
+
+    def get_traceback(self, i, j):
+        """Returns constructed alignment strings for target and subject and
+        values of i, j where alignment begins
+        """
+        return self.alignments[i, j]
+
+    def extend(self, anchor_i, anchor_j):
+        """Extends alignment of target[anchor_i] and sequence[anchor_j] in
+        both directions. Returns the score, the (i, j) coordinates of the
+        end, the alignment and aligned (i, j) residue pairs
+        """
+        target_codes, sequence_codes = self.target_codes, self.sequence_codes
+
+        left_score, left_i, left_j, left_moves = self.extension(
+            target_codes[anchor_i - 1::-1] if anchor_i else [],
+            sequence_codes[anchor_j - 1::-1] if anchor_j else [])
+        right_score, right_i, right_j, right_moves = self.extension(
+            target_codes[anchor_i + 1:], sequence_codes[anchor_j + 1:])
+
+        score = self.sub_matrix.scores[target_codes[anchor_i]][
+            sequence_codes[anchor_j]] + left_score + right_score
+
+        # the left extension is traced back from its end to the anchor,
+        # that is from left to right, the right one from right to left
+        path = self.trace(left_moves, left_i, left_j)
+        i, j = anchor_i - left_i, anchor_j - left_j
+        start_i, start_j = i + 1, j + 1
+
+        path.append(DIAGONAL)
+        path.extend(reversed(self.trace(right_moves, right_i, right_j)))
+
+        aligned_target = list()
+        aligned_subject = list()
+        pairs = list()
+
+        for move in path:
+            if move == DIAGONAL:
+                aligned_target.append(self.target[i])
+                aligned_subject.append(self.sequence[j])
+                pairs.append((i, j))
+                i += 1
+                j += 1
+
+            elif move == UP:
+                aligned_target.append(self.target[i])
+                aligned_subject.append('-')
+                i += 1
+
+            elif move == LEFT:
+                aligned_target.append('-')
+                aligned_subject.append(self.sequence[j])
+                j += 1
+
+        alignment = (''.join(aligned_target), ''.join(aligned_subject),
+                     start_i, start_j)
+
+        return score, (i, j), alignment, pairs
+
+    def extension(self, target_codes, sequence_codes):
+        """Fills alive cells of the score matrix of target_codes x
+        sequence_codes row by row starting from the top left corner.
+        Returns the best score, its cell and the explored rows of moves as
+        a list of (first column, moves)
+        """
+        gap_cost, x_drop = self.gap_cost, self.x_drop
+        scores_table = self.sub_matrix.scores
+        m = len(sequence_codes)
+
+        best_score, best_i, best_j = 0., 0, 0
+
+        # the first row holds gaps in target only
+        row = [0.]
+        while len(row) <= m and -gap_cost * len(row) >= -x_drop:
+            row.append(-gap_cost * len(row))
+        lo = 0
+        rows = [(0, [END] + [LEFT] * (len(row) - 1))]
+
+        for i in range(1, len(target_codes) + 1):
+            scores = scores_table[target_codes[i - 1]]
+            hi = lo + len(row) - 1
+
+            new_row = list()
+            moves = list()
+            left_score = NO_SCORE
+
+            j = lo
+            while j <= m:
+                if j == 0:
+                    up_score = row[0] - gap_cost
+                    score, move = up_score, UP
+                else:
+                    diagonal_score = row[j - 1 - lo] + scores[
+                        sequence_codes[j - 1]] if lo < j <= hi + 1 \
+                        else NO_SCORE
+                    up_score = row[j - lo] - gap_cost if j <= hi \
+                        else NO_SCORE
+                    left_score = left_score - gap_cost
+
+                    score = max(diagonal_score, up_score, left_score)
+
+                    if score == diagonal_score:
+                        move = DIAGONAL
+                    elif score == up_score:
+                        move = UP
+                    else:
+                        move = LEFT
+
+                if score < best_score - x_drop:
+                    score = NO_SCORE
+
+                    # nothing alive can follow to the right
+                    if j > hi:
+                        break
+
+                elif score > best_score:
+                    best_score, best_i, best_j = score, i, j
+
+                new_row.append(score)
+                moves.append(move)
+                left_score = score
+                j += 1
+
+            # trim dead cells at both ends of the row
+            first = 0
+            while first < len(new_row) and new_row[first] == NO_SCORE:
+                first += 1
+            if first == len(new_row):
+                break
+
+            last = len(new_row)
+            while new_row[last - 1] == NO_SCORE:
+                last -= 1
+
+            lo += first
+            row = new_row[first:last]
+            rows.append((lo, moves[first:last]))
+
+        return best_score, best_i, best_j, rows
+
+    @staticmethod
+    def trace(rows, i, j):
+        """Returns moves leading from the top left corner to cell (i, j)
+        in reversed order
+        """
+        path = list()
+
+        while True:
+            lo, moves = rows[i]
+            move = moves[j - lo]
+
+            if move == END:
+                return path
+
+            path.append(move)
+
+            if move == DIAGONAL:
+                i -= 1
+                j -= 1
+            elif move == UP:
+                i -= 1
+            else:
+                j -= 1
@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(__file__))
 import subseq_re
 import subseq_local_alignment
 import subseq_global_alignment
+import Data
 
 def __init__(self):
     pass
@@ -31,3 +32,4 @@ def subseq_global_alignment_dialog(app):
 cmd.extend('subseq', subseq_re.subseq_re)
 cmd.extend('subseq.local', subseq_local_alignment.subseq_local_alignment)
 cmd.extend('subseq.global', subseq_global_alignment.subseq_global_alignment)
+cmd.extend('subseq.clear', Data.clear_cache)
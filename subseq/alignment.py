@@ -94,3 +94,21 @@ def print_alignment(
         print("\n")
 
     print('-' * 60)
+
+
+def print_alignments(alignments, order):
+    """Prints alignments sorted by the order of their chains and returns
+    a list of their matches. alignments is a list of (model, chain, match,
+    print_alignment arguments), match is None if no residue is aligned,
+    order is Data.get_order()
+    """
+    match_list = list()
+
+    for model, chain, match, arguments in sorted(
+            alignments, key=lambda hit: order[hit[0], hit[1]]):
+        if match is not None:
+            match_list.append(match)
+
+        print_alignment(*arguments)
+
+    return match_list
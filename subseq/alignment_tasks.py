@@ -0,0 +1,321 @@
+"""Description
+
+This module provides the alignment work of subseq.local and subseq.global
+split into tasks which can run in worker processes.
+
+A task aligns one target to a list of chains and returns the alignments
+passing the minimum score. Printing and selecting is left to the caller.
+This module must not import pymol.
+"""
+from collections import OrderedDict
+
+import alignment
+import SubMatrix
+import SmithWaterman
+import NeedlemanWunch
+import Wavefront
+import Gotoh
+import Hirschberg
+import BandedNeedlemanWunsch
+import SemiGlobal
+import StripedSmithWaterman
+import BatchSmithWaterman
+import XDrop
+import WatermanEggert
+import NeighbourhoodWords
+import ScoreOnly
+
+# Local alignment score matrix filling engines
+LOCAL_ENGINES = {
+    'python': SmithWaterman.SmithWaterman,
+    'numpy': Wavefront.WavefrontSmithWaterman,
+    'striped': SmithWaterman.SmithWaterman,
+    'batch': SmithWaterman.SmithWaterman,
+    'xdrop': XDrop.XDrop,
+}
+
+# Global alignment score matrix filling engines
+GLOBAL_ENGINES = {
+    'python': NeedlemanWunch.NeedlemanWunsch,
+    'numpy': Wavefront.WavefrontNeedlemanWunsch,
+    'hirschberg': Hirschberg.Hirschberg,
+}
+
+# Semi-global alignment score matrix filling engines
+SEMI_GLOBAL_ENGINES = {
+    'python': SemiGlobal.SemiGlobalNeedlemanWunsch,
+    'numpy': SemiGlobal.WavefrontSemiGlobal,
+    'hirschberg': SemiGlobal.HirschbergSemiGlobal,
+}
+
+# Global alignment modes
+GLOBAL_MODES = {
+    'global': GLOBAL_ENGINES,
+    'semiglobal': SEMI_GLOBAL_ENGINES,
+}
+
+# Approximate memory in bytes taken by one score matrix cell, every cell
+# keeps a 2-bit traceback move and the numpy engine also keeps the float64
+# substitution score of every cell
+CELL_SIZE = {
+    'python': 0.25,
+    'numpy': 8.25,
+}
+
+# Approximate memory in bytes taken by the score rows per residue of the
+# target and the subject: two rows of float objects and a list of moves for
+# python, three float64 anti-diagonals for numpy
+ROW_SIZE = {
+    'python': 96,
+    'numpy': 24,
+}
+
+
+def task_sizes(target, chains):
+    """Returns the estimated number of score matrix cells of every
+    (model, chain, sequence, ...) of chains
+    """
+    return [(len(target) + 1) * (len(chain[2]) + 1) for chain in chains]
+
+
+def local_alignment_task(task):
+    """Local alignment of a target to chains.
+    task is a tuple (target, matrix, gap_cost, min_score, first_only, engine,
+    gap_open, gap_extend, x_drop, two_hit, max_hits, chains), chains is
+    a list of (model, chain, sequence, codes, anchors), codes are residue
+    codes of the sequence from Data.get_codes(), anchors of the xdrop engine
+    are None if they are not known. two_hit is the neighbourhood word
+    threshold of the two-hit prefilter, 0 if it is not used. max_hits is
+    the maximum number of non-overlapping alignments of a chain, 0 if only
+    the best scoring ones are returned. Returns a list of alignments
+    (model, chain, score, aligned_target, aligned_sequence, start_i, start_j).
+    With first_only only the first alignment of every model is returned.
+    Chains having the same sequence are aligned once
+    """
+    target, matrix, gap_cost, min_score, first_only, engine, \
+        gap_open, gap_extend, x_drop, two_hit, max_hits, chains = task
+
+    # Substitution matrix
+    sub_matrix = SubMatrix.get_matrix(matrix)
+
+    # The maximum score for given target
+    max_score = alignment.calculate_max_score(target, sub_matrix)
+
+    # Two-hit prefilter, chains without two hits on a diagonal are thrown
+    # off and the hits become anchors of the xdrop engine
+    if two_hit and len(target) >= NeighbourhoodWords.WORD_SIZE:
+        words = NeighbourhoodWords.NeighbourhoodWords(
+            target, sub_matrix, two_hit)
+        triggered_chains = list()
+
+        for model, chain, sequence, codes, anchors in chains:
+            anchors = words.get_anchors(sequence, codes)
+            if anchors:
+                triggered_chains.append(
+                    (model, chain, sequence, codes, anchors))
+
+        chains = triggered_chains
+
+    # Target profile for score only pass, shared by all chains
+    profile = None
+    if engine == 'striped' and gap_open is None:
+        profile = StripedSmithWaterman.StripedSmithWaterman(
+            target, gap_cost, sub_matrix)
+
+    # Best scores of distinct sequences computed in batches
+    batch_scores = None
+    if engine == 'batch' and gap_open is None:
+        distinct = OrderedDict((chain[2], chain[3]) for chain in chains)
+        batch_scores = dict(zip(distinct, BatchSmithWaterman.best_scores(
+            [(target, sequence) for sequence in distinct], gap_cost,
+            sub_matrix, sequence_codes=list(distinct.values()))))
+
+    hits = list()
+
+    # models which already have an alignment, used with first_only
+    found_models = set()
+
+    # sequence -> its alignments (score, aligned_target, aligned_sequence,
+    # start_i, start_j), repeated sequences are aligned once
+    cache = dict()
+
+    for model, chain, sequence, codes, anchors in chains:
+        if model in found_models:
+            continue
+
+        if sequence not in cache:
+            cache[sequence] = local_alignments(
+                target, sequence, codes, anchors, sub_matrix, max_score,
+                gap_cost, min_score, first_only, engine, gap_open,
+                gap_extend, x_drop, max_hits, profile, batch_scores)
+
+        for alignment_hit in cache[sequence]:
+            hits.append((model, chain) + alignment_hit)
+
+            if first_only:
+                found_models.add(model)
+
+    return hits
+
+
+def local_alignments(target, sequence, codes, anchors, sub_matrix, max_score,
+                     gap_cost, min_score, first_only, engine, gap_open,
+                     gap_extend, x_drop, max_hits, profile, batch_scores):
+    """Returns a list of local alignments (score, aligned_target,
+    aligned_sequence, start_i, start_j) of a target to one sequence passing
+    the minimum score, at most one with first_only
+    """
+    alignments = list()
+
+    # Score only pass, the score matrix is filled only for chains
+    # which can pass minimum score
+    if profile is not None:
+        if profile.score(sequence, codes) / max_score * 100 < min_score:
+            return alignments
+
+    elif batch_scores is not None:
+        if batch_scores[sequence] / max_score * 100 < min_score:
+            return alignments
+
+    elif gap_open is None and engine != 'xdrop' and min_score > 0:
+        best_score = ScoreOnly.local_alignment_score(
+            target, sequence, gap_cost, sub_matrix, max_score,
+            min_score, codes)
+
+        if best_score is None:
+            return alignments
+
+    # Non-overlapping alignments, best first
+    if max_hits and gap_open is None:
+        we = WatermanEggert.WatermanEggert(
+            target, sequence, gap_cost, sub_matrix,
+            min_score * max_score / 100., 1 if first_only else max_hits,
+            codes)
+
+        for score, (aligned_target, aligned_sequence, start_i,
+                    start_j) in we.get_hits():
+            if float(score) / max_score * 100 < min_score:
+                break
+
+            alignments.append((score, aligned_target, aligned_sequence,
+                               start_i, start_j))
+
+        return alignments
+
+    if gap_open is None and engine == 'xdrop':
+        sw = XDrop.XDrop(
+            target, sequence, gap_cost, sub_matrix, x_drop, anchors,
+            codes)
+    elif gap_open is None:
+        sw = LOCAL_ENGINES[engine](
+            target, sequence, gap_cost, sub_matrix, codes)
+    else:
+        sw = Gotoh.GotohSmithWaterman(
+            target, sequence, gap_open, gap_extend, sub_matrix, codes)
+
+    # Skip if alignment best score is less than minimum passing score
+    if float(sw.get_best_score()) / max_score * 100 < min_score:
+        return alignments
+
+    for i, j in sw.get_coordinates():
+        aligned_target, aligned_sequence, start_i, start_j = \
+            sw.get_traceback(i, j)
+
+        alignments.append((sw.get_best_score(), aligned_target,
+                           aligned_sequence, start_i, start_j))
+
+        if first_only:
+            break
+
+    return alignments
+
+
+def global_alignment_task(task):
+    """Global alignment of a target to chains.
+    task is a tuple (target, matrix, gap_cost, min_score, first_only, engine,
+    max_memory, gap_open, gap_extend, band, mode, chains), chains is a list
+    of (model, chain, sequence, codes), codes are residue codes of the
+    sequence from Data.get_codes(). Returns a list of alignments
+    (model, chain, score, aligned_target, aligned_sequence, start_i, start_j)
+    with tailing gaps of the aligned target removed
+    """
+    target, matrix, gap_cost, min_score, first_only, engine, max_memory, \
+        gap_open, gap_extend, band, mode, chains = task
+
+    semi_global = mode == 'semiglobal'
+
+    # Substitution matrix
+    sub_matrix = SubMatrix.get_matrix(matrix)
+
+    # The maximum score for given target
+    max_score = alignment.calculate_max_score(target, sub_matrix)
+
+    hits = list()
+
+    for model, chain, sequence, codes in chains:
+        # Score only pass, the score matrix is filled only for chains
+        # which can pass minimum score
+        if semi_global and gap_open is None and min_score > 0:
+            alignment_score = ScoreOnly.semiglobal_alignment_score(
+                target, sequence, gap_cost, sub_matrix, max_score,
+                min_score, codes)
+
+            if alignment_score is None:
+                continue
+
+        elif gap_open is None and not band and min_score > 0:
+            alignment_score = ScoreOnly.global_alignment_score(
+                target, sequence, gap_cost, sub_matrix, max_score,
+                min_score, codes)
+
+            if alignment_score is None:
+                continue
+
+        chain_engine = engine
+
+        # Fall back to linear memory alignment for too large matrices
+        if engine in CELL_SIZE:
+            matrix_size = ((len(target) + 1) * (len(sequence) + 1) *
+                           CELL_SIZE[engine] +
+                           (len(target) + len(sequence) + 2) *
+                           ROW_SIZE[engine]) / 1024. ** 2
+
+            if matrix_size > max_memory:
+                chain_engine = 'hirschberg'
+
+        if gap_open is not None and semi_global:
+            nw = SemiGlobal.GotohSemiGlobal(
+                target, sequence, gap_open, gap_extend, sub_matrix, codes)
+        elif gap_open is not None:
+            nw = Gotoh.GotohNeedlemanWunsch(
+                target, sequence, gap_open, gap_extend, sub_matrix, codes)
+        elif band and not semi_global:
+            nw = BandedNeedlemanWunsch.BandedNeedlemanWunsch(
+                target, sequence, gap_cost, sub_matrix, band, codes)
+        else:
+            nw = GLOBAL_MODES[mode][chain_engine](
+                target, sequence, gap_cost, sub_matrix, codes)
+        alignment_score = nw.get_alignment_score()
+
+        if max(float(alignment_score) / max_score * 100, 0) < min_score:
+            continue
+
+        aligned_target, aligned_sequence, start_i, start_j = \
+            nw.get_traceback()
+
+        # Nothing of the target is aligned
+        if not aligned_target:
+            continue
+
+        # Remove tailing gaps '-' from aligned target
+        while aligned_target[-1] == '-':
+            aligned_target = aligned_target[:-1]
+            aligned_sequence = aligned_sequence[:-1]
+
+        hits.append((model, chain, alignment_score, aligned_target,
+                     aligned_sequence, start_i, start_j))
+
+        if first_only:
+            break
+
+    return hits
@@ -0,0 +1,142 @@
+"""Description
+
+This module finds literal strings every match of a regular expression must
+contain, so chains and parts of chains without them are skipped by a str.find
+pass before the regular expression runs.
+
+The parsed expression is walked through concatenations, groups and repeats
+done at least once. Residues following each other in such parts form required
+literals. Alternatives, classes, lookarounds and conditional groups are not
+looked into, they only split literals.
+"""
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+
+# Operations of which matches depend on nothing but the matched text,
+# anchors, lookarounds, conditional and atomic groups are not among them
+PLAIN_OPERATIONS = (sre_parse.LITERAL, sre_parse.NOT_LITERAL, sre_parse.ANY,
+                    sre_parse.IN, sre_parse.SUBPATTERN, sre_parse.MAX_REPEAT,
+                    sre_parse.MIN_REPEAT, sre_parse.BRANCH,
+                    sre_parse.GROUPREF)
+
+
+def sequence_literals(items, literals):
+    """Appends required literals of parsed sequence items to literals"""
+    run = list()
+
+    for operation, argument in items:
+        if operation == sre_parse.LITERAL and argument < 128:
+            run.append(chr(argument).upper())
+            continue
+
+        if operation == sre_parse.SUBPATTERN:
+            # (group, items) or (group, add flags, del flags, items)
+            inner = list()
+            sequence_literals(argument[-1], inner)
+
+            if len(inner) == 1 and not has_gaps(argument[-1]):
+                run.append(inner[0])
+                continue
+
+            literals.append(''.join(run))
+            literals.extend(inner)
+            run = list()
+            continue
+
+        if operation in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and \
+                argument[0] >= 1:
+            minimum, maximum, body = argument
+            body = list(body)
+
+            if len(body) == 1 and body[0][0] == sre_parse.LITERAL and \
+                    body[0][1] < 128:
+                run.append(chr(body[0][1]).upper() * minimum)
+
+                if maximum != minimum:
+                    literals.append(''.join(run))
+                    run = list()
+                continue
+
+            literals.append(''.join(run))
+            sequence_literals(body, literals)
+            run = list()
+            continue
+
+        literals.append(''.join(run))
+        run = list()
+
+    literals.append(''.join(run))
+
+
+def has_gaps(items):
+    """Returns True if parsed sequence items are not all plain literals"""
+    return any(operation != sre_parse.LITERAL or argument >= 128
+               for operation, argument in items)
+
+
+def uses_context(items):
+    """Returns True if any of parsed items, at any depth, is not a plain
+    operation, so its matches may depend on text around them
+    """
+    for operation, argument in items:
+        if operation not in PLAIN_OPERATIONS:
+            return True
+
+        if operation == sre_parse.SUBPATTERN:
+            if uses_context(argument[-1]):
+                return True
+
+        elif operation in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            if uses_context(argument[2]):
+                return True
+
+        elif operation == sre_parse.BRANCH:
+            if any(uses_context(branch) for branch in argument[1]):
+                return True
+
+    return False
+
+
+def required_literals(target, flags=0):
+    """Returns (literals, width): upper case literals every match of the
+    regular expression contains, longest first, and the maximum match
+    width, None if matches can be arbitrarily long or depend on text around
+    them
+    """
+    parsed = sre_parse.parse(target, flags)
+    items = list(parsed)
+
+    literals = list()
+    sequence_literals(items, literals)
+    literals = sorted(set(literal for literal in literals if literal),
+                      key=lambda literal: (-len(literal), literal))
+
+    _, width = parsed.getwidth()
+    if width >= sre_parse.MAXREPEAT or uses_context(items):
+        width = None
+
+    return literals, width
+
+
+def windows(sequence, literal, width):
+    """Returns merged (start, end) windows of the sequence which can hold
+    a match of at most width residues containing the literal
+    """
+    merged = list()
+    offset = sequence.find(literal)
+
+    while offset != -1:
+        start = max(0, offset + len(literal) - width)
+        end = min(len(sequence), offset + width)
+
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+        offset = sequence.find(literal, offset + 1)
+
+    return merged
@@ -1,25 +1,41 @@
 import logging
 
 import alignment
+import alignment_tasks
 import CallCounter
 import subseq_parse
 import subseq_select
 import SubMatrix
-import NeedlemanWunch
+import Scheduler
+import SeedIndex
 import Data
 
 
+# Score matrix filling engines
+GLOBAL_ENGINES = alignment_tasks.GLOBAL_ENGINES
+
+# Global alignment modes
+GLOBAL_MODES = alignment_tasks.GLOBAL_MODES
+
+# Approximate memory in bytes taken by one score matrix cell
+CELL_SIZE = alignment_tasks.CELL_SIZE
+
+
 def subseq_global_alignment(
         targets, submatrix='blossum62', chains='all', search='aminoacids',
         firstonly='False', gapcost='10.', minscore='51.', models='all',
-        sele='ss-{method}-{id}-{target}'):
+        sele='ss-{method}-{id}-{target}', engine='python', maxmemory='1024',
+        gapopen=None, gapextend=None, band='0', processes='1',
+        mode='global', seed='0', seedhits='2', states='current'):
     """
 DESCRIPTION
     subseq.global - tool for searching target sequences using global alignment
 
 USAGE
     subseq.global targets, [submatrix, [chains, [search, [firstonly, [gapcost,
-                  [minscore, [models, [sele]]]]]]]
+                  [minscore, [models, [sele, [engine, [maxmemory,
+                  [gapopen, [gapextend, [band, [processes,
+                  [mode, [seed, [seedhits, [states]]]]]]]]]]]]]]]]]]
 
 IMPORTANT
     All modified amino or nucleic acids are replaced with: X
@@ -31,7 +47,9 @@ PARAMETERS
                                 - targets=SIS KATK AK
                                 - targets=PATH/TO/TARGETS_FILE
 
-    submatrix=<FILE>        ; Path to substitution matrix file
+    submatrix=<FILE>        ; Path to substitution matrix file or one of
+                              built-in matrices: blosum45, blosum62, blosum80,
+                              pam30, pam70, pam250, nucleicmatrix
                               Default: blossum62
 
     chains=<list>           ; The list of chains
@@ -70,6 +88,69 @@ PARAMETERS
                                 - {id}     - id
                               Default: 'ss-{method}-{id}-{target}'
 
+    engine=<str>            ; Score matrix filling engine
+                                - python: cell by cell
+                                - numpy: anti-diagonal by anti-diagonal
+                                  using NumPy arrays (pays off only when
+                                  both the target and the chains are
+                                  hundreds of residues long, slower than
+                                  python for shorter targets)
+                                - hirschberg: divide and conquer, keeps only
+                                  a few score matrix rows in memory
+                              Default: python
+
+    maxmemory=<float>       ; Score matrix memory budget in megabytes. Chains
+                              whose score matrix would not fit are aligned
+                              with the hirschberg engine
+                              Default: 1024
+
+    gapopen=<float>         ; The affine gap opening cost. A gap of length k
+                              costs gapopen + (k - 1) * gapextend. If given,
+                              gapcost and engine are not used
+                              Default: None (linear gapcost is used)
+
+    gapextend=<float>       ; The affine gap extension cost
+                              Default: gapcost
+
+    band=<int>              ; Fill only the score matrix diagonals within
+                              band of the main diagonals. The band is doubled
+                              until the alignment is the same as with the full
+                              score matrix. Fast for near identical chains.
+                              Not used with gapopen and mode=semiglobal
+                              Default: 0 (the full score matrix is filled)
+
+    processes=<int>         ; Number of worker processes aligning chains in
+                              parallel, 0 - one per CPU core
+                              Default: 1
+
+    mode=<str>              ; Alignment mode
+                                - global: the whole target is aligned to
+                                  the whole chain
+                                - semiglobal: the whole target is aligned to
+                                  any part of the chain, chain residues
+                                  before and after it are not penalized
+                              Default: global
+
+    seed=<int|mask>         ; Seed index prefilter. Only chains sharing at
+                              least seedhits seeds with the target on one
+                              diagonal are aligned. Seeds are k residues long
+                              (seed=3) or read through a spaced seed mask
+                              where 0 positions are not compared
+                              (seed=11011)
+                              Default: 0 (all chains are aligned)
+
+    seedhits=<int>          ; The minimum number of seed hits on a common
+                              diagonal of the target and a chain
+                              Default: 2
+
+    states=<list>           ; States of multi-state models to search, every
+                              state is extracted and states with the same
+                              residues of a chain are searched once
+                                - current: the current state
+                                - all: all states
+                                - states=1 5 10
+                              Default: current
+
 EXAMPLE
     subseq.global KTGT, blossum62, firstonly=True, gapcost=12.5, chains=A B
 
@@ -88,6 +169,16 @@ SUBSEQ                          2018-06-01
     gapcost = subseq_parse.parse_gapcost(gapcost)
     minscore = subseq_parse.parse_minscore(minscore)
     models = subseq_parse.parse_models(models)
+    gapopen = subseq_parse.parse_gapopen(gapopen)
+    gapextend = subseq_parse.parse_gapextend(gapextend, gapcost)
+    engine = subseq_parse.parse_engine(engine, GLOBAL_ENGINES)
+    maxmemory = subseq_parse.parse_maxmemory(maxmemory)
+    band = subseq_parse.parse_band(band)
+    processes = subseq_parse.parse_processes(processes)
+    mode = subseq_parse.parse_mode(mode, GLOBAL_MODES)
+    seed = subseq_parse.parse_seed(seed)
+    seedhits = subseq_parse.parse_seedhits(seedhits)
+    states = subseq_parse.parse_states(states)
 
     if logging.error.counter is not 0:
         logging.info("{0} errors were found. ".format(logging.error.counter) +
@@ -98,12 +189,22 @@ SUBSEQ                          2018-06-01
     if search is 'nucleicacids' and submatrix is 'blossum62':
         submatrix = 'nucleicmatrix'
 
-    data = Data.Data(models, chains, search, replace_with='X')
+    data = Data.Data(models, chains, search, replace_with='X', states=states)
+
+    # Seed index of distinct chain sequences, shared by all targets
+    seed_index = None
+    if seed:
+        seed_index = SeedIndex.SeedIndex(data.get_sequences(), seed)
+
+    scheduler = Scheduler.Scheduler(processes)
 
     for target in targets:
         try:
             search_results = subseq_ga_search(target, data, submatrix,
-                                              gapcost, minscore, firstonly)
+                                              gapcost, minscore, firstonly,
+                                              engine, maxmemory, gapopen,
+                                              gapextend, band, scheduler,
+                                              mode, seed_index, seedhits)
         except Exception as e:
             logging.error("{0}".format(e))
             continue
@@ -115,56 +216,95 @@ SUBSEQ                          2018-06-01
             logging.info("Nothing can be found for given target: {0}"
                          .format(target))
 
+    scheduler.close()
+
 
-def subseq_ga_search(target, data, matrix, gap_cost, min_score, first_only):
+def subseq_ga_search(
+        target, data, matrix, gap_cost, min_score, first_only,
+        engine='python', max_memory=1024., gap_open=None, gap_extend=None,
+        band=0, scheduler=None, mode='global', seed_index=None,
+        seed_hits=2):
     '''Global alignment search'''
     # Substitution matrix
-    sub_matrix = SubMatrix.SubMatrix(matrix)
+    sub_matrix = SubMatrix.get_matrix(matrix)
 
     # The maximum score for given target
     max_score = alignment.calculate_max_score(target, sub_matrix)
 
-    match_list = list()
-
-    for model in data.keys():
-        for chain in data[model].keys():
-            sequence = data[model][chain]['sequence']
-
-            nw = NeedlemanWunch.NeedlemanWunsch(target, sequence, gap_cost, sub_matrix)
-            alignment_score = nw.get_alignment_score()
-
-            if max(float(alignment_score) / max_score * 100, 0) < min_score:
-                continue
-
-            aligned_target, aligned_sequence, start_i, start_j =\
-                nw.get_traceback()
-
-            # Remove tailing gaps '-' from aligned target
-            while aligned_target[-1] is '-':
-                aligned_target = aligned_target[:-1]
-                aligned_sequence = aligned_sequence[:-1]
-
-            start_pos = start_j
-
-            for _ in range(0, len(aligned_sequence.replace('-', ''))):
-                resi = data[model][chain]['ids'][start_pos]
-                match_list.append((model, chain, resi))
-                start_pos += 1
-
-            alignment_string, identities, gaps, mismatches = \
-                alignment.create_alignment_string(aligned_target, aligned_sequence)
-
-            alignment.print_alignment(
-                model, chain, target, sequence, sub_matrix.get_name(),
-                gap_cost, nw.get_alignment_score(), max_score, identities,
-                mismatches, gaps, aligned_target, aligned_sequence,
-                alignment_string, start_i, start_j + 1,
-                data[model][chain]['ids'])
-
-            if first_only:
-                break
-        else:
-            continue
-        break
+    # Gap cost as it is printed with alignments
+    gap_cost_name = gap_cost
+    if gap_open is not None:
+        gap_cost_name = '{0} (open), {1} (extend)'.format(
+            gap_open, gap_extend)
+
+    if scheduler is None:
+        scheduler = Scheduler.Scheduler()
+
+    # Chains with enough seed hits of the target
+    candidates = None
+    if seed_index is not None:
+        candidates = seed_index.get_candidates(target, seed_hits)
+
+    # Chains having the same sequence are aligned once, hits of the first
+    # of them are given to all
+    copies = dict((keys[0], keys) for keys in data.get_copies())
+
+    # Chains split into tasks of similar score matrix sizes, residue codes
+    # are copied if they are sent to worker processes
+    chains = [(model, chain, data[model][chain]['sequence'],
+               data.get_codes(model, chain, sub_matrix,
+                              copy=scheduler.processes != 1))
+              for model, chain in copies
+              if candidates is None
+              or data.digests[model, chain] in candidates]
+    tasks = [(target, matrix, gap_cost, min_score, first_only, engine,
+              max_memory, gap_open, gap_extend, band, mode, task_chains)
+             for task_chains in Scheduler.split_tasks(
+                 chains, alignment_tasks.task_sizes(target, chains),
+                 scheduler.get_parts())]
+
+    # (model, chain, match, print_alignment arguments) of all hits, printed
+    # in model/chain order once the search is over
+    alignments = list()
+    order = data.get_order()
+
+    try:
+        for hits in scheduler.map(alignment_tasks.global_alignment_task, tasks):
+            for hit_model, hit_chain, alignment_score, aligned_target, \
+                    aligned_sequence, start_i, start_j in hits:
+                alignment_string, identities, gaps, mismatches = \
+                    alignment.create_alignment_string(aligned_target, aligned_sequence)
+
+                for model, chain in copies[hit_model, hit_chain]:
+                    sequence = data[model][chain]['sequence']
+                    start_pos = start_j
+                    length = len(aligned_sequence.replace('-', ''))
+
+                    match = None
+                    if length:
+                        match = data.get_match(
+                            model, chain, start_pos, start_pos + length)
+
+                    alignments.append((model, chain, match, (
+                        model, chain, target, sequence, sub_matrix.get_name(),
+                        gap_cost_name, alignment_score, max_score, identities,
+                        mismatches, gaps, aligned_target, aligned_sequence,
+                        alignment_string, start_i, start_j + 1,
+                        data[model][chain]['ids'])))
+
+                    if first_only:
+                        # the first hit is found, outstanding tasks are not
+                        # needed
+                        scheduler.cancel()
+                        match_list = alignment.print_alignments(
+                            alignments, order)
+
+                        return match_list if len(match_list) != 0 else None
+
+    except Exception:
+        scheduler.cancel()
+        raise
+
+    match_list = alignment.print_alignments(alignments, order)
 
     return match_list if len(match_list) != 0 else None
@@ -1,25 +1,36 @@
 import logging
+from collections import OrderedDict
 
 import alignment
+import alignment_tasks
 import CallCounter
 import subseq_parse
 import subseq_select
 import SubMatrix
-import SmithWaterman
+import Scheduler
+import SeedIndex
 import Data
 
 
+# Score matrix filling engines
+LOCAL_ENGINES = alignment_tasks.LOCAL_ENGINES
+
+
 def subseq_local_alignment(
         targets, submatrix='blossum62', chains='all', search='aminoacids',
         firstonly='False', gapcost='10.', minscore='51.', models='all',
-        sele='ss-{method}-{id}-{target}'):
+        sele='ss-{method}-{id}-{target}', engine='python', gapopen=None,
+        gapextend=None, processes='1', xdrop='25.', seed='0',
+        seedhits='2', twohit='0', maxhits='0', states='current'):
     """
 DESCRIPTION
     subseq.local - tool for searching target sequences using local alignment
 
 USAGE
     subseq.local targets, [submatrix, [chains, [search, [firstonly, [gapcost,
-                 minscore, [models, [sele]]]]]]]
+                 minscore, [models, [sele, [engine, [gapopen,
+                 [gapextend, [processes, [xdrop, [seed,
+                 [seedhits, [twohit, [maxhits, [states]]]]]]]]]]]]]]]]]
 
 IMPORTANT
     All modified amino or nucleic acids are replaced with: X
@@ -31,7 +42,9 @@ PARAMETERS
                                 - targets=SIS KATK AK
                                 - targets=PATH/TO/TARGETS_FILE
 
-    submatrix=<FILE>        ; Path to substitution matrix file
+    submatrix=<FILE>        ; Path to substitution matrix file or one of
+                              built-in matrices: blosum45, blosum62, blosum80,
+                              pam30, pam70, pam250, nucleicmatrix
                               Default: blossum62
 
     chains=<list>           ; The list of chains
@@ -70,6 +83,81 @@ PARAMETERS
                                 - {id}     - id
                               Default: 'ss-{method}-{id}-{target}'
 
+    engine=<str>            ; Score matrix filling engine
+                                - python: cell by cell
+                                - numpy: anti-diagonal by anti-diagonal
+                                  using NumPy arrays (pays off only when
+                                  both the target and the chains are
+                                  hundreds of residues long, slower than
+                                  python for shorter targets)
+                                - striped: scores every chain with a striped
+                                  target profile first and fills the score
+                                  matrix only for chains passing minscore
+                                  (pays off when few chains pass minscore)
+                                - batch: scores all chains at once in padded
+                                  NumPy blocks first and fills the score
+                                  matrix only for chains passing minscore
+                                  (fastest for many short chains)
+                                - xdrop: extends word hits of the target
+                                  with X-drop gapped extension, explores
+                                  only the neighbourhood of the hits
+                                  (fastest for long chains)
+                              Default: python
+
+    gapopen=<float>         ; The affine gap opening cost. A gap of length k
+                              costs gapopen + (k - 1) * gapextend. If given,
+                              gapcost and engine are not used
+                              Default: None (linear gapcost is used)
+
+    gapextend=<float>       ; The affine gap extension cost
+                              Default: gapcost
+
+    processes=<int>         ; Number of worker processes aligning chains in
+                              parallel, 0 - one per CPU core
+                              Default: 1
+
+    xdrop=<float>           ; X-drop of the xdrop engine. Extension stops
+                              where the score falls more than xdrop below
+                              the best score seen so far
+                              Default: 25.00
+
+    seed=<int|mask>         ; Seed index prefilter. Only chains sharing at
+                              least seedhits seeds with the target on one
+                              diagonal are aligned. Seeds are k residues long
+                              (seed=3) or read through a spaced seed mask
+                              where 0 positions are not compared
+                              (seed=11011)
+                              Default: 0 (all chains are aligned)
+
+    seedhits=<int>          ; The minimum number of seed hits on a common
+                              diagonal of the target and a chain
+                              Default: 2
+
+    twohit=<float>          ; Two-hit prefilter threshold T. Only chains
+                              holding two non-overlapping words on one
+                              diagonal, each scoring at least T against a
+                              3 residue word of the target, are aligned.
+                              Finds similar, not only identical, words.
+                              Targets shorter than 6 residues are aligned
+                              on a single such word.
+                              Example: twohit=11
+                              Default: 0 (the prefilter is not used)
+
+    maxhits=<int>           ; The maximum number of alignments of a chain.
+                              Alignments are taken best first and no two of
+                              them align the same pair of residues, so
+                              repeated domains are found in one search.
+                              engine is not used, gapopen can not be given
+                              Default: 0 (only the best alignments)
+
+    states=<list>           ; States of multi-state models to search, every
+                              state is extracted and states with the same
+                              residues of a chain are searched once
+                                - current: the current state
+                                - all: all states
+                                - states=1 5 10
+                              Default: current
+
 EXAMPLE
     subseq.local KTGT, blossum62, firstonly=True, gapcost=12.5, chains=A B
 
@@ -88,6 +176,16 @@ SUBSEQ                          2018-06-01
     gapcost = subseq_parse.parse_gapcost(gapcost)
     minscore = subseq_parse.parse_minscore(minscore)
     models = subseq_parse.parse_models(models)
+    gapopen = subseq_parse.parse_gapopen(gapopen)
+    gapextend = subseq_parse.parse_gapextend(gapextend, gapcost)
+    engine = subseq_parse.parse_engine(engine, LOCAL_ENGINES)
+    processes = subseq_parse.parse_processes(processes)
+    xdrop = subseq_parse.parse_xdrop(xdrop)
+    seed = subseq_parse.parse_seed(seed)
+    seedhits = subseq_parse.parse_seedhits(seedhits)
+    twohit = subseq_parse.parse_twohit(twohit)
+    maxhits = subseq_parse.parse_maxhits(maxhits, gapopen)
+    states = subseq_parse.parse_states(states)
 
     if logging.error.counter is not 0:
         logging.info("{0} errors were found. ".format(logging.error.counter) +
@@ -98,12 +196,22 @@ SUBSEQ                          2018-06-01
     if search is 'nucleicacids' and submatrix is 'blossum62':
         submatrix = 'nucleicmatrix'
 
-    data = Data.Data(models, chains, search, replace_with='X')
+    data = Data.Data(models, chains, search, replace_with='X', states=states)
+
+    # Seed index of distinct chain sequences, shared by all targets
+    seed_index = None
+    if seed:
+        seed_index = SeedIndex.SeedIndex(data.get_sequences(), seed)
+
+    scheduler = Scheduler.Scheduler(processes)
 
     for target in targets:
         try:
             search_results = subseq_la_search(target, data, submatrix,
-                                              gapcost, minscore, firstonly)
+                                              gapcost, minscore, firstonly,
+                                              engine, gapopen, gapextend,
+                                              scheduler, xdrop, seed_index,
+                                              seedhits, twohit, maxhits)
         except Exception as e:
             logging.error("{0}".format(e))
             continue
@@ -115,51 +223,112 @@ SUBSEQ                          2018-06-01
             logging.info("Nothing can be found for given target: {0}"
                          .format(target))
 
+    scheduler.close()
 
-def subseq_la_search(target, data, matrix, gap_cost, min_score, first_only):
+
+def subseq_la_search(
+        target, data, matrix, gap_cost, min_score, first_only,
+        engine='python', gap_open=None, gap_extend=None, scheduler=None,
+        x_drop=25., seed_index=None, seed_hits=2, two_hit=0, max_hits=0):
     # Substitution matrix
-    sub_matrix = SubMatrix.SubMatrix(matrix)
+    sub_matrix = SubMatrix.get_matrix(matrix)
 
     # The maximum score for given target
     max_score = alignment.calculate_max_score(target, sub_matrix)
 
-    match_list = list()
+    # Gap cost as it is printed with alignments
+    gap_cost_name = gap_cost
+    if gap_open is not None:
+        gap_cost_name = '{0} (open), {1} (extend)'.format(
+            gap_open, gap_extend)
+
+    if scheduler is None:
+        scheduler = Scheduler.Scheduler()
+
+    # Chains with enough seed hits of the target and their anchors
+    candidates = None
+    if seed_index is not None:
+        candidates = seed_index.get_candidates(target, seed_hits)
+
+    # Chains having the same sequence are aligned once, hits of the first
+    # of them are given to all. With first_only every model takes its first
+    # hit in model/chain order, so chains are sent in that order and tasks
+    # align repeated sequences once
+    if first_only:
+        copies = OrderedDict(((model, chain), [(model, chain)])
+                             for model in data.keys()
+                             for chain in data[model].keys())
+    else:
+        copies = OrderedDict((keys[0], keys) for keys in data.get_copies())
+
+    # Chains split into tasks of similar score matrix sizes, residue codes
+    # are copied if they are sent to worker processes
+    chains = [(model, chain, data[model][chain]['sequence'],
+               data.get_codes(model, chain, sub_matrix,
+                              copy=scheduler.processes != 1),
+               candidates[data.digests[model, chain]]
+               if candidates is not None else None)
+              for model, chain in copies
+              if candidates is None
+              or data.digests[model, chain] in candidates]
+    tasks = [(target, matrix, gap_cost, min_score, first_only, engine,
+              gap_open, gap_extend, x_drop, two_hit, max_hits, task_chains)
+             for task_chains in Scheduler.split_tasks(
+                 chains, alignment_tasks.task_sizes(target, chains),
+                 scheduler.get_parts())]
+
+    # (model, chain, match, print_alignment arguments) of all hits, printed
+    # in model/chain order once the search is over
+    alignments = list()
+    order = data.get_order()
+
+    # models which already have an alignment, used with first_only
+    found_models = set()
+
+    try:
+        for hits in scheduler.map(alignment_tasks.local_alignment_task, tasks):
+            for hit_model, hit_chain, best_score, aligned_target, \
+                    aligned_sequence, start_i, start_j in hits:
+                alignment_string, identities, gaps, mismatches = \
+                    alignment.create_alignment_string(aligned_target, aligned_sequence)
 
-    for model in data.keys():
-        for chain in data[model].keys():
-            sequence = data[model][chain]['sequence']
-            sw = SmithWaterman.SmithWaterman(target, sequence, gap_cost, sub_matrix)
+                for model, chain in copies[hit_model, hit_chain]:
+                    if model in found_models:
+                        continue
 
-            # Skip if alignment best score is less than minimum passing score
-            if float(sw.get_best_score()) / max_score * 100 < min_score:
-                continue
+                    sequence = data[model][chain]['sequence']
+                    start_pos = start_j - 1
+                    length = len(aligned_sequence.replace('-', ''))
 
-            for i, j in sw.get_coordinates():
+                    match = None
+                    if length:
+                        match = data.get_match(
+                            model, chain, start_pos, start_pos + length)
 
-                aligned_target, aligned_sequence, start_i, start_j =\
-                    sw.get_traceback(i, j)
+                    alignments.append((model, chain, match, (
+                        model, chain, target, sequence, sub_matrix.get_name(),
+                        gap_cost_name, best_score, max_score, identities,
+                        mismatches, gaps, aligned_target, aligned_sequence,
+                        alignment_string, start_i, start_j,
+                        data[model][chain]['ids'])))
 
-                start_pos = start_j - 1
+                    if first_only:
+                        found_models.add(model)
 
-                for _ in range(0, len(aligned_sequence.replace('-', ''))):
-                    resi = data[model][chain]['ids'][start_pos]
-                    match_list.append((model, chain, resi))
-                    start_pos += 1
+                        # every model has its first hit, outstanding tasks
+                        # are not needed
+                        if len(found_models) == len(data.keys()):
+                            scheduler.cancel()
+                            match_list = alignment.print_alignments(
+                                alignments, order)
 
-                alignment_string, identities, gaps, mismatches = \
-                    alignment.create_alignment_string(aligned_target, aligned_sequence)
+                            return match_list \
+                                if len(match_list) != 0 else None
 
-                alignment.print_alignment(
-                    model, chain, target, sequence, sub_matrix.get_name(),
-                    gap_cost, sw.get_best_score(), max_score, identities,
-                    mismatches, gaps, aligned_target, aligned_sequence,
-                    alignment_string, start_i, start_j,
-                    data[model][chain]['ids'])
+    except Exception:
+        scheduler.cancel()
+        raise
 
-                if first_only:
-                    break
-            else:
-                continue
-            break
+    match_list = alignment.print_alignments(alignments, order)
 
-    return match_list if len(match_list) != 0 else None
\ No newline at end of file
+    return match_list if len(match_list) != 0 else None
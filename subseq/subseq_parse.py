@@ -2,6 +2,8 @@ import logging
 import re
 import os
 
+import SeedIndex
+
 from pymol import cmd
 
 def parse_targets(targets):
@@ -47,13 +49,8 @@ def parse_models(models):
 
 def parse_chains(chains):
     """Parser for user input"""
-    all_models = cmd.get_names('objects')
-    all_chains = list()
-
-    for model in all_models:
-        all_chains.extend(cmd.get_chains(model))
-
-    all_chains = list(set(all_chains))
+    # chains of all objects in one call
+    all_chains = list(set(cmd.get_chains('all')))
 
     if chains.lower() == 'all':
         chains = all_chains
@@ -103,6 +100,32 @@ def parse_gapcost(gapcost):
     return gapcost
 
 
+def parse_gapopen(gapopen):
+    """Parser for user input"""
+    if gapopen is None:
+        return None
+
+    try:
+        gapopen = float(gapopen)
+    except ValueError:
+        logging.error("parameter 'gapopen' is not a valid float value")
+
+    return gapopen
+
+
+def parse_gapextend(gapextend, gapcost):
+    """Parser for user input"""
+    if gapextend is None:
+        return gapcost
+
+    try:
+        gapextend = float(gapextend)
+    except ValueError:
+        logging.error("parameter 'gapextend' is not a valid float value")
+
+    return gapextend
+
+
 def parse_minscore(minscore):
     """Parser for user input"""
     try:
@@ -113,3 +136,154 @@ def parse_minscore(minscore):
         logging.error("parameter 'minscore' is not a valid float value")
 
     return minscore
+
+
+def parse_maxmemory(maxmemory):
+    """Parser for user input"""
+    try:
+        maxmemory = float(maxmemory)
+        if maxmemory <= 0:
+            logging.error("maxmemory value should be greater than 0")
+    except ValueError:
+        logging.error("parameter 'maxmemory' is not a valid float value")
+
+    return maxmemory
+
+
+def parse_band(band):
+    """Parser for user input"""
+    try:
+        band = int(band)
+        if band < 0:
+            logging.error("band value should not be negative")
+    except ValueError:
+        logging.error("parameter 'band' is not a valid integer value")
+
+    return band
+
+
+def parse_engine(engine, engines):
+    """Parser for user input"""
+    if engine.lower() in engines:
+        engine = engine.lower()
+    else:
+        logging.error("parameter 'engine' is invalid, choose from: {0}"
+                      .format(', '.join(sorted(engines))))
+
+    return engine
+
+
+def parse_processes(processes):
+    """Parser for user input"""
+    try:
+        processes = int(processes)
+        if processes < 0:
+            logging.error("processes value should not be negative")
+    except ValueError:
+        logging.error("parameter 'processes' is not a valid integer value")
+
+    return processes
+
+
+def parse_mode(mode, modes):
+    """Parser for user input"""
+    if mode.lower() in modes:
+        mode = mode.lower()
+    else:
+        logging.error("parameter 'mode' is invalid, choose from: {0}"
+                      .format(', '.join(sorted(modes))))
+
+    return mode
+
+
+def parse_xdrop(xdrop):
+    """Parser for user input"""
+    try:
+        xdrop = float(xdrop)
+        if xdrop <= 0:
+            logging.error("xdrop value should be greater than 0")
+    except ValueError:
+        logging.error("parameter 'xdrop' is not a valid float value")
+
+    return xdrop
+
+
+def parse_seed(seed):
+    """Parser for user input"""
+    mask = SeedIndex.parse_mask(seed)
+
+    if mask is None:
+        logging.error("parameter 'seed' should be a seed length or "
+                      "a spaced seed mask like 11011")
+
+    return mask
+
+
+def parse_seedhits(seedhits):
+    """Parser for user input"""
+    try:
+        seedhits = int(seedhits)
+        if seedhits < 1:
+            logging.error("seedhits value should be greater than 0")
+    except ValueError:
+        logging.error("parameter 'seedhits' is not a valid integer value")
+
+    return seedhits
+
+
+def parse_twohit(twohit):
+    """Parser for user input"""
+    try:
+        twohit = float(twohit)
+        if twohit < 0:
+            logging.error("twohit value should not be negative")
+    except ValueError:
+        logging.error("parameter 'twohit' is not a valid float value")
+
+    return twohit
+
+
+def parse_mismatches(mismatches):
+    """Parser for user input"""
+    try:
+        mismatches = int(mismatches)
+        if mismatches < 0:
+            logging.error("mismatches value should not be negative")
+    except ValueError:
+        logging.error("parameter 'mismatches' is not a valid integer value")
+
+    return mismatches
+
+
+def parse_maxhits(maxhits, gapopen):
+    """Parser for user input"""
+    try:
+        maxhits = int(maxhits)
+        if maxhits < 0:
+            logging.error("maxhits value should not be negative")
+        elif maxhits and gapopen is not None:
+            logging.error("maxhits can not be used with affine gap costs")
+    except ValueError:
+        logging.error("parameter 'maxhits' is not a valid integer value")
+
+    return maxhits
+
+
+def parse_states(states):
+    """Parser for user input. Returns None for the current state and
+    a list of states otherwise, 0 stands for all states
+    """
+    if states.lower() == 'current':
+        return None
+
+    if states.lower() == 'all':
+        return [0]
+
+    try:
+        states = [int(state) for state in states.split(" ")]
+        if any(state < 1 for state in states):
+            logging.error("states should be positive")
+    except ValueError:
+        logging.error("parameter 'states' is not a list of integer values")
+
+    return states
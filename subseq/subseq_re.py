@@ -1,20 +1,41 @@
+import itertools
 import logging
 import re
+from collections import OrderedDict
 
 import subseq_parse
 import subseq_select
 import CallCounter
 import Data
+import FMIndex
+import AhoCorasick
+import regex_literals
+
+# Targets standing for more literals are not searched with Aho-Corasick
+MAX_LITERALS = 1024
+
+# Nucleic acid wildcards and residues they stand for, N stands for any
+IUPAC = {
+    'R': 'AG', 'Y': 'CT', 'S': 'GC', 'W': 'AT', 'K': 'GT', 'M': 'AC',
+    'B': 'CGT', 'D': 'AGT', 'H': 'ACT', 'N': 'ACGTUX',
+}
+
+# (target, search, flags) -> compiled target of recent searches,
+# kept for the session, least recently used ones are dropped first
+compiled_targets = OrderedDict()
+COMPILED_TARGETS_SIZE = 256
 
 def subseq_re(
         targets, chains='all', search='aminoAcids', firstonly='False',
-        models='all', sele='ss-{method}-{id}-{target}'):
+        models='all', sele='ss-{method}-{id}-{target}', mismatches='0',
+        states='current'):
     """
 DESCRIPTION
     subseq - tool for searching target sequences using Regular Expressions
 
 USAGE
-    subseq targets, [chains, [search, [firstonly, [models, [sele]]]]]
+    subseq targets, [chains, [search, [firstonly, [models, [sele,
+           [mismatches, [states]]]]]]]
 
 IMPORTANT
     All modified amino or nucleic acids are replaced with: X
@@ -60,8 +81,26 @@ PARAMETERS
                                 - {id}     - id
                               Default: 'ss-{method}-{id}-{target}'
 
+    mismatches=<int>        ; Maximum number of mismatching residues.
+                              Only fixed length targets (residues, '.' and
+                              [...] classes) can have mismatches, they are
+                              searched in an FM-index of all chains.
+                              Other targets are scanned chain by chain.
+                              Lists of literal targets without mismatches
+                              are searched all at once with Aho-Corasick
+                              Default: 0
+
+    states=<list>           ; States of multi-state models to search, every
+                              state is extracted and states with the same
+                              residues of a chain are searched once
+                                - current: the current state
+                                - all: all states
+                                - states=1 5 10
+                              Default: current
+
 EXAMPLE
     subseq KTGT (KT{2,4}), A B C, firstonly=True, search=nucleicacids
+    subseq GATTACA, search=nucleicacids, mismatches=1
 
 SEE ALSO
     subseq.local, subseq.global
@@ -77,6 +116,8 @@ SUBSEQ                          2018-06-01
     search = subseq_parse.parse_search(search)
     firstonly = subseq_parse.parse_firstonly(firstonly)
     models = subseq_parse.parse_models(models)
+    mismatches = subseq_parse.parse_mismatches(mismatches)
+    states = subseq_parse.parse_states(states)
 
     if logging.error.counter is not 0:
         logging.info("{0} errors were found. ".format(logging.error.counter) +
@@ -84,13 +125,35 @@ SUBSEQ                          2018-06-01
 
         return
 
-    data = Data.Data(models, chains, search, replace_with='X')
+    data = Data.Data(models, chains, search, replace_with='X', states=states)
+
+    # built on the first fixed length target searched with mismatches,
+    # exact targets are scanned faster with RegExp than the index is built
+    fm_index = None
+
+    # offsets of all targets when every one of them is a literal
+    found = None
+    if len(targets) > 1 and not mismatches:
+        found = subseq_literal_search(targets, data, search)
 
     search_results = None
 
-    for target in targets:
+    for number, target in enumerate(targets):
         try:
-            search_results = subseq_re_search(target, data, firstonly, search)
+            if found is not None:
+                search_results = subseq_re_search(
+                    target, data, firstonly, search, offsets=found[number])
+
+            else:
+                pattern = FMIndex.parse_pattern(
+                    iupac_pattern(target.strip("'()\""), search))
+
+                if pattern is not None and mismatches and fm_index is None:
+                    fm_index = FMIndex.FMIndex(data.get_sequences())
+
+                search_results = subseq_re_search(
+                    target, data, firstonly, search,
+                    fm_index=fm_index, mismatches=mismatches)
 
         except Exception as e:
             logging.warning("RegExp for {0}: {1}".format(target, e))
@@ -104,50 +167,222 @@ SUBSEQ                          2018-06-01
                          .format(target))
 
 
-def subseq_re_search(target, data, first_only, search_for):
+def iupac_pattern(target, search_for):
+    """Returns the target with nucleic acid wildcards replaced in a single
+    pass: by a class outside of classes and by residues they stand for
+    inside of them. Escaped characters are left as they are
+    """
+    if search_for != 'nucleicacids':
+        return target
+
+    translated = list()
+    in_class = False
+    # position of a class where ']' is a residue and does not close it
+    class_start = None
+    k = 0
+
+    while k < len(target):
+        symbol = target[k]
+
+        if symbol == '\\':
+            translated.append(target[k:k + 2])
+            k += 2
+            continue
+
+        if symbol == '[' and not in_class:
+            in_class = True
+            class_start = k + 1 + (target[k + 1:k + 2] == '^')
+            translated.append(symbol)
+
+        elif symbol == ']' and in_class and k != class_start:
+            in_class = False
+            translated.append(symbol)
+
+        elif symbol in IUPAC and in_class:
+            translated.append(IUPAC[symbol])
+
+        elif symbol == 'N':
+            translated.append('.')
+
+        elif symbol in IUPAC:
+            translated.append('[{0}]'.format(IUPAC[symbol]))
+
+        else:
+            translated.append(symbol)
+
+        k += 1
+
+    return ''.join(translated)
+
+
+def compile_target(target, search_for, flags=re.I):
+    """Returns (RegExp object, required literals, maximum match width) of
+    the target, taken from the session cache if it was compiled recently
+    """
+    key = (target, search_for, flags)
+
+    if key in compiled_targets:
+        compiled = compiled_targets.pop(key)
+
+    else:
+        pattern = iupac_pattern(target, search_for)
+        compiled = (re.compile(pattern, flags),) + \
+            regex_literals.required_literals(pattern, flags)
+
+    compiled_targets[key] = compiled
+    if len(compiled_targets) > COMPILED_TARGETS_SIZE:
+        compiled_targets.popitem(last=False)
+
+    return compiled
+
+
+def literal_strings(target, search_for):
+    """Returns all literal strings the target stands for, None if it is not
+    a literal, possibly with nucleic acid wildcards, or stands for more than
+    MAX_LITERALS strings
+    """
+    pattern = FMIndex.parse_pattern(
+        iupac_pattern(target.strip("'()\""), search_for))
+
+    if pattern is None or any(negated for negated, _ in pattern):
+        return None
+
+    count = 1
+    for _, residues in pattern:
+        count *= len(residues)
+
+    if count > MAX_LITERALS:
+        return None
+
+    return [''.join(literal) for literal in itertools.product(
+        *[sorted(residues) for _, residues in pattern])]
+
+
+def subseq_literal_search(targets, data, search_for):
+    """Returns a list of dicts, one per target: sequence digest -> sorted
+    offsets of all target occurrences. Every distinct sequence is scanned
+    once by the Aho-Corasick automaton of all targets. Returns None if any
+    of targets is not a literal
+    """
+    literals = [literal_strings(target, search_for) for target in targets]
+
+    if any(target_literals is None for target_literals in literals):
+        return None
+
+    keywords = sorted(set(itertools.chain(*literals)))
+    keyword_numbers = dict((keyword, number)
+                           for number, keyword in enumerate(keywords))
+
+    # keyword_targets[keyword number] - numbers of targets it stands for
+    keyword_targets = [list() for _ in keywords]
+    for number, target_literals in enumerate(literals):
+        for literal in target_literals:
+            keyword_targets[keyword_numbers[literal]].append(number)
+
+    automaton = AhoCorasick.AhoCorasick(keywords)
+    found = [dict() for _ in targets]
+
+    for digest, sequence in data.get_sequences():
+        for offset, keyword in automaton.find_all(sequence):
+            for number in keyword_targets[keyword]:
+                found[number].setdefault(digest, list()).append(offset)
+
+    for target_found in found:
+        for offsets in target_found.values():
+            offsets.sort()
+
+    return found
+
+
+def non_overlapping(offsets, length):
+    """Yields (start, length) of leftmost non-overlapping matches
+    out of sorted offsets of matches of the same length
+    """
+    end = 0
+
+    for offset in offsets:
+        if offset >= end:
+            end = offset + length
+            yield offset, length
+
+
+def regex_matches(re_target, sequence, literals, width):
+    """Yields (start, length) of RegExp matches in the sequence. Only windows
+    around the longest required literal are scanned if the match width is
+    bounded
+    """
+    if width is None or not literals:
+        spans = [(0, len(sequence))]
+    else:
+        spans = regex_literals.windows(sequence, literals[0], width)
+
+    for start, end in spans:
+        for match in re_target.finditer(sequence, start, end):
+            yield match.start(), len(match.group())
+
+
+def subseq_re_search(target, data, first_only, search_for, fm_index=None,
+                     mismatches=0, offsets=None):
     """
     work flow:
-        1) create a RegExp object
-        2) scan data by using RegExp object
-        3) append information about match to match_list
+        1) create a RegExp object and find literals its matches contain
+           or parse a fixed length target
+        2) scan chains and windows holding these literals by using RegExp
+           object or look the target up in the FM-index, unless offsets of
+           the target are given
+        3) append (model, chain, resi list, states) of every match to
+           match_list, chains having the same sequence share its matches
         4) return match_list if its length is not 0 else return None
     """
     match_list = list()
 
     target = target.strip("'()\"")
 
-    # Replace wildcards
-    if search_for == 'nucleicacids':
-        target = target.replace('R', '[AG]')
-        target = target.replace('Y', '[CT]')
-        target = target.replace('S', '[GC]')
-        target = target.replace('W', '[AT]')
-        target = target.replace('K', '[GT]')
-        target = target.replace('M', '[AC]')
-        target = target.replace('B', '[CGT]')
-        target = target.replace('D', '[AGT]')
-        target = target.replace('H', '[ACT]')
-        target = target.replace('N', '.')
-
-    # RegExp validation
-    try:
-        # re.I - ignore case sensitive
-        re_target = re.compile(target, re.I)
-    except Exception:
-        raise
-
-    # scan data by using RegExp object
+    pattern = FMIndex.parse_pattern(iupac_pattern(target, search_for))
+
+    if offsets is None and pattern is not None and fm_index is not None:
+        offsets = fm_index.find(pattern, mismatches)
+
+    if offsets is None and mismatches:
+        raise ValueError("mismatches are allowed only for fixed length "
+                         "targets")
+
+    if offsets is None:
+        # RegExp validation, literals every match contains and the maximum
+        # match width. re.I - ignore case sensitive
+        re_target, literals, width = compile_target(target, search_for, re.I)
+
+    # sequence digest -> matches, every distinct sequence is scanned once
+    # and its matches are given to all chains having it
+    scanned = dict()
+
+    # scan data by using RegExp object or found offsets
     for model in data.keys():
         for chain in data[model].keys():
-            for match in re_target.finditer(data[model][chain]['sequence']):
-                start_pos = match.start()
+            digest = data.digests[model, chain]
+
+            if digest not in scanned:
+                sequence = data[model][chain]['sequence']
+
+                if offsets is not None:
+                    matches = non_overlapping(
+                        offsets.get(digest, ()), len(pattern))
+
+                # skip sequences missing any of required literals
+                elif not all(literal in sequence for literal in literals):
+                    matches = ()
 
-                for _ in range(0, len(match.group())):
-                    resi = data[model][chain]['ids'][start_pos]
+                else:
+                    matches = regex_matches(
+                        re_target, sequence, literals, width)
 
-                    match_list.append((model, chain, resi))
+                scanned[digest] = list(itertools.islice(
+                    matches, 1 if first_only else None))
 
-                    start_pos += 1
+            for start_pos, length in scanned[digest]:
+                if length:
+                    match_list.append(data.get_match(
+                        model, chain, start_pos, start_pos + length))
 
                 if first_only:
                     break
@@ -6,7 +6,10 @@ from pymol import cmd, stored
 stored.id = 0
 
 def select(select_list, target, sele, method):
-    """Creates pymol selection object"""
+    """Creates pymol selection object of (model, chain, resi list, states)
+    hits, one selection command per hit. Hits with states select only atoms
+    present in them
+    """
 
     select_name = string.Formatter().vformat(
         sele,
@@ -23,10 +26,16 @@ def select(select_list, target, sele, method):
         model = select_tuple[0]
         chain = select_tuple[1]
         resi = select_tuple[2]
+        states = select_tuple[3] if len(select_tuple) > 3 else None
 
-        # select /model/?/chain/resi-resi
+        # select /model/?/chain/resi-resi+resi
         select_query = " | /{0}//{1}/{2}".format(model, chain, resi)
 
+        if states:
+            select_query = " | (/{0}//{1}/{2} and ({3}))".format(
+                model, chain, resi,
+                ' or '.join('state {0}'.format(state) for state in states))
+
         # Execute and append selection to select_id
         cmd.select(select_name, select_name + select_query)
 
@@ -0,0 +1,163 @@
+import os
+import random
+import re
+import sys
+import types
+
+import pytest
+
+# subseq modules import each other by their flat names
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'subseq'))
+
+# Modules talking to PyMOL get a stand-in module when PyMOL is not
+# installed, tests replace their cmd with FakeCmd
+try:
+    import pymol
+except ImportError:
+    pymol = types.ModuleType('pymol')
+    pymol.cmd = None
+    pymol.stored = types.SimpleNamespace()
+    sys.modules['pymol'] = pymol
+
+import Data
+import SubMatrix
+import subseq_parse
+
+AMINO_ACIDS = 'ARNDCQEGHILKMFPSTWYVX'
+
+
+def random_sequence(rng, length):
+    return ''.join(rng.choice(AMINO_ACIDS) for _ in range(length))
+
+
+def mutate(rng, sequence, changes):
+    """Returns the sequence with random substitutions, insertions and
+    deletions
+    """
+    residues = list(sequence)
+
+    for _ in range(changes):
+        position = rng.randrange(len(residues) + 1)
+        kind = rng.random()
+
+        if kind < .4 and position < len(residues):
+            residues[position] = rng.choice(AMINO_ACIDS)
+        elif kind < .7:
+            residues.insert(position, rng.choice(AMINO_ACIDS))
+        elif position < len(residues):
+            del residues[position]
+
+    return ''.join(residues)
+
+
+@pytest.fixture
+def sub_matrix():
+    return SubMatrix.get_matrix('blossum62')
+
+
+@pytest.fixture
+def pairs():
+    """Returns a list of (target, sequence, gap_cost), half of the
+    sequences hold a mutated copy of the target
+    """
+    rng = random.Random(1)
+    pairs = list()
+
+    for _ in range(200):
+        target = random_sequence(rng, rng.randint(1, 15))
+        sequence = random_sequence(rng, rng.randint(1, 40))
+
+        if rng.random() < .5:
+            sequence = sequence[:5] + mutate(rng, target, 3) + sequence[5:]
+
+        pairs.append((target, sequence, rng.choice([.3, 1., 2.5, 4., 10.])))
+
+    return pairs
+
+
+class FakeCmd:
+    """
+    The part of pymol.cmd used by Data and subseq_parse, working on a list
+    of main atoms. Selections are read as the ones Data builds: a main
+    atom selection followed by model and chain lists
+    """
+
+    def __init__(self):
+        # dicts of model, chain, resn, resi, name and states
+        self.atoms = list()
+        self.selections = list()
+
+    def load(self, model, chain, residues, states=(1,)):
+        """Adds main atoms of (resn, resi) residues, resi are numbered from
+        1 if residues is a list of resn
+        """
+        for number, residue in enumerate(residues, 1):
+            resn, resi = residue if isinstance(residue, tuple) else \
+                (residue, str(number))
+            self.atoms.append(dict(
+                model=model, chain=chain, resn=resn, resi=resi,
+                name="C1'" if len(resn) < 3 else 'CA', states=set(states)))
+
+    def matches(self, selection, atom):
+        for keyword, key in (('model', 'model'), ('chain', 'chain'),
+                             ('resn', 'resn')):
+            found = re.search(r'\b{0} (\S+)'.format(keyword), selection)
+            if found and atom[key] not in \
+                    found.group(1).rstrip(')').split('+'):
+                return False
+
+        if 'name ca' in selection and atom['name'] != 'CA':
+            return False
+
+        if "name C1'" in selection and atom['name'] != "C1'":
+            return False
+
+        return True
+
+    def get_names(self, kind='objects'):
+        return sorted(set(atom['model'] for atom in self.atoms))
+
+    def get_chains(self, model):
+        chains = list()
+        for atom in self.atoms:
+            if model in (atom['model'], 'all') and \
+                    atom['chain'] not in chains:
+                chains.append(atom['chain'])
+
+        return chains
+
+    def count_atoms(self, selection):
+        return sum(self.matches(selection, atom) for atom in self.atoms)
+
+    def count_states(self, model):
+        return max([max(atom['states']) for atom in self.atoms
+                    if atom['model'] == model] or [0])
+
+    def iterate(self, selection, expression, space):
+        self.iterate_state(None, selection, expression, space)
+
+    def iterate_state(self, state, selection, expression, space):
+        self.selections.append(selection)
+
+        for atom in self.atoms:
+            if (state is None or state in atom['states']) and \
+                    self.matches(selection, atom):
+                names = dict(space)
+                names.update(atom)
+                exec(expression, dict(), names)
+
+
+@pytest.fixture
+def fake_cmd(monkeypatch):
+    """Returns a FakeCmd put in place of pymol.cmd with an empty session
+    cache
+    """
+    cmd = FakeCmd()
+    monkeypatch.setattr(Data, 'cmd', cmd)
+    monkeypatch.setattr(subseq_parse, 'cmd', cmd)
+    Data.clear_cache()
+
+    yield cmd
+
+    Data.clear_cache()
@@ -0,0 +1,26 @@
+import random
+import re
+
+import AhoCorasick
+
+
+def test_finds_all_occurrences_like_re():
+    rng = random.Random(9)
+    keywords = ['A', 'AC', 'CAC', 'ACCA', 'CCCC', 'WAC', 'W']
+    automaton = AhoCorasick.AhoCorasick(keywords)
+
+    for _ in range(50):
+        text = ''.join(rng.choice('AAACCW') for _ in range(rng.randint(0, 60)))
+
+        expected = sorted(
+            (match.start(), number)
+            for number, keyword in enumerate(keywords)
+            for match in re.finditer('(?=' + keyword + ')', text))
+
+        assert sorted(automaton.find_all(text)) == expected
+
+
+def test_keywords_sharing_prefixes_and_suffixes():
+    automaton = AhoCorasick.AhoCorasick(['HE', 'SHE', 'HIS', 'HERS'])
+
+    assert sorted(automaton.find_all('USHERS')) == [(1, 1), (2, 0), (2, 3)]
@@ -0,0 +1,24 @@
+import alignment
+import ResidueIds
+import SubMatrix
+
+
+def test_print_alignments_sorts_by_chain_order(capsys):
+    sub_matrix = SubMatrix.get_matrix('blossum62')
+    ids = ResidueIds.ResidueIds(['1', '2', '3', '4', '5'])
+    order = {('m1', 'A'): 0, ('m1', 'B'): 1, ('m1', 'B/2'): 2, ('m2', 'A'): 3}
+
+    def hit(model, chain, match):
+        return (model, chain, match, (
+            model, chain, 'KTG', 'AKTGA', sub_matrix.get_name(), 10., 19.,
+            19., 3, 0, 0, 'KTG', 'KTG', 'KTG', 1, 2, ids))
+
+    # hits of a shared sequence fanned out to its copies
+    alignments = [hit('m1', 'A', 'a'), hit('m2', 'A', 'd'),
+                  hit('m1', 'B/2', None), hit('m1', 'B', 'b')]
+
+    assert alignment.print_alignments(alignments, order) == ['a', 'b', 'd']
+
+    printed = [line.split()[0] for line in capsys.readouterr().out.split('\n')
+               if line.startswith('m')]
+    assert printed == ['m1/A', 'm1/B', 'm1/B/2', 'm2/A']
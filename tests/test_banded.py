@@ -0,0 +1,27 @@
+import pytest
+
+import BandedNeedlemanWunsch
+import NeedlemanWunch
+
+
+@pytest.mark.parametrize('band', [1, 3, 50])
+def test_matches_needleman_wunsch(pairs, sub_matrix, band):
+    for target, sequence, gap_cost in pairs:
+        nw = NeedlemanWunch.NeedlemanWunsch(target, sequence, gap_cost,
+                                            sub_matrix)
+        banded = BandedNeedlemanWunsch.BandedNeedlemanWunsch(
+            target, sequence, gap_cost, sub_matrix, band)
+
+        assert banded.get_alignment_score() == nw.get_alignment_score()
+        assert banded.get_traceback() == nw.get_traceback()
+
+
+@pytest.mark.parametrize('band', [1, 3])
+def test_hand_computed_alignment(sub_matrix, band):
+    # WCH-WC / WCHAWC: W 11 + C 9 + H 8 - gap 4 + W 11 + C 9, the gap moves
+    # the path one diagonal off the main one
+    banded = BandedNeedlemanWunsch.BandedNeedlemanWunsch(
+        'WCHWC', 'WCHAWC', 4., sub_matrix, band)
+
+    assert banded.get_alignment_score() == 44.
+    assert banded.get_traceback() == ('WCH-WC', 'WCHAWC', 0, 0)
@@ -0,0 +1,31 @@
+import BatchSmithWaterman
+import SmithWaterman
+
+
+def test_best_scores_match_smith_waterman(pairs, sub_matrix):
+    for gap_cost in set(gap_cost for _, _, gap_cost in pairs):
+        batch = [(target, sequence) for target, sequence, cost in pairs
+                 if cost == gap_cost]
+
+        scores = BatchSmithWaterman.best_scores(batch, gap_cost, sub_matrix,
+                                                batch_size=16)
+
+        assert scores == [
+            SmithWaterman.SmithWaterman(target, sequence, gap_cost,
+                                        sub_matrix).get_best_score()
+            for target, sequence in batch]
+
+
+def test_hand_computed_best_scores(sub_matrix):
+    batch = [
+        # WCH-WC / WCHAWC: W 11 + C 9 + H 8 - gap 4 + W 11 + C 9
+        ('WCHWC', 'WCHAWC'),
+        # W/A scores -3, nothing is aligned
+        ('WWW', 'AAA'),
+        # W 11 + C 9 + H 8
+        ('WCH', 'AWCHA'),
+    ]
+
+    for batch_size in (1, 2, 16):
+        assert BatchSmithWaterman.best_scores(
+            batch, 4., sub_matrix, batch_size=batch_size) == [44., 0., 28.]
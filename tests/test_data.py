@@ -0,0 +1,86 @@
+import logging
+
+import Data
+import subseq_parse
+
+
+def test_selection_restricts_models_and_chains(fake_cmd):
+    fake_cmd.load('m1', 'A', ['ALA', 'CYS'])
+    fake_cmd.load('m1', 'B', ['ASP'])
+    fake_cmd.load('m2', 'C', ['GLU'])
+    fake_cmd.load('m3', 'A', ['PHE'])
+
+    data = Data.Data(['m1', 'm2', 'm3'], ['A', 'C'], 'aminoacids', 'X')
+
+    # m3 has chain A, m2 chain C, m1 chain B is not requested
+    assert data.get_selection(['m1', 'm2']) == \
+        '(name ca) and model m1+m2 and chain A+C'
+    assert data.get_selection(['m3']) == '(name ca) and model m3 and chain A'
+    assert sorted(data['m1'].keys()) == ['A']
+
+
+def test_blank_chain_is_not_written_in_the_selection(fake_cmd):
+    fake_cmd.load('m1', '', ['ALA', 'CYS'])
+    fake_cmd.load('m1', 'B', ['ASP'])
+
+    data = Data.Data(['m1'], ['', 'B'], 'aminoacids', 'X', states=[1])
+
+    assert data.get_selection(['m1']) == '(name ca) and model m1'
+    assert fake_cmd.selections[-1] == '(name ca) and model m1'
+    assert data['m1']['']['sequence'] == 'AC'
+    assert data['m1']['B']['sequence'] == 'D'
+
+
+def test_states_are_extracted_with_the_restriction(fake_cmd):
+    fake_cmd.load('m1', 'A', ['ALA', 'CYS'], states=(1, 2))
+    fake_cmd.load('m1', 'B', ['ASP'], states=(1, 2))
+
+    Data.Data(['m1'], ['A'], 'aminoacids', 'X', states=[0])
+
+    assert fake_cmd.selections[1:] == \
+        ['(name ca) and model m1 and chain A'] * 2
+
+
+def test_modified_residues_are_replaced(fake_cmd):
+    fake_cmd.load('m1', 'A', ['MET', 'MSE', 'SEP', 'GLY'])
+
+    assert Data.Data(['m1'], ['A'], 'aminoacids', 'X')['m1']['A'][
+        'sequence'] == 'MXXG'
+    assert Data.Data(['m1'], ['A'], 'aminoacids', 'Z')['m1']['A'][
+        'sequence'] == 'MZZG'
+
+
+def test_nucleic_acids(fake_cmd):
+    fake_cmd.load('m2', 'R', ['G', 'DA', 'U', 'DT'])
+
+    data = Data.Data(['m2'], ['R'], 'nucleicacids', 'X')
+
+    assert data['m2']['R']['sequence'] == 'GAUT'
+    assert fake_cmd.selections[0] == \
+        "(resn G+C+A+T+U+DG+DC+DA+DT+DU and name C1') and model m2"
+
+
+def test_empty_chains_and_models_are_dropped(fake_cmd):
+    fake_cmd.load('m1', 'A', ['ALA', 'CYS'])
+    # water only chains and models have no main atoms
+    fake_cmd.atoms.append(dict(model='m1', chain='W', resn='HOH', resi='1',
+                               name='O', states={1}))
+    fake_cmd.atoms.append(dict(model='m2', chain='W', resn='HOH', resi='1',
+                               name='O', states={1}))
+
+    data = Data.Data(['m1', 'm2'], ['A', 'W'], 'aminoacids', 'X')
+
+    assert list(data.keys()) == ['m1']
+    assert list(data['m1'].keys()) == ['A']
+
+
+def test_parse_chains(fake_cmd, caplog):
+    fake_cmd.load('m1', 'A', ['ALA'])
+    fake_cmd.load('m2', 'B', ['ALA'])
+
+    assert sorted(subseq_parse.parse_chains('all')) == ['A', 'B']
+    assert subseq_parse.parse_chains('a b') == ['A', 'B']
+
+    with caplog.at_level(logging.ERROR):
+        subseq_parse.parse_chains('A Q')
+    assert "chain 'Q' does not exist." in caplog.text
@@ -0,0 +1,83 @@
+import pytest
+
+import Data
+
+
+@pytest.fixture
+def extracted(fake_cmd, monkeypatch):
+    """Loads models m1 and m2 and returns a list of model lists extracted
+    from PyMOL, models taken from the cache are not extracted
+    """
+    fake_cmd.load('m1', 'A', ['ALA', 'CYS', 'ASP', 'GLU', 'PHE'])
+    fake_cmd.load('m1', 'B', ['MET', 'ASN', 'PRO', 'GLN'])
+    fake_cmd.load('m2', 'A', ['TRP', 'TYR', 'VAL'])
+
+    extracted = list()
+    get_data_from_pymol = Data.Data.get_data_from_pymol
+
+    def counting(self, models, state=None):
+        extracted.append(list(models))
+        return get_data_from_pymol(self, models, state)
+
+    monkeypatch.setattr(Data.Data, 'get_data_from_pymol', counting)
+
+    return extracted
+
+
+def get_data():
+    return Data.Data(['m1', 'm2'], ['A', 'B'], 'aminoacids', 'X')
+
+
+def test_unchanged_models_are_taken_from_the_cache(extracted):
+    first = get_data()
+    second = get_data()
+
+    assert extracted == [['m1', 'm2'], []]
+    for model, chain in (('m1', 'A'), ('m1', 'B'), ('m2', 'A')):
+        assert second[model][chain]['sequence'] == \
+            first[model][chain]['sequence']
+    assert second['m1']['B']['sequence'] == 'MNPQ'
+    assert second['m1']['B']['ids'].get_selection(0, 4) == '1-4'
+
+
+def test_residue_renamed_inside_a_chain(fake_cmd, extracted):
+    get_data()
+    fake_cmd.atoms[2]['resn'] = 'TRP'
+    data = get_data()
+
+    assert extracted == [['m1', 'm2'], ['m1']]
+    assert data['m1']['A']['sequence'] == 'ACWEF'
+
+
+def test_residue_renumbered_inside_a_chain(fake_cmd, extracted):
+    get_data()
+    fake_cmd.atoms[2]['resi'] = '3A'
+    data = get_data()
+
+    assert extracted == [['m1', 'm2'], ['m1']]
+    assert data['m1']['A']['ids'].get_selection(0, 5) == '1-2+3A+4-5'
+
+
+def test_removed_residue(fake_cmd, extracted):
+    get_data()
+    del fake_cmd.atoms[7]
+    data = get_data()
+
+    assert extracted == [['m1', 'm2'], ['m1']]
+    assert data['m1']['B']['sequence'] == 'MNQ'
+
+
+def test_clear_cache(extracted):
+    get_data()
+    Data.clear_cache()
+    get_data()
+
+    assert extracted == [['m1', 'm2'], ['m1', 'm2']]
+
+
+def test_one_iterate_per_search(fake_cmd, extracted):
+    get_data()
+    get_data()
+
+    # fingerprints and extraction share the iterate of the current state
+    assert len(fake_cmd.selections) == 2
@@ -0,0 +1,57 @@
+import pytest
+
+import Data
+import SubMatrix
+
+
+@pytest.fixture
+def data(fake_cmd):
+    """m1/A and m2/A are copies, m1/B holds a modified residue"""
+    fake_cmd.load('m1', 'A', ['MET', 'LYS', 'TRP', 'VAL'])
+    fake_cmd.load('m1', 'B', ['GLY', 'MSE', 'SER'])
+    fake_cmd.load('m2', 'A', ['MET', 'LYS', 'TRP', 'VAL'])
+    fake_cmd.load('m2', 'C', ['HIS', 'ALA'])
+
+    return Data.Data(['m1', 'm2'], ['A', 'B', 'C'], 'aminoacids', 'X')
+
+
+@pytest.mark.parametrize('matrix', ['blosum62', 'pam30'])
+def test_codes_round_trip(data, matrix):
+    sub_matrix = SubMatrix.get_matrix(matrix)
+
+    for model, chain in (('m1', 'A'), ('m1', 'B'), ('m2', 'A'),
+                         ('m2', 'C')):
+        sequence = data[model][chain]['sequence']
+        codes = data.get_codes(model, chain, sub_matrix)
+
+        assert isinstance(codes, memoryview)
+        assert list(codes) == sub_matrix.encode(sequence)
+        assert sub_matrix.encode(sequence, codes) is codes
+
+
+def test_copies_share_the_corpus(data):
+    sub_matrix = SubMatrix.get_matrix('blosum62')
+
+    assert data.offsets['m1', 'A'] == data.offsets['m2', 'A']
+    assert data['m1']['A']['sequence'] is data['m2']['A']['sequence']
+    assert data.corpus == b'MKWVGXSHA'
+    assert data.offsets['m2', 'C'] == (7, 9)
+    assert bytes(data.get_codes('m2', 'A', sub_matrix)) == \
+        bytes(data.get_codes('m1', 'A', sub_matrix))
+
+
+def test_copy_is_a_bytearray(data):
+    sub_matrix = SubMatrix.get_matrix('blosum62')
+
+    codes = data.get_codes('m1', 'B', sub_matrix, copy=True)
+
+    assert isinstance(codes, bytearray)
+    assert list(codes) == sub_matrix.encode('GXS')
+
+
+def test_residue_missing_in_the_matrix(fake_cmd):
+    fake_cmd.load('m1', 'A', ['GLY', 'MSE', 'SER'])
+    data = Data.Data(['m1'], ['A'], 'aminoacids', 'J')
+
+    with pytest.raises(KeyError, match="'J' is not in substitution matrix"):
+        data.get_codes('m1', 'A', SubMatrix.get_matrix('blosum62'))
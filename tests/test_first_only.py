@@ -0,0 +1,33 @@
+import pytest
+
+import Data
+import alignment
+import subseq_global_alignment
+import subseq_local_alignment
+
+
+@pytest.fixture
+def data(fake_cmd):
+    fake_cmd.load('m1', 'A', ['ALA', 'CYS', 'ASP', 'GLU', 'PHE', 'GLY'])
+    fake_cmd.load('m2', 'A', ['ALA', 'CYS', 'ASP', 'GLU', 'PHE', 'GLY'])
+
+    return Data.Data(['m1', 'm2'], ['A'], 'aminoacids', 'X', states=[1])
+
+
+# local searches stop once every model has a hit, global ones at the first
+# hit
+@pytest.mark.parametrize('search, models', [
+    (lambda data: subseq_local_alignment.subseq_la_search(
+        'ACDEFG', data, 'blossum62', 10., 50., True), ['m1', 'm2']),
+    (lambda data: subseq_global_alignment.subseq_ga_search(
+        'ACDEFG', data, 'blossum62', 10., 50., True), ['m1']),
+])
+def test_first_only_returns_none_without_matches(data, monkeypatch,
+                                                  search, models):
+    assert [match[0] for match in search(data)] == models
+
+    # every model has its first hit, but no residue is aligned
+    monkeypatch.setattr(alignment, 'print_alignments',
+                        lambda alignments, order: list())
+
+    assert search(data) is None
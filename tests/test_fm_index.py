@@ -0,0 +1,73 @@
+import random
+import re
+
+import pytest
+
+import FMIndex
+
+
+def brute_force(sequences, pattern, mismatches):
+    """Returns key -> offsets of windows with at most given mismatches"""
+    found = dict()
+
+    for key, sequence in sequences:
+        for offset in range(len(sequence) - len(pattern) + 1):
+            misses = sum((residue in residues) == negated
+                         for residue, (negated, residues)
+                         in zip(sequence[offset:], pattern))
+            if misses <= mismatches:
+                found.setdefault(key, list()).append(offset)
+
+    return found
+
+
+@pytest.fixture
+def sequences():
+    rng = random.Random(8)
+
+    # a small alphabet gives many overlapping occurrences
+    return [(('m', str(k)), ''.join(rng.choice('AAACCW')
+                                    for _ in range(rng.randint(1, 200))))
+            for k in range(40)]
+
+
+@pytest.mark.parametrize('sizes', [(64, 32, 65536), (4, 3, 7)])
+def test_exact_search_matches_re(sequences, monkeypatch, sizes):
+    for name, size in zip(('CHECKPOINT', 'SAMPLE', 'LOCATE_ROWS'), sizes):
+        monkeypatch.setattr(FMIndex, name, size)
+
+    fm_index = FMIndex.FMIndex(sequences)
+
+    for target in ('A', 'CA', 'ACCA', '[AC]C.A', 'A[^C]A', 'CCCCCC', 'W'):
+        expected = dict()
+        for key, sequence in sequences:
+            offsets = [match.start() for match in
+                       re.finditer('(?=' + target + ')', sequence)]
+            if offsets:
+                expected[key] = offsets
+
+        assert fm_index.find(FMIndex.parse_pattern(target)) == expected
+
+    assert fm_index.count('ACCA') == sum(
+        len(offsets) for offsets in brute_force(
+            sequences, FMIndex.parse_pattern('ACCA'), 0).values())
+
+
+@pytest.mark.parametrize('mismatches', [1, 2])
+def test_mismatch_search_matches_brute_force(sequences, mismatches):
+    fm_index = FMIndex.FMIndex(sequences)
+
+    for target in ('ACCAW', 'CC.AA', '[AW]CCA'):
+        pattern = FMIndex.parse_pattern(target)
+
+        assert fm_index.find(pattern, mismatches) == \
+            brute_force(sequences, pattern, mismatches)
+
+
+def test_parse_pattern():
+    assert FMIndex.parse_pattern('A.[CD][^E]') == [
+        (False, frozenset('A')), (True, frozenset()),
+        (False, frozenset('CD')), (True, frozenset('E'))]
+
+    for target in ('A+', 'A|C', '[AC', '', '(AC)'):
+        assert FMIndex.parse_pattern(target) is None
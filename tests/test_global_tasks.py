@@ -0,0 +1,62 @@
+import random
+import tracemalloc
+
+import pytest
+
+import alignment_tasks
+import Hirschberg
+from conftest import mutate, random_sequence
+
+
+def global_task(chains, engine='python', max_memory=1024., mode='global'):
+    return alignment_tasks.global_alignment_task(
+        ('AKTGTAVLLWHKEP', 'blossum62', 10., 0., False, engine, max_memory,
+         None, None, 0, mode, chains))
+
+
+def estimate(engine, n, m):
+    """Returns the score matrix size the task compares to max_memory"""
+    return ((n + 1) * (m + 1) * alignment_tasks.CELL_SIZE[engine] +
+            (n + m + 2) * alignment_tasks.ROW_SIZE[engine]) / 1024. ** 2
+
+
+@pytest.mark.parametrize('mode', ['global', 'semiglobal'])
+def test_hirschberg_fallback_gives_the_same_hits(monkeypatch, mode):
+    rng = random.Random(2)
+    chains = [('m', str(k), random_sequence(rng, 20) +
+               mutate(rng, 'AKTGTAVLLWHKEP', 2) + random_sequence(rng, 400),
+               None) for k in range(5)]
+
+    fallbacks = list()
+
+    class CountingHirschberg(alignment_tasks.GLOBAL_MODES[mode]['hirschberg']):
+        def __init__(self, *args):
+            fallbacks.append(args[1])
+            super(CountingHirschberg, self).__init__(*args)
+
+    monkeypatch.setitem(alignment_tasks.GLOBAL_MODES[mode], 'hirschberg',
+                        CountingHirschberg)
+
+    for engine in alignment_tasks.CELL_SIZE:
+        hits = global_task(chains, engine, mode=mode)
+        assert not fallbacks
+
+        # about 6000 cells of each chain do not fit into 1 KB
+        assert global_task(chains, engine, 1. / 1024, mode) == hits
+        assert len(fallbacks) == len(chains)
+        del fallbacks[:]
+
+
+@pytest.mark.parametrize('engine', sorted(alignment_tasks.CELL_SIZE))
+def test_matrix_size_estimate(sub_matrix, engine):
+    target = random_sequence(random.Random(3), 200)
+    sequence = random_sequence(random.Random(4), 1200)
+    engine_class = alignment_tasks.GLOBAL_ENGINES[engine]
+
+    tracemalloc.start()
+    engine_class(target, sequence, 10., sub_matrix)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert estimate(engine, 200, 1200) == pytest.approx(
+        peak / 1024. ** 2, rel=.25)
@@ -0,0 +1,164 @@
+import Gotoh
+import NeedlemanWunch
+import SemiGlobal
+import SmithWaterman
+
+
+def test_local_matches_smith_waterman(pairs, sub_matrix):
+    for target, sequence, gap_cost in pairs:
+        sw = SmithWaterman.SmithWaterman(target, sequence, gap_cost,
+                                         sub_matrix)
+        gotoh = Gotoh.GotohSmithWaterman(target, sequence, gap_cost,
+                                         gap_cost, sub_matrix)
+
+        assert gotoh.get_best_score() == sw.get_best_score()
+        assert gotoh.get_coordinates() == sw.get_coordinates()
+
+        if sw.get_best_score() > 0:
+            for i, j in sw.get_coordinates():
+                assert gotoh.get_traceback(i, j) == sw.get_traceback(i, j)
+
+
+def test_global_matches_needleman_wunsch(pairs, sub_matrix):
+    for target, sequence, gap_cost in pairs:
+        nw = NeedlemanWunch.NeedlemanWunsch(target, sequence, gap_cost,
+                                            sub_matrix)
+        gotoh = Gotoh.GotohNeedlemanWunsch(target, sequence, gap_cost,
+                                           gap_cost, sub_matrix)
+
+        assert gotoh.get_alignment_score() == nw.get_alignment_score()
+        assert gotoh.get_traceback() == nw.get_traceback()
+
+
+def test_semiglobal_matches_linear_gaps(pairs, sub_matrix):
+    for target, sequence, gap_cost in pairs:
+        nw = SemiGlobal.SemiGlobalNeedlemanWunsch(target, sequence, gap_cost,
+                                                  sub_matrix)
+        gotoh = SemiGlobal.GotohSemiGlobal(target, sequence, gap_cost,
+                                           gap_cost, sub_matrix)
+
+        assert gotoh.get_alignment_score() == nw.get_alignment_score()
+
+
+def test_gap_score(sub_matrix):
+    gotoh = Gotoh.GotohNeedlemanWunsch('A', 'A', 11., 1., sub_matrix)
+
+    # gap_open + (k - 1) * gap_extend
+    assert gotoh.gap_score(0) == 0.
+    assert gotoh.gap_score(1) == -11.
+    assert gotoh.gap_score(4) == -14.
+
+
+def affine_reference(target, sequence, gap_open, gap_extend, sub_matrix,
+                     local):
+    """Returns the best score of the three state affine gap recurrence,
+    E ends with a gap in the target, F with a gap in the sequence
+    """
+    minus = float('-inf')
+    rows, columns = len(target) + 1, len(sequence) + 1
+    H = [[minus] * columns for _ in range(rows)]
+    E = [[minus] * columns for _ in range(rows)]
+    F = [[minus] * columns for _ in range(rows)]
+    H[0][0] = 0.
+
+    for i in range(rows):
+        for j in range(columns):
+            if i == j == 0:
+                continue
+
+            if j > 0:
+                E[i][j] = max(H[i][j - 1] - gap_open,
+                              E[i][j - 1] - gap_extend)
+            if i > 0:
+                F[i][j] = max(H[i - 1][j] - gap_open,
+                              F[i - 1][j] - gap_extend)
+
+            H[i][j] = max(E[i][j], F[i][j])
+            if i > 0 and j > 0:
+                H[i][j] = max(H[i][j], H[i - 1][j - 1] +
+                              sub_matrix[target[i - 1], sequence[j - 1]])
+            if local:
+                H[i][j] = max(H[i][j], 0.)
+
+    if local:
+        return max(max(row) for row in H)
+
+    return H[-1][-1]
+
+
+def rescore(aligned_target, aligned_sequence, gap_open, gap_extend,
+            sub_matrix):
+    """Returns the affine score of an alignment"""
+    score = 0.
+    previous = None
+
+    for aa1, aa2 in zip(aligned_target, aligned_sequence):
+        if aa1 == '-' or aa2 == '-':
+            gap = 'target' if aa1 == '-' else 'sequence'
+            score -= gap_extend if gap == previous else gap_open
+            previous = gap
+        else:
+            score += sub_matrix[aa1, aa2]
+            previous = None
+
+    return score
+
+
+AFFINE_COSTS = [(11., 1.), (10., 2.), (5., 0.5), (3., 3.)]
+
+
+def test_local_matches_affine_reference(pairs, sub_matrix):
+    for k, (target, sequence, _) in enumerate(pairs[:100]):
+        gap_open, gap_extend = AFFINE_COSTS[k % len(AFFINE_COSTS)]
+        gotoh = Gotoh.GotohSmithWaterman(target, sequence, gap_open,
+                                         gap_extend, sub_matrix)
+        score = gotoh.get_best_score()
+
+        assert score == affine_reference(target, sequence, gap_open,
+                                         gap_extend, sub_matrix, True)
+
+        if score > 0:
+            for i, j in gotoh.get_coordinates():
+                aligned_target, aligned_sequence, start_i, start_j = \
+                    gotoh.get_traceback(i, j)
+
+                assert rescore(aligned_target, aligned_sequence, gap_open,
+                               gap_extend, sub_matrix) == score
+                assert aligned_target.replace('-', '') == \
+                    target[start_i - 1:i]
+                assert aligned_sequence.replace('-', '') == \
+                    sequence[start_j - 1:j]
+
+
+def test_global_matches_affine_reference(pairs, sub_matrix):
+    for k, (target, sequence, _) in enumerate(pairs[:100]):
+        gap_open, gap_extend = AFFINE_COSTS[k % len(AFFINE_COSTS)]
+        gotoh = Gotoh.GotohNeedlemanWunsch(target, sequence, gap_open,
+                                           gap_extend, sub_matrix)
+        score = gotoh.get_alignment_score()
+        aligned_target, aligned_sequence, i, j = gotoh.get_traceback()
+
+        # the traceback stops at the first row or column like
+        # NeedlemanWunsch, the leading gap is left out
+        aligned_target = '-' * j + target[:i] + aligned_target
+        aligned_sequence = sequence[:j] + '-' * i + aligned_sequence
+
+        assert score == affine_reference(target, sequence, gap_open,
+                                         gap_extend, sub_matrix, False)
+        assert rescore(aligned_target, aligned_sequence, gap_open,
+                       gap_extend, sub_matrix) == score
+        assert aligned_target.replace('-', '') == target
+        assert aligned_sequence.replace('-', '') == sequence
+
+
+def test_long_gap_is_opened_once(sub_matrix):
+    # four inserted residues cost 11 + 3 * 1 instead of 4 * 10 with
+    # linear gaps, so the gap is worth it
+    target = 'WCHWCHWC'
+    sequence = 'WCHWAAAACHWC'
+    gotoh = Gotoh.GotohNeedlemanWunsch(target, sequence, 11., 1.,
+                                       sub_matrix)
+
+    matches = sum(sub_matrix[aa, aa] for aa in target)
+    assert gotoh.get_alignment_score() == matches - 14.
+    assert gotoh.get_traceback()[:2] == ('WCHW----CHWC', sequence)
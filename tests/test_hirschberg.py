@@ -0,0 +1,51 @@
+import pytest
+
+import Hirschberg
+import NeedlemanWunch
+import SemiGlobal
+
+
+@pytest.mark.parametrize('block_size', [1, 16, 4096])
+def test_global_matches_needleman_wunsch(pairs, sub_matrix, monkeypatch,
+                                         block_size):
+    monkeypatch.setattr(Hirschberg.Hirschberg, 'block_size', block_size)
+
+    for target, sequence, gap_cost in pairs:
+        nw = NeedlemanWunch.NeedlemanWunsch(target, sequence, gap_cost,
+                                            sub_matrix)
+        hirschberg = Hirschberg.Hirschberg(target, sequence, gap_cost,
+                                           sub_matrix)
+
+        assert hirschberg.get_alignment_score() == nw.get_alignment_score()
+        assert hirschberg.get_traceback() == nw.get_traceback()
+
+
+@pytest.mark.parametrize('block_size', [1, 16, 4096])
+def test_semiglobal_matches_needleman_wunsch(pairs, sub_matrix, monkeypatch,
+                                             block_size):
+    monkeypatch.setattr(Hirschberg.Hirschberg, 'block_size', block_size)
+
+    for target, sequence, gap_cost in pairs:
+        nw = SemiGlobal.SemiGlobalNeedlemanWunsch(target, sequence, gap_cost,
+                                                  sub_matrix)
+        hirschberg = SemiGlobal.HirschbergSemiGlobal(target, sequence,
+                                                     gap_cost, sub_matrix)
+
+        assert hirschberg.get_alignment_score() == nw.get_alignment_score()
+        assert hirschberg.get_traceback() == nw.get_traceback()
+
+
+@pytest.mark.parametrize('block_size', [1, 4096])
+def test_hand_computed_alignments(sub_matrix, monkeypatch, block_size):
+    monkeypatch.setattr(Hirschberg.Hirschberg, 'block_size', block_size)
+
+    # WCH-WC / WCHAWC: W 11 + C 9 + H 8 - gap 4 + W 11 + C 9
+    hirschberg = Hirschberg.Hirschberg('WCHWC', 'WCHAWC', 4., sub_matrix)
+    assert hirschberg.get_alignment_score() == 44.
+    assert hirschberg.get_traceback() == ('WCH-WC', 'WCHAWC', 0, 0)
+
+    # AA on both sides of the sequence are free in semi-global alignments
+    hirschberg = SemiGlobal.HirschbergSemiGlobal('WCH', 'AAWCHAA', 10.,
+                                                 sub_matrix)
+    assert hirschberg.get_alignment_score() == 28.
+    assert hirschberg.get_traceback() == ('WCH', 'WCH', 0, 2)
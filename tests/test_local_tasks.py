@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+import alignment_tasks
+from conftest import mutate, random_sequence
+
+
+def local_task(target, chains, first_only=False, engine='python'):
+    return alignment_tasks.local_alignment_task(
+        (target, 'blossum62', 10., 51., first_only, engine, None, None, 25.,
+         0, 0, [(model, chain, sequence, None, None)
+                for model, chain, sequence in chains]))
+
+
+@pytest.fixture
+def chains():
+    """Returns target and chains m1/A=s1, m2/A=s2, m2/B=s1, m3/A=s1,
+    both s1 and s2 hold the target
+    """
+    rng = random.Random(12)
+    target = random_sequence(rng, 20)
+    s1 = random_sequence(rng, 30) + target + random_sequence(rng, 30)
+    s2 = random_sequence(rng, 10) + mutate(rng, target, 2) + \
+        random_sequence(rng, 10)
+
+    return target, [('m1', 'A', s1), ('m2', 'A', s2), ('m2', 'B', s1),
+                    ('m3', 'A', s1)]
+
+
+@pytest.mark.parametrize('engine', ['python', 'batch', 'striped'])
+def test_repeated_sequences_get_the_same_hits(chains, engine):
+    target, chains = chains
+    hits = local_task(target, chains, engine=engine)
+
+    assert [hit[:2] for hit in hits] == [
+        ('m1', 'A'), ('m2', 'A'), ('m2', 'B'), ('m3', 'A')]
+    assert hits[0][2:] == hits[2][2:] == hits[3][2:]
+    assert hits == [hit for chain in chains
+                    for hit in local_task(target, [chain], engine=engine)]
+
+
+def test_first_only_takes_chains_in_order(chains):
+    target, chains = chains
+    hits = local_task(target, chains, first_only=True)
+
+    assert [hit[:2] for hit in hits] == [('m1', 'A'), ('m2', 'A'), ('m3', 'A')]
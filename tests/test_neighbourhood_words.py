@@ -0,0 +1,30 @@
+import random
+
+import NeighbourhoodWords
+from conftest import random_sequence
+
+
+def test_exact_copy_triggers_on_its_diagonal(sub_matrix):
+    rng = random.Random(7)
+
+    # targets of 3-5 residues hold no two non-overlapping words
+    for length in (3, 4, 5, 6, 12, 30):
+        for _ in range(10):
+            # every word of these residues scores at least 18 against itself
+            target = ''.join(rng.choice('WCYHF') for _ in range(length))
+            offset = rng.randint(0, 50)
+            sequence = random_sequence(rng, offset) + target + \
+                random_sequence(rng, 20)
+
+            words = NeighbourhoodWords.NeighbourhoodWords(target, sub_matrix,
+                                                          11.)
+            anchors = words.get_anchors(sequence)
+
+            assert words.two_hit == (length >= 6)
+            assert any(j - i == offset for i, j in anchors)
+
+
+def test_unrelated_sequence_does_not_trigger(sub_matrix):
+    words = NeighbourhoodWords.NeighbourhoodWords('WWWCC', sub_matrix, 11.)
+
+    assert not words.get_anchors('AAAAGGGGSSSS')
@@ -0,0 +1,54 @@
+import random
+import re
+
+import pytest
+
+import regex_literals
+
+TARGETS = [
+    'ACCA', 'A.C', 'AC+W', 'W[AC]{2,3}A', 'A(CW|WC)A', 'AC*W', '(ACA)+',
+    'CA?W', 'AW{0}C', 'C(?=A)', '^AC', 'A.*W', 'ACW|CWA', '(A)C\\1',
+]
+
+
+@pytest.fixture
+def sequences():
+    rng = random.Random(10)
+
+    return [''.join(rng.choice('AAACCW') for _ in range(rng.randint(0, 80)))
+            for _ in range(200)]
+
+
+@pytest.mark.parametrize('target', TARGETS)
+def test_matches_contain_required_literals(sequences, target):
+    re_target = re.compile(target, re.I)
+    literals, _ = regex_literals.required_literals(target, re.I)
+
+    for sequence in sequences:
+        for match in re_target.finditer(sequence):
+            for literal in literals:
+                assert literal in match.group()
+
+
+@pytest.mark.parametrize('target', TARGETS)
+def test_windows_give_the_same_matches(sequences, target):
+    re_target = re.compile(target, re.I)
+    literals, width = regex_literals.required_literals(target, re.I)
+
+    if width is None or not literals:
+        pytest.skip('the whole sequence is scanned')
+
+    for sequence in sequences:
+        matches = [match.span() for start, end in regex_literals.windows(
+                   sequence, literals[0], width)
+                   for match in re_target.finditer(sequence, start, end)]
+
+        assert matches == [match.span()
+                           for match in re_target.finditer(sequence)]
+
+
+def test_required_literals():
+    assert regex_literals.required_literals('ac.w+[kl]cat', re.I) == \
+        (['CAT', 'AC', 'W'], None)
+    assert regex_literals.required_literals('A(B|C)D', re.I) == \
+        (['A', 'D'], 3)
@@ -0,0 +1,58 @@
+import random
+
+import ResidueIds
+
+
+def expand(selection):
+    """Returns the resi list of a PyMOL resi selection of positive ids"""
+    ids = list()
+
+    for item in selection.split('+'):
+        if '-' in item:
+            first, last = item.split('-')
+            ids.extend(str(number)
+                       for number in range(int(first), int(last) + 1))
+        else:
+            ids.append(item)
+
+    return ids
+
+
+def test_ranges_and_insertion_codes():
+    ids = ResidueIds.ResidueIds(
+        ['1', '2', '3', '5', '52', '52A', '52B', '53', '54'])
+
+    assert len(ids) == 9
+    assert ids[5] == '52A'
+    assert ids[-1] == '54'
+    assert ids.get_selection(0, 9) == '1-3+5+52+52A+52B+53-54'
+    assert ids.get_selection(1, 3) == '2-3'
+    assert ids.get_selection(5, 6) == '52A'
+    assert ids.get_selection(6, 9) == '52B+53-54'
+
+
+def test_negative_and_padded_numbers():
+    ids = ResidueIds.ResidueIds(['-3', '-2', '-1', '0', '1', '007', '8'])
+
+    assert ids[5] == '007'
+    assert ids.get_selection(0, 7) == '-3+-2+-1+0-1+007+8'
+
+
+def test_selection_holds_every_id():
+    rng = random.Random(11)
+
+    for _ in range(100):
+        resi = list()
+        number = rng.randint(1, 100)
+
+        for _ in range(rng.randint(1, 60)):
+            number += rng.choice([1, 1, 1, 2, 10])
+            resi.append(str(number))
+            if rng.random() < .1:
+                resi.append(str(number) + rng.choice('ABC'))
+
+        ids = ResidueIds.ResidueIds(resi)
+        start = rng.randrange(len(resi))
+        end = rng.randint(start + 1, len(resi))
+
+        assert expand(ids.get_selection(start, end)) == resi[start:end]
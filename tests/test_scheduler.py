@@ -0,0 +1,105 @@
+import random
+import time
+
+import pytest
+
+import Data
+import Scheduler
+import subseq_local_alignment
+from conftest import mutate, random_sequence
+
+THREE_LETTER = dict((one, three) for three, one in
+                    Data.Data.aa_one_letter.items())
+THREE_LETTER['X'] = 'UNK'
+
+
+@pytest.mark.parametrize('sizes, parts, split', [
+    ([1] * 8, 4, [[0, 1], [2, 3], [4, 5], [6, 7]]),
+    ([1] * 8, 1, [list(range(8))]),
+    ([5, 1, 1, 1, 1, 1], 2, [[0], [1, 2, 3, 4, 5]]),
+    # items larger than a part are left alone
+    ([1, 20, 1, 1], 4, [[0], [1], [2, 3]]),
+    ([3, 3, 3], 8, [[0], [1], [2]]),
+    ([], 4, []),
+])
+def test_split_tasks(sizes, parts, split):
+    items = list(range(len(sizes)))
+    tasks = Scheduler.split_tasks(items, sizes, parts)
+
+    assert tasks == split
+    assert [item for task in tasks for item in task] == items
+
+
+def test_split_tasks_balances_sizes():
+    rng = random.Random(10)
+    sizes = [rng.randint(1, 100) for _ in range(400)]
+    tasks = Scheduler.split_tasks(list(range(400)), sizes, 16)
+    totals = [sum(sizes[k] for k in task) for task in tasks]
+
+    assert [k for task in tasks for k in task] == list(range(400))
+    assert len(tasks) <= 17
+    assert max(totals) <= sum(sizes) / 16. + 100
+
+
+def test_single_process_does_not_start_a_pool():
+    scheduler = Scheduler.Scheduler(1)
+
+    assert scheduler.get_parts() == 1
+    assert list(scheduler.map(len, [[1], [1, 2]])) == [1, 2]
+    assert scheduler.pool is None
+
+
+def load_chains(fake_cmd, seed):
+    rng = random.Random(seed)
+    target = random_sequence(rng, 15)
+
+    for model in range(1, 5):
+        for chain in 'ABC':
+            sequence = random_sequence(rng, rng.randint(10, 60))
+            # every model has a hit in chain B
+            if chain == 'B' or rng.random() < 0.5:
+                position = rng.randint(0, len(sequence))
+                sequence = sequence[:position] + \
+                    mutate(rng, target, rng.randint(0, 3)) + \
+                    sequence[position:]
+            fake_cmd.load('m{0}'.format(model), chain,
+                          [THREE_LETTER[code] for code in sequence])
+
+    return target, Data.Data(['m1', 'm2', 'm3', 'm4'], list('ABC'), 'aminoacids',
+                             'X', states=[1])
+
+
+@pytest.mark.parametrize('first_only', [False, True])
+def test_two_processes_give_serial_hits(fake_cmd, capsys, first_only):
+    target, data = load_chains(fake_cmd, 3)
+
+    serial = subseq_local_alignment.subseq_la_search(
+        target, data, 'blossum62', 10., 30., first_only)
+    serial_output = capsys.readouterr().out
+
+    scheduler = Scheduler.Scheduler(2)
+    try:
+        parallel = subseq_local_alignment.subseq_la_search(
+            target, data, 'blossum62', 10., 30., first_only,
+            scheduler=scheduler)
+    finally:
+        scheduler.close()
+
+    # with first_only every model has one hit and outstanding tasks
+    # are cancelled
+    assert [hit[0] for hit in serial] == ['m1', 'm2', 'm3', 'm4'] \
+        if first_only else len(serial) > 4
+    assert parallel == serial
+    assert capsys.readouterr().out == serial_output
+
+
+def test_cancel_does_not_wait_for_outstanding_tasks():
+    scheduler = Scheduler.Scheduler(2)
+    started = time.time()
+
+    results = scheduler.map(time.sleep, [0, 0, 30, 30, 30, 30])
+    assert next(results) is None
+    scheduler.cancel()
+
+    assert scheduler.pool is None
+    assert time.time() - started < 10
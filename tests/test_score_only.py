@@ -0,0 +1,50 @@
+import pytest
+
+import alignment
+import NeedlemanWunch
+import ScoreOnly
+import SemiGlobal
+import SmithWaterman
+
+
+@pytest.mark.parametrize('min_score', [0., 30., 51., 90.])
+def test_scores_match_full_matrices(pairs, sub_matrix, min_score):
+    engines = [
+        (ScoreOnly.local_alignment_score,
+         lambda *args: SmithWaterman.SmithWaterman(*args).get_best_score()),
+        (ScoreOnly.global_alignment_score,
+         lambda *args: NeedlemanWunch.NeedlemanWunsch(
+             *args).get_alignment_score()),
+        (ScoreOnly.semiglobal_alignment_score,
+         lambda *args: SemiGlobal.SemiGlobalNeedlemanWunsch(
+             *args).get_alignment_score()),
+    ]
+
+    for target, sequence, gap_cost in pairs:
+        max_score = alignment.calculate_max_score(target, sub_matrix)
+
+        for score_only, full_matrix in engines:
+            score = full_matrix(target, sequence, gap_cost, sub_matrix)
+            bounded = score_only(target, sequence, gap_cost, sub_matrix,
+                                 max_score, min_score)
+
+            # chains are thrown off only if they can not pass min_score
+            if ScoreOnly.passes(score, max_score, min_score):
+                assert bounded == score
+            else:
+                assert bounded is None or bounded == score
+
+
+@pytest.mark.parametrize('score_only', [
+    ScoreOnly.local_alignment_score, ScoreOnly.global_alignment_score,
+    ScoreOnly.semiglobal_alignment_score])
+def test_hand_computed_scores(sub_matrix, score_only):
+    # WCH-WC / WCHAWC: W 11 + C 9 + H 8 - gap 4 + W 11 + C 9 is 44 of the
+    # maximum 48, about 91.7 percent
+    max_score = alignment.calculate_max_score('WCHWC', sub_matrix)
+    assert max_score == 48.
+
+    assert score_only('WCHWC', 'WCHAWC', 4., sub_matrix, max_score,
+                      90.) == 44.
+    assert score_only('WCHWC', 'WCHAWC', 4., sub_matrix, max_score,
+                      95.) is None
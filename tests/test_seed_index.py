@@ -0,0 +1,93 @@
+import logging
+import random
+
+import pytest
+
+import alignment
+import SeedIndex
+import SmithWaterman
+import subseq_parse
+from conftest import mutate, random_sequence
+
+
+@pytest.mark.parametrize('seed, mask', [
+    ('3', '111'), (4, '1111'), ('0', ''), ('10', '1' * 10),
+    ('11011', '11011'), ('101', '101'), ('1100111', '1100111'),
+    ('01101', None), ('11010', None), ('000', None), ('100', None),
+    ('1x1', None), ('-3', None), ('', None)])
+def test_parse_mask(seed, mask):
+    assert SeedIndex.parse_mask(seed) == mask
+
+
+def test_parse_seed_reports_invalid_masks(caplog):
+    assert subseq_parse.parse_seed('11011') == '11011'
+
+    with caplog.at_level(logging.ERROR):
+        assert subseq_parse.parse_seed('0110') is None
+
+    assert 'spaced seed mask like 11011' in caplog.text
+
+
+def test_hits_on_a_common_diagonal():
+    target = 'ACDEFGHIK'
+    index = SeedIndex.SeedIndex([
+        # 4 seeds ACD CDE DEF EFG on one diagonal
+        ('four', 'WWACDEFGWW'),
+        # 2 seeds ACD and CDE on one diagonal
+        ('two', 'WACDEW'),
+        # 2 seeds ACD and GHI on different diagonals
+        ('apart', 'ACDWGHIW'),
+        ('none', 'WWWWWWWW')], '111')
+
+    candidates = index.get_candidates(target, 2)
+    assert sorted(candidates) == ['four', 'two']
+    # anchors are middle residues of the hits, ordered by j
+    assert candidates['two'] == [(1, 2), (2, 3)]
+
+    assert sorted(index.get_candidates(target, 1)) == \
+        ['apart', 'four', 'two']
+    assert sorted(index.get_candidates(target, 4)) == ['four']
+    # one hit short of the threshold
+    assert index.get_candidates(target, 5) == dict()
+
+
+def test_spaced_seed_tolerates_a_middle_mismatch():
+    index = SeedIndex.SeedIndex([('mutated', 'ACWEF'), ('other', 'ACWWW')],
+                                '11011')
+
+    assert index.get_candidates('ACDEF', 1) == {'mutated': [(3, 3)]}
+    assert SeedIndex.SeedIndex([('mutated', 'ACWEF')], '11111') \
+        .get_candidates('ACDEF', 1) == dict()
+
+
+def test_target_shorter_than_the_seed():
+    index = SeedIndex.SeedIndex([('a', 'ACDEFG')], '11011')
+
+    # short targets are never thrown off
+    assert index.get_candidates('ACDE', 1) is None
+    assert index.get_candidates('ACDEF', 1) == {'a': [(3, 3)]}
+
+
+def test_chains_with_exact_words_passing_min_score_are_kept(sub_matrix):
+    rng = random.Random(14)
+    target = random_sequence(rng, 20)
+    max_score = alignment.calculate_max_score(target, sub_matrix)
+
+    sequences = [('chain{0}'.format(k), random_sequence(rng, 20) +
+                  mutate(rng, target, rng.randint(0, 8)) +
+                  random_sequence(rng, 20)) for k in range(200)]
+    candidates = SeedIndex.SeedIndex(sequences, '111').get_candidates(
+        target, 1)
+
+    kept = 0
+    for key, sequence in sequences:
+        shares_word = any(target[k:k + 3] in sequence
+                          for k in range(len(target) - 2))
+        score = SmithWaterman.SmithWaterman(
+            target, sequence, 10., sub_matrix).get_best_score()
+
+        if shares_word and score / max_score * 100 >= 51.:
+            assert key in candidates
+            kept += 1
+
+    assert kept > 50
@@ -0,0 +1,73 @@
+import pytest
+
+import alignment_tasks
+import SemiGlobal
+
+ENGINES = [SemiGlobal.SemiGlobalNeedlemanWunsch,
+           SemiGlobal.WavefrontSemiGlobal,
+           SemiGlobal.HirschbergSemiGlobal]
+
+
+def rescore(aligned_target, aligned_sequence, gap_cost, sub_matrix):
+    """Returns the score of an alignment, every gap residue costs
+    gap_cost
+    """
+    score = 0.
+
+    for target_residue, sequence_residue in zip(aligned_target,
+                                                aligned_sequence):
+        if '-' in (target_residue, sequence_residue):
+            score -= gap_cost
+        else:
+            score += sub_matrix.scores[sub_matrix.encode(target_residue)[0]][
+                sub_matrix.encode(sequence_residue)[0]]
+
+    return score
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_hand_computed_alignments(sub_matrix, engine):
+    # KTG scores 5 + 5 + 6 inside the subject, end gaps are free
+    nw = engine('KTG', 'AAKTGAA', 10., sub_matrix)
+    assert nw.get_alignment_score() == 16.
+    assert nw.end_column == 5
+    assert nw.get_traceback() == ('KTG', 'KTG', 0, 2)
+
+    # the gap of E costs less than the E/W mismatch
+    nw = engine('KEW', 'AKWA', 1., sub_matrix)
+    assert nw.get_alignment_score() == 15.
+    assert nw.end_column == 3
+    assert nw.get_traceback() == ('KEW', 'K-W', 0, 1)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_gap_only_alignment_ends_in_the_subject(sub_matrix, engine):
+    # all columns of the last row score -0.3, column 0 would align nothing
+    nw = engine('W', 'CCCC', .3, sub_matrix)
+    assert nw.get_alignment_score() == -.3
+    assert nw.end_column == 1
+    assert nw.get_traceback() == ('W', '-', 0, 1)
+
+
+def test_gap_only_alignment_is_a_hit():
+    hits = alignment_tasks.global_alignment_task(
+        ('W', 'blossum62', .3, 0., False, 'python', 1024., None, None, 0,
+         'semiglobal', [('m', 'A', 'CCCC', None)]))
+
+    assert hits == [('m', 'A', -.3, 'W', '-', 0, 1)]
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_traceback_rescores_to_the_best_end(pairs, sub_matrix, engine):
+    for target, sequence, gap_cost in pairs:
+        nw = engine(target, sequence, gap_cost, sub_matrix)
+        aligned_target, aligned_sequence, i, j = nw.get_traceback()
+
+        # the traceback stops at column 0, target residues above it are
+        # gaps of the alignment
+        assert aligned_target.replace('-', '') == target[i:]
+        assert i == 0 or j == 0
+        assert j + len(aligned_sequence.replace('-', '')) == nw.end_column
+        assert rescore(aligned_target, aligned_sequence, gap_cost,
+                       sub_matrix) - i * gap_cost == \
+            pytest.approx(nw.get_alignment_score())
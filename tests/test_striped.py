@@ -0,0 +1,33 @@
+import pytest
+
+import SmithWaterman
+import StripedSmithWaterman
+
+
+@pytest.mark.parametrize('lanes', [4, 64])
+def test_score_matches_smith_waterman(pairs, sub_matrix, lanes):
+    for target, sequence, gap_cost in pairs:
+        sw = SmithWaterman.SmithWaterman(target, sequence, gap_cost,
+                                         sub_matrix)
+        striped = StripedSmithWaterman.StripedSmithWaterman(
+            target, gap_cost, sub_matrix, lanes)
+
+        # subjects both shorter and longer than the target
+        assert striped.score(sequence) == sw.get_best_score()
+        assert striped.score(sequence[:len(target)]) == \
+            SmithWaterman.SmithWaterman(
+                target, sequence[:len(target)], gap_cost,
+                sub_matrix).get_best_score()
+
+
+@pytest.mark.parametrize('lanes', [1, 4, 64])
+def test_hand_computed_scores(sub_matrix, lanes):
+    # WCH-WC / WCHAWC: W 11 + C 9 + H 8 - gap 4 + W 11 + C 9
+    striped = StripedSmithWaterman.StripedSmithWaterman(
+        'WCHWC', 4., sub_matrix, lanes)
+    assert striped.score('WCHAWC') == 44.
+    assert striped.score('AWCHA') == 28.
+
+    # W/A scores -3, nothing is aligned
+    assert StripedSmithWaterman.StripedSmithWaterman(
+        'WWW', 4., sub_matrix, lanes).score('AAA') == 0.
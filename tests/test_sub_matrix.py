@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+import SubMatrix
+
+SMALL_MATRIX = '''
+# comment
+   A  C  X
+A  2 -1  0
+C -1  {0} -1
+X  0 -1 -1
+'''
+
+
+def write_matrix(path, score, mtime):
+    path.write_text(SMALL_MATRIX.format(score))
+    os.utime(str(path), (mtime, mtime))
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(SubMatrix, 'registry', dict())
+
+    return SubMatrix.registry
+
+
+def test_built_in_matrices_are_reused(registry):
+    matrix = SubMatrix.get_matrix('blosum62')
+
+    assert SubMatrix.get_matrix('blosum62') is matrix
+    assert SubMatrix.get_matrix('blossum62') is not matrix
+    assert list(registry) == [('blosum62', None), ('blossum62', None)]
+
+
+def test_matrix_file_is_reused_until_it_is_modified(registry, tmp_path,
+                                                    monkeypatch):
+    path = tmp_path / 'small.txt'
+    write_matrix(path, 3, 1000000)
+
+    matrix = SubMatrix.get_matrix(str(path))
+    assert matrix['C', 'C'] == 3
+    assert SubMatrix.get_matrix(str(path)) is matrix
+    # relative and absolute paths share the entry
+    monkeypatch.chdir(str(tmp_path))
+    assert SubMatrix.get_matrix('small.txt') is matrix
+
+    write_matrix(path, 5, 1000010)
+    reloaded = SubMatrix.get_matrix(str(path))
+
+    assert reloaded is not matrix
+    assert reloaded['C', 'C'] == 5
+    # the older version is forgotten
+    assert list(registry) == [(str(path), 1000010)]
+
+
+def test_fractional_scores(tmp_path, registry):
+    path = tmp_path / 'fractional.txt'
+    write_matrix(path, 2.5, 1000000)
+
+    assert SubMatrix.get_matrix(str(path))['C', 'C'] == 2.5
+    assert isinstance(SubMatrix.get_matrix(str(path))['A', 'A'], int)
+
+
+@pytest.mark.parametrize('name', sorted(SubMatrix.MATRICES))
+def test_built_in_matrices(name, registry):
+    matrix = SubMatrix.get_matrix(name)
+    residues = matrix.residues
+
+    assert len(set(residues)) == len(residues)
+    assert all(matrix[aa1, aa2] == matrix[aa2, aa1]
+               for aa1 in residues for aa2 in residues)
+
+    symbols = 'X' if name == 'nucleicmatrix' else 'X*'
+    translation = matrix.get_translation()
+    for symbol in symbols:
+        assert matrix.encode(symbol) == [matrix.codes[symbol]]
+        assert translation[ord(symbol)] == matrix.codes[symbol]
+
+    assert translation[ord('J')] == SubMatrix.MISSING
+    with pytest.raises(KeyError):
+        matrix.encode('J')
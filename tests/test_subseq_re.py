@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+import subseq_re
+
+
+@pytest.mark.parametrize('target, pattern', [
+    ('RD', '[AG][AGT]'),
+    ('[RD]', '[AGAGT]'),
+    ('[^N]', '[^ACGTUX]'),
+    ('N', '.'),
+    ('ACGU', 'ACGU'),
+    ('A[]R]', 'A[]AG]'),
+    (r'\D\N', r'\D\N'),
+    ('R{2,3}', '[AG]{2,3}'),
+])
+def test_iupac_pattern(target, pattern):
+    assert subseq_re.iupac_pattern(target, 'nucleicacids') == pattern
+
+
+def test_iupac_pattern_leaves_amino_acids():
+    assert subseq_re.iupac_pattern('RD[^N]', 'aminoacids') == 'RD[^N]'
+
+
+@pytest.mark.parametrize('target, matched, not_matched', [
+    ('RD', ['AT', 'GG'], ['CA', 'AC']),
+    ('[^N]', ['-'], ['A', 'U', 'X']),
+    ('ANA', ['AXA', 'AUA'], ['AA']),
+])
+def test_iupac_pattern_matches(target, matched, not_matched):
+    compiled = re.compile(subseq_re.iupac_pattern(target, 'nucleicacids'))
+
+    assert all(compiled.fullmatch(sequence) for sequence in matched)
+    assert not any(compiled.fullmatch(sequence) for sequence in not_matched)
+
+
+def test_compile_target_cache(monkeypatch):
+    monkeypatch.setattr(subseq_re, 'compiled_targets',
+                        subseq_re.OrderedDict())
+    size = subseq_re.COMPILED_TARGETS_SIZE
+
+    first = subseq_re.compile_target('ACD', 'aminoacids')
+    assert subseq_re.compile_target('ACD', 'aminoacids') is first
+    # the search type is part of the key
+    assert subseq_re.compile_target('ACD', 'nucleicacids') is not first
+
+    for k in range(size - 2):
+        subseq_re.compile_target('A{{{0}}}'.format(k + 1), 'aminoacids')
+    assert len(subseq_re.compiled_targets) == size
+
+    # a repeated target becomes the most recently used one
+    assert subseq_re.compile_target('ACD', 'aminoacids') is first
+    subseq_re.compile_target('W', 'aminoacids')
+
+    assert len(subseq_re.compiled_targets) == size
+    assert ('ACD', 'nucleicacids', re.I) not in subseq_re.compiled_targets
+    assert subseq_re.compile_target('ACD', 'aminoacids') is first
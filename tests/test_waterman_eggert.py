@@ -0,0 +1,102 @@
+import random
+
+import SmithWaterman
+import WatermanEggert
+from conftest import mutate, random_sequence
+
+
+def aligned_pairs(target_start, sequence_start, aligned_target,
+                  aligned_sequence):
+    """Returns a set of (i, j) of residue pairs aligned by an alignment"""
+    pairs = set()
+    i, j = target_start, sequence_start
+
+    for target_residue, sequence_residue in zip(aligned_target,
+                                                aligned_sequence):
+        if target_residue != '-' and sequence_residue != '-':
+            pairs.add((i, j))
+
+        i += target_residue != '-'
+        j += sequence_residue != '-'
+
+    return pairs
+
+
+def test_first_hit_is_the_smith_waterman_alignment(pairs, sub_matrix):
+    for target, sequence, gap_cost in pairs:
+        sw = SmithWaterman.SmithWaterman(target, sequence, gap_cost,
+                                         sub_matrix)
+        hits = WatermanEggert.WatermanEggert(
+            target, sequence, gap_cost, sub_matrix, max_hits=1).get_hits()
+
+        if sw.get_best_score() <= 0:
+            assert hits == []
+            continue
+
+        i, j = sw.get_coordinates()[0]
+        assert hits == [(sw.get_best_score(), sw.get_traceback(i, j))]
+
+
+def test_hits_do_not_share_residue_pairs(sub_matrix):
+    rng = random.Random(5)
+
+    for _ in range(30):
+        target = random_sequence(rng, rng.randint(5, 40))
+
+        # a repeated domain
+        sequence = random_sequence(rng, 10)
+        for _ in range(rng.randint(2, 4)):
+            sequence += mutate(rng, target, 2) + random_sequence(rng, 5)
+
+        hits = WatermanEggert.WatermanEggert(
+            target, sequence, 4., sub_matrix, min_score=1.,
+            max_hits=5).get_hits()
+
+        assert hits
+        assert [score for score, _ in hits] == \
+            sorted([score for score, _ in hits], reverse=True)
+
+        used = set()
+        for score, (aligned_target, aligned_sequence, i, j) in hits:
+            assert score >= 1.
+            assert aligned_target.replace('-', '') == \
+                target[i - 1:i - 1 + len(aligned_target.replace('-', ''))]
+            assert aligned_sequence.replace('-', '') == \
+                sequence[j - 1:j - 1 + len(aligned_sequence.replace('-', ''))]
+
+            pairs = aligned_pairs(i, j, aligned_target, aligned_sequence)
+            assert not pairs & used
+            used |= pairs
+
+
+def test_checkpoints_do_not_change_hits(sub_matrix, monkeypatch):
+    rng = random.Random(6)
+    cases = list()
+
+    for _ in range(20):
+        target = random_sequence(rng, rng.randint(20, 80))
+        sequence = random_sequence(rng, 10) + mutate(rng, target, 5) + \
+            random_sequence(rng, 10) + mutate(rng, target[5:], 5)
+        cases.append((target, sequence))
+
+    def all_hits():
+        return [WatermanEggert.WatermanEggert(
+            target, sequence, 4., sub_matrix, min_score=1.,
+            max_hits=4).get_hits() for target, sequence in cases]
+
+    # every row is kept, filling again starts right above forbidden pairs
+    monkeypatch.setattr(WatermanEggert, 'CHECKPOINT', 1)
+    expected = all_hits()
+
+    for checkpoint in (3, 32):
+        monkeypatch.setattr(WatermanEggert, 'CHECKPOINT', checkpoint)
+        assert all_hits() == expected
+
+
+def test_hand_computed_hits(sub_matrix):
+    # WCH/WCH at the start scores W 11 + C 9 + H 8, WC/WC at the end
+    # W 11 + C 9. No other residue pair scores above zero
+    hits = WatermanEggert.WatermanEggert(
+        'WCH', 'WCHAAAWCA', 10., sub_matrix, max_hits=3).get_hits()
+
+    assert hits == [(28., ('WCH', 'WCH', 1, 1)), (20., ('WC', 'WC', 1, 7))]
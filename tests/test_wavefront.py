@@ -0,0 +1,51 @@
+import NeedlemanWunch
+import SmithWaterman
+import Wavefront
+
+
+def test_local_matches_smith_waterman(pairs, sub_matrix):
+    for target, sequence, gap_cost in pairs:
+        sw = SmithWaterman.SmithWaterman(target, sequence, gap_cost,
+                                         sub_matrix)
+        wavefront = Wavefront.WavefrontSmithWaterman(target, sequence,
+                                                     gap_cost, sub_matrix)
+
+        assert wavefront.get_best_score() == sw.get_best_score()
+        assert isinstance(wavefront.get_best_score(), float)
+        assert wavefront.get_coordinates() == sw.get_coordinates()
+
+        if sw.get_best_score() > 0:
+            for i, j in sw.get_coordinates():
+                assert wavefront.get_traceback(i, j) == \
+                    sw.get_traceback(i, j)
+
+
+def test_global_matches_needleman_wunsch(pairs, sub_matrix):
+    for target, sequence, gap_cost in pairs:
+        nw = NeedlemanWunch.NeedlemanWunsch(target, sequence, gap_cost,
+                                            sub_matrix)
+        wavefront = Wavefront.WavefrontNeedlemanWunsch(target, sequence,
+                                                       gap_cost, sub_matrix)
+
+        assert wavefront.get_alignment_score() == nw.get_alignment_score()
+        assert isinstance(wavefront.get_alignment_score(), float)
+        assert wavefront.get_traceback() == nw.get_traceback()
+
+
+def test_hand_computed_alignments(sub_matrix):
+    # WCH-WC / WCHAWC: W 11 + C 9 + H 8 - gap 4 + W 11 + C 9
+    local = Wavefront.WavefrontSmithWaterman('WCHWC', 'WCHAWC', 4.,
+                                             sub_matrix)
+    assert local.get_best_score() == 44.
+    assert local.get_coordinates() == [(5, 6)]
+    assert local.get_traceback(5, 6) == ('WCH-WC', 'WCHAWC', 1, 1)
+
+    local = Wavefront.WavefrontSmithWaterman('WCH', 'AWCHA', 10.,
+                                             sub_matrix)
+    assert local.get_best_score() == 28.
+    assert local.get_traceback(3, 4) == ('WCH', 'WCH', 1, 2)
+
+    glob = Wavefront.WavefrontNeedlemanWunsch('WCHWC', 'WCHAWC', 4.,
+                                              sub_matrix)
+    assert glob.get_alignment_score() == 44.
+    assert glob.get_traceback() == ('WCH-WC', 'WCHAWC', 0, 0)
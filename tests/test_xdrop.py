@@ -0,0 +1,113 @@
+import random
+
+import alignment
+import alignment_tasks
+import ResidueIds
+import SmithWaterman
+import XDrop
+from conftest import random_sequence
+
+
+def copies(rng, substitutions):
+    """Yields (target, sequence) with a copy of the target inside the
+    sequence, residues of the copy are substituted at random
+    """
+    for _ in range(100):
+        target = random_sequence(rng, rng.randint(8, 30))
+        copy = list(target)
+
+        for _ in range(substitutions):
+            copy[rng.randrange(len(copy))] = rng.choice('ACDEFGHIKLMNPQRSTVWY')
+
+        yield target, random_sequence(rng, rng.randint(0, 40)) + \
+            ''.join(copy) + random_sequence(rng, rng.randint(0, 40))
+
+
+def test_copies_match_smith_waterman(sub_matrix):
+    rng = random.Random(13)
+
+    for substitutions in (0, 1, 2):
+        for target, sequence in copies(rng, substitutions):
+            sw = SmithWaterman.SmithWaterman(target, sequence, 10.,
+                                             sub_matrix)
+            xdrop = XDrop.XDrop(target, sequence, 10., sub_matrix, 25.)
+
+            # a substitution can leave no 3 residue word in common
+            if substitutions and not xdrop.get_coordinates():
+                continue
+
+            assert xdrop.get_best_score() == sw.get_best_score()
+
+            # an extension ends at the first of tied cells
+            if len(sw.get_coordinates()) == 1:
+                assert xdrop.get_coordinates() == sw.get_coordinates()
+            else:
+                assert set(xdrop.get_coordinates()) <= \
+                    set(sw.get_coordinates())
+
+            for i, j in xdrop.get_coordinates():
+                assert xdrop.get_traceback(i, j) == sw.get_traceback(i, j)
+
+
+def test_hand_computed_alignment(sub_matrix):
+    xdrop = XDrop.XDrop('KTGA', 'CCKTGCC', 10., sub_matrix)
+
+    # K, T and G score 5, 5 and 6, A/C costs 0
+    assert xdrop.get_best_score() == 16.
+    assert xdrop.get_coordinates() == [(3, 5)]
+    assert xdrop.get_traceback(3, 5) == ('KTG', 'KTG', 1, 3)
+
+
+def test_score_is_the_best_seen_before_the_drop(sub_matrix):
+    # W/W scores 11, D/W -4, the extension dies in the D run
+    target, sequence = 'WWWDDDDW', 'WWWWWWWW'
+
+    xdrop = XDrop.XDrop(target, sequence, 10., sub_matrix, 10., [(0, 0)])
+    assert xdrop.get_best_score() == 33.
+    assert xdrop.get_coordinates() == [(3, 3)]
+    assert xdrop.get_traceback(3, 3) == ('WWW', 'WWW', 1, 1)
+
+    best_score, i, j, rows = xdrop.extension(
+        sub_matrix.encode(target[1:]), sub_matrix.encode(sequence[1:]))
+    assert (best_score, i, j) == (22., 2, 2)
+    # rows past the D run are not explored
+    assert len(rows) < len(target)
+
+    # with a large x-drop the whole copy is explored, W D D D D W still
+    # scores less than W W W alone
+    xdrop = XDrop.XDrop(target, sequence, 10., sub_matrix, 100., [(0, 0)])
+    assert xdrop.get_best_score() == 33.
+
+
+def test_hits_fit_local_alignment_task_and_printing(sub_matrix, capsys):
+    target = 'AKTGTAVLLWHKEP'
+    sequence = 'MMSS' + target[:8] + 'Q' + target[8:] + 'RRG'
+
+    hits = alignment_tasks.local_alignment_task(
+        (target, 'blossum62', 10., 51., False, 'xdrop', None, None, 25., 0,
+         0, [('m', 'A', sequence, None, None)]))
+
+    assert len(hits) == 1
+    model, chain, score, aligned_target, aligned_sequence, start_i, \
+        start_j = hits[0]
+    assert (model, chain) == ('m', 'A')
+    assert isinstance(score, float)
+    assert len(aligned_target) == len(aligned_sequence)
+    assert aligned_target.replace('-', '') == \
+        target[start_i - 1:start_i - 1 + len(aligned_target.replace('-', ''))]
+    assert aligned_sequence.replace('-', '') == \
+        sequence[start_j - 1:
+                 start_j - 1 + len(aligned_sequence.replace('-', ''))]
+
+    alignment_string, identities, gaps, mismatches = \
+        alignment.create_alignment_string(aligned_target, aligned_sequence)
+    alignment.print_alignment(
+        model, chain, target, sequence, 'blossum62', 10., score,
+        alignment.calculate_max_score(target, sub_matrix), identities,
+        mismatches, gaps, aligned_target, aligned_sequence, alignment_string,
+        start_i, start_j,
+        ResidueIds.ResidueIds([str(k) for k in range(1, len(sequence) + 1)]))
+
+    printed = capsys.readouterr().out
+    assert 'Target  1    AKTGTAVL-LWHKEP 14' in printed
+    assert 'm/A  5    AKTGTAVLQLWHKEP 19' in printed